@@ -0,0 +1,233 @@
+"""
+Headless JSON API for Project Samarth
+
+Exposes parse_query + generate_answer over HTTP so other services can ask
+questions without going through the Streamlit UI.
+
+Endpoints:
+    POST /query   body: {"query": "...", "chart": "none" | "spec" | "png"}
+    GET  /query?q=...&chart=none|spec|png
+    GET  /health
+    GET  /metrics (Prometheus text format)
+
+Queries run on a fixed worker pool. Requests beyond the pool size wait in a
+bounded queue; when the queue is full the server answers 503 with Retry-After
+instead of accepting more work. Connections use HTTP/1.1 keep-alive.
+
+Usage:
+    python api_server.py [--host 127.0.0.1] [--port 8000] [--workers 4] [--queue-size 64]
+"""
+import argparse
+import base64
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from config import API_SERVER_HOST, API_SERVER_PORT, API_WORKERS, API_QUEUE_SIZE, API_REQUEST_TIMEOUT
+from core.query_parser import parse_query
+from core.data_integrator import generate_answer, chart_render_lock
+from core.warmup import start_warm_up, prefetch_for_query
+from utils.metrics import render_prometheus, timed, PROMETHEUS_CONTENT_TYPE
+
+def figure_to_png_base64(fig):
+    """Render a matplotlib figure as a base64-encoded PNG"""
+    buffer = io.BytesIO()
+    with chart_render_lock, timed('samarth_chart_render_seconds', {'target': 'png'}):
+        fig.savefig(buffer, format='png')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def figure_to_spec(fig):
+    """
+    Describe a matplotlib figure as a JSON chart spec
+    Returns the title, axis labels and the plotted line, bar and scatter series
+    """
+    with chart_render_lock:
+        return _figure_specs(fig)
+
+def _figure_specs(fig):
+    specs = []
+    for ax in fig.get_axes():
+        series = []
+        for line in ax.get_lines():
+            series.append({
+                'type': 'line',
+                'label': line.get_label(),
+                'x': [float(x) for x in line.get_xdata()],
+                'y': [float(y) for y in line.get_ydata()]
+            })
+        for container in ax.containers:
+            labels = [tick.get_text() for tick in ax.get_xticklabels()]
+            series.append({
+                'type': 'bar',
+                'label': container.get_label(),
+                'x': labels[:len(container.patches)] if labels else [patch.get_x() for patch in container.patches],
+                'y': [float(patch.get_height()) for patch in container.patches]
+            })
+        for collection in ax.collections:
+            offsets = collection.get_offsets()
+            series.append({
+                'type': 'scatter',
+                'label': collection.get_label(),
+                'x': [float(point[0]) for point in offsets],
+                'y': [float(point[1]) for point in offsets]
+            })
+        specs.append({
+            'title': ax.get_title(),
+            'x_label': ax.get_xlabel(),
+            'y_label': ax.get_ylabel(),
+            'series': series
+        })
+    return specs[0] if len(specs) == 1 else specs
+
+def answer_query(query, chart_format='none'):
+    """
+    Answer one natural language query
+    Returns a JSON-serializable dictionary
+    """
+    started = time.perf_counter()
+    intent, params = parse_query(query)
+    prefetch_for_query(intent, params)
+    answer, chart, sources = generate_answer(intent, params)
+
+    chart_payload = None
+    if chart is not None and chart_format == 'png':
+        chart_payload = {'format': 'png', 'data': figure_to_png_base64(chart)}
+    elif chart is not None and chart_format == 'spec':
+        chart_payload = {'format': 'spec', 'data': figure_to_spec(chart)}
+
+    return {
+        'query': query,
+        'intent': intent,
+        'params': params,
+        'answer': answer,
+        'sources': sources,
+        'chart': chart_payload,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+class QueryWorkerPool:
+    """
+    Fixed-size worker pool with a bounded admission queue
+    submit() returns None when the pool and its queue are full
+    """
+    def __init__(self, workers, queue_size):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='samarth-worker')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            return None
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler that hands queries to the worker pool"""
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SamarthAPI/1.0'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = 30
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif url.path == '/metrics':
+            self._send(200, PROMETHEUS_CONTENT_TYPE, render_prometheus().encode('utf-8'))
+        elif url.path == '/query':
+            args = parse_qs(url.query)
+            query = args.get('q', [''])[0]
+            chart_format = args.get('chart', ['none'])[0]
+            self._handle_query(query, chart_format)
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/query':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {'error': 'Request body must be JSON'})
+            return
+        self._handle_query(body.get('query', ''), body.get('chart', 'none'))
+
+    def _handle_query(self, query, chart_format):
+        if not isinstance(query, str) or not query.strip():
+            self._send_json(400, {'error': 'Please provide a query'})
+            return
+        if chart_format not in ('none', 'spec', 'png'):
+            self._send_json(400, {'error': "chart must be one of 'none', 'spec' or 'png'"})
+            return
+
+        future = self.server.pool.submit(answer_query, query, chart_format)
+        if future is None:
+            self._send_json(503, {'error': 'Server busy, please retry'}, {'Retry-After': '1'})
+            return
+        try:
+            self._send_json(200, future.result(timeout=self.server.request_timeout))
+        except FutureTimeoutError:
+            self._send_json(504, {'error': 'Query timed out'})
+        except Exception as e:
+            print(f"Error answering query: {e}")
+            self._send_json(500, {'error': 'Internal error while answering the query'})
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, 'application/json', json.dumps(payload, default=str).encode('utf-8'), headers)
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep request logging terse; the default handler logs every request to stderr
+        pass
+
+def create_server(host=API_SERVER_HOST, port=API_SERVER_PORT, workers=API_WORKERS,
+                  queue_size=API_QUEUE_SIZE, request_timeout=API_REQUEST_TIMEOUT):
+    """
+    Create the API server (call serve_forever() to run it)
+    """
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    server.pool = QueryWorkerPool(workers, queue_size)
+    server.request_timeout = request_timeout
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Project Samarth JSON query API")
+    parser.add_argument("--host", default=API_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=API_SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=API_QUEUE_SIZE)
+    parser.add_argument("--timeout", type=float, default=API_REQUEST_TIMEOUT, help="seconds to wait for an answer")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.workers, args.queue_size, args.timeout)
+    start_warm_up()
+    print(f"Project Samarth API listening on http://{args.host}:{args.port} "
+          f"({args.workers} workers, queue of {args.queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
 import streamlit as st
 from core.query_parser import parse_query
-from core.data_integrator import generate_answer
-from utils.constants import INDIAN_STATES
+from core.data_integrator import generate_answer_stream, chart_render_lock
+from core.warmup import start_warm_up, prefetch_for_query
+from utils.constants import INDIAN_STATES, COMMON_CROPS, QUICK_QUERY_EXAMPLES
+from utils.metrics import timed, start_metrics_server, get_metrics_summary
+from config import METRICS_ENABLED, METRICS_HOST, METRICS_PORT, SHOW_METRICS_PANEL
 
-# Set page configuration for better desktop experience
-st.set_page_config(
-    page_title="Project Samarth - Agri & Climate Data Q&A",
-    page_icon="🌾",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Streamlit re-executes this script on every interaction, so static markup and
+# per-process resources are built through the cache decorators below
 
-# Enhanced custom CSS for a modern, professional look
-st.markdown("""
+def _bullet_list_html(items, columns):
+    """Build the bullet-list markup used by the sidebar sections"""
+    html = f"<div style='columns: {columns}; column-gap: 20px; font-size: 13px;'>"
+    for item in items:
+        html += f"<div style='padding: 1px 0;'>• {item}</div>"
+    html += "</div>"
+    return html
+
+@st.cache_data(show_spinner=False)
+def _build_static_markup():
+    """Build the page CSS and sidebar lists once per process"""
+    return {
+        'css': """
 <style>
     /* Main background and text colors */
     .stApp {
@@ -158,7 +167,28 @@ st.markdown("""
         background: #4fc3f7;
     }
 </style>
-""", unsafe_allow_html=True)
+""",
+        # First 28 entries are states, the remaining ones are union territories
+        'states': _bullet_list_html(INDIAN_STATES[:28], 2),
+        'uts': _bullet_list_html(INDIAN_STATES[28:], 1),
+        'crops': _bullet_list_html(COMMON_CROPS, 2),
+        'examples': '<div style="font-size: 13px; line-height: 1.6;">\n'
+                    + ''.join(f'• "{example}"<br>\n' for example in QUICK_QUERY_EXAMPLES)
+                    + '</div>',
+    }
+
+# Set page configuration for better desktop experience
+st.set_page_config(
+    page_title="Project Samarth - Agri & Climate Data Q&A",
+    page_icon="🌾",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+static_markup = _build_static_markup()
+
+# Enhanced custom CSS for a modern, professional look
+st.markdown(static_markup['css'], unsafe_allow_html=True)
 
 # Main title with icon
 st.markdown("<h1 style='text-align: center; margin-bottom: 10px;'>🌾 Project Samarth</h1>", unsafe_allow_html=True)
@@ -179,23 +209,30 @@ with col1:
     
     if st.button("🔍 Ask Samarth", use_container_width=True):
         if user_query.strip():
-            with st.spinner("Processing your query..."):
-                intent, params = parse_query(user_query)
-                answer, chart, sources = generate_answer(intent, params)
-                
-            # Display results in the right column
+            intent, params = parse_query(user_query)
+            prefetch_for_query(intent, params)
+            
+            # Display results in the right column as they arrive
             with col2:
                 st.markdown("<h3 style='color: #4fc3f7; margin-top: 0px; margin-bottom: 15px;'>Response</h3>", unsafe_allow_html=True)
-                st.write(answer)
-                if chart:
-                    st.pyplot(chart)
-                
-                if sources:
-                    st.markdown("<div class='data-sources'>", unsafe_allow_html=True)
-                    st.markdown("<h4 style='color: #4fc3f7; margin-top: 0px;'>Data Sources</h4>", unsafe_allow_html=True)
-                    for src in sources:
-                        st.markdown(f"- [{src}]({src})")
-                    st.markdown("</div>", unsafe_allow_html=True)
+                with st.spinner("Processing your query..."):
+                    for kind, payload in generate_answer_stream(intent, params):
+                        if kind == 'interpretation':
+                            st.caption(payload)
+                        elif kind in ('headline', 'row'):
+                            st.write(payload)
+                        elif kind == 'chart':
+                            # The figure may be shared with other sessions through the answer cache
+                            with chart_render_lock, timed('samarth_chart_render_seconds', {'target': 'streamlit'}):
+                                st.pyplot(payload)
+                        elif kind == 'sources' and payload:
+                            st.markdown("<div class='data-sources'>", unsafe_allow_html=True)
+                            st.markdown("<h4 style='color: #4fc3f7; margin-top: 0px;'>Data Sources</h4>", unsafe_allow_html=True)
+                            for src in payload:
+                                # Sources read "<url> (<dataset>, version ...)"; only the URL is linked
+                                url, _, detail = src.partition(' ')
+                                st.markdown(f"- [{url}]({url}) {detail}")
+                            st.markdown("</div>", unsafe_allow_html=True)
         else:
             st.warning("Please enter a question.")
 
@@ -222,54 +259,48 @@ st.sidebar.markdown("""
 st.sidebar.markdown("<div class='sidebar-section'>", unsafe_allow_html=True)
 st.sidebar.markdown("<div class='sidebar-title'>States & Union Territories</div>", unsafe_allow_html=True)
 
-# Group states and UTs for better organization
-states_only = INDIAN_STATES[:28]  # First 28 are states
-uts_only = INDIAN_STATES[28:]     # Remaining are union territories
-
 st.sidebar.markdown("<b>States</b>", unsafe_allow_html=True)
-# Display states without gaps
-states_html = "<div style='columns: 2; column-gap: 20px; font-size: 13px;'>"
-for state in states_only:
-    states_html += f"<div style='padding: 1px 0;'>• {state}</div>"
-states_html += "</div>"
-st.sidebar.markdown(states_html, unsafe_allow_html=True)
+st.sidebar.markdown(static_markup['states'], unsafe_allow_html=True)
 
 st.sidebar.markdown("<b>Union Territories</b>", unsafe_allow_html=True)
-# Display UTs without gaps
-uts_html = "<div style='columns: 1; column-gap: 20px; font-size: 13px;'>"
-for ut in uts_only:
-    uts_html += f"<div style='padding: 1px 0;'>• {ut}</div>"
-uts_html += "</div>"
-st.sidebar.markdown(uts_html, unsafe_allow_html=True)
+st.sidebar.markdown(static_markup['uts'], unsafe_allow_html=True)
 st.sidebar.markdown("</div>", unsafe_allow_html=True)
 
 st.sidebar.markdown("<div class='sidebar-section'>", unsafe_allow_html=True)
 st.sidebar.markdown("<div class='sidebar-title'>Supported Crops</div>", unsafe_allow_html=True)
-# Display supported crops
-supported_crops = [
-    "Rice", "Wheat", "Maize", "Sugarcane", "Cotton",
-    "Jowar", "Bajra", "Ragi", "Tur", "Urad",
-    "Moong", "Gram", "Groundnut", "Sunflower", "Soybean",
-    "Potatoes", "Jute", "Barley", "Mustard", "Peas"
-]
-
-# Display crops without gaps
-crops_html = "<div style='columns: 2; column-gap: 20px; font-size: 13px;'>"
-for crop in supported_crops:
-    crops_html += f"<div style='padding: 1px 0;'>• {crop}</div>"
-crops_html += "</div>"
-st.sidebar.markdown(crops_html, unsafe_allow_html=True)
+st.sidebar.markdown(static_markup['crops'], unsafe_allow_html=True)
 st.sidebar.markdown("</div>", unsafe_allow_html=True)
 
 st.sidebar.markdown("<div class='sidebar-section'>", unsafe_allow_html=True)
 st.sidebar.markdown("<div class='sidebar-title'>Quick Query Examples</div>", unsafe_allow_html=True)
-st.sidebar.markdown("""
-<div style="font-size: 13px; line-height: 1.6;">
-• "What is the rainfall in Maharashtra?"<br>
-• "Show me rice production in Punjab"<br>
-• "Compare rainfall between Karnataka and Tamil Nadu"<br>
-• "Analyze correlation between wheat production and rainfall in Uttar Pradesh"<br>
-• "List the top crops of type Rice in Maharashtra and Punjab"
-</div>
-""", unsafe_allow_html=True)
-st.sidebar.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.sidebar.markdown(static_markup['examples'], unsafe_allow_html=True)
+st.sidebar.markdown("</div>", unsafe_allow_html=True)
+
+if SHOW_METRICS_PANEL:
+    metrics = get_metrics_summary()
+    queries = metrics['counters'].get('samarth_queries_total', {})
+    cache_hits = sum(metrics['counters'].get('samarth_cache_hits_total', {}).values())
+    cache_misses = sum(metrics['counters'].get('samarth_cache_misses_total', {}).values())
+    upstream = metrics['histograms'].get('samarth_upstream_request_seconds', {})
+    handlers = metrics['histograms'].get('samarth_handler_seconds', {})
+    rows = [f"<b>Queries:</b> {sum(queries.values())}"]
+    rows += [f"&nbsp;&nbsp;{intent}: {count} ({handlers.get(intent, {}).get('mean_ms', 0)} ms avg)"
+             for intent, count in sorted(queries.items(), key=lambda item: -item[1])]
+    if cache_hits + cache_misses:
+        rows.append(f"<b>Cache hit rate:</b> {cache_hits / (cache_hits + cache_misses):.0%}")
+    for dataset, stats in upstream.items():
+        rows.append(f"<b>data.gov.in ({dataset}):</b> {stats['count']} requests, {stats['mean_ms']} ms avg")
+    fallbacks = sum(metrics['counters'].get('samarth_mock_fallbacks_total', {}).values())
+    rows.append(f"<b>Mock data fallbacks:</b> {fallbacks}")
+    st.sidebar.markdown("<div class='sidebar-section'>", unsafe_allow_html=True)
+    st.sidebar.markdown("<div class='sidebar-title'>Metrics</div>", unsafe_allow_html=True)
+    st.sidebar.markdown("<div style='font-size: 13px; line-height: 1.6;'>" + "<br>".join(rows) + "</div>", unsafe_allow_html=True)
+    st.sidebar.markdown("</div>", unsafe_allow_html=True)
+
+# Serve /metrics from this process once (later reruns find it running)
+if METRICS_ENABLED:
+    start_metrics_server(METRICS_HOST, METRICS_PORT)
+
+# Preload all states, crops and the example answers in the background, once per
+# process and dataset version, after the page has been painted
+start_warm_up()
@@ -0,0 +1,157 @@
+"""
+Batch query runner for Project Samarth
+
+Answers a file of natural language queries (one per line) across a process
+pool and writes one JSON result per line. Queries that need the same data
+slice are grouped and sent to the same worker, so each slice is fetched once
+and later queries in the group are served from that worker's caches.
+
+Usage:
+    python batch_cli.py queries.txt --output results.jsonl [--charts-dir charts] [--workers 4]
+    cat queries.txt | python batch_cli.py - > results.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.query_parser import parse_query
+from utils.constants import INTENT_DATASETS
+
+def read_queries(source):
+    """
+    Read queries from a file path or '-' for stdin
+    Blank lines and lines starting with '#' are skipped
+    """
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith('#')]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def group_key(intent, params):
+    """
+    Key describing the data slice a parsed query needs
+    """
+    return (
+        INTENT_DATASETS.get(intent, ()),
+        tuple(params.get('states', [])),
+        tuple(params.get('years', [])),
+    )
+
+def group_queries(parsed):
+    """
+    Group parsed queries by the data they need
+    parsed is a list of (index, query, intent, params, parse_ms)
+    Returns a list of groups, largest first so long tasks start early
+    """
+    groups = OrderedDict()
+    for item in parsed:
+        _, _, intent, params, _ = item
+        groups.setdefault(group_key(intent, params), []).append(item)
+    return sorted(groups.values(), key=len, reverse=True)
+
+def answer_group(group, charts_dir=None):
+    """
+    Answer one group of parsed queries inside a worker process
+    Returns a list of result dictionaries
+    """
+    from core.data_integrator import generate_answer
+
+    results = []
+    # Debug output from the pipeline must not end up in the JSONL stream
+    with contextlib.redirect_stdout(sys.stderr):
+        for index, query, intent, params, parse_ms in group:
+            result = {'index': index, 'query': query, 'intent': intent, 'params': params,
+                      'timings': {'parse_ms': parse_ms}}
+            started = time.perf_counter()
+            try:
+                answer, chart, sources = generate_answer(intent, params)
+            except Exception as e:
+                result['error'] = str(e)
+                result['timings']['answer_ms'] = round((time.perf_counter() - started) * 1000, 2)
+                results.append(result)
+                continue
+            result['timings']['answer_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            result.update(answer=answer, sources=sources, chart_file=None)
+
+            if chart is not None and charts_dir:
+                started = time.perf_counter()
+                chart_file = os.path.join(charts_dir, f"{index:05d}_{intent}.png")
+                chart.savefig(chart_file)
+                result['chart_file'] = chart_file
+                result['timings']['chart_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            results.append(result)
+    return results
+
+def _summarize(results, elapsed, group_count, workers):
+    """Throughput and per-stage timing summary"""
+    lines = [
+        f"Answered {len(results)} queries in {elapsed:.2f} s "
+        f"({len(results) / elapsed if elapsed else 0:.1f} queries/s, {group_count} data groups, {workers} workers)"
+    ]
+    for stage in ('parse_ms', 'answer_ms', 'chart_ms', 'write_ms'):
+        values = [result['timings'][stage] for result in results if stage in result['timings']]
+        if values:
+            values.sort()
+            lines.append(
+                f"  {stage[:-3]:<7} total {sum(values):10.1f} ms  mean {sum(values) / len(values):8.2f} ms  "
+                f"p95 {values[min(len(values) - 1, int(len(values) * 0.95))]:8.2f} ms"
+            )
+    errors = sum(1 for result in results if 'error' in result)
+    if errors:
+        lines.append(f"  {errors} queries failed")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of queries in parallel and write JSONL results")
+    parser.add_argument("input", help="file with one query per line, or '-' for stdin")
+    parser.add_argument("--output", "-o", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--charts-dir", help="directory for chart PNG files (charts are skipped if omitted)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    queries = read_queries(args.input)
+    if args.charts_dir:
+        os.makedirs(args.charts_dir, exist_ok=True)
+
+    parsed = []
+    with contextlib.redirect_stdout(sys.stderr):
+        for index, query in enumerate(queries):
+            parse_started = time.perf_counter()
+            intent, params = parse_query(query)
+            parsed.append((index, query, intent, params, round((time.perf_counter() - parse_started) * 1000, 2)))
+    groups = group_queries(parsed)
+
+    results = []
+    if groups:
+        workers = max(1, min(args.workers, len(groups)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(answer_group, group, args.charts_dir) for group in groups]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    else:
+        workers = 0
+    results.sort(key=lambda result: result['index'])
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for result in results:
+            write_started = time.perf_counter()
+            output.write(json.dumps(result, default=str) + "\n")
+            result['timings']['write_ms'] = round((time.perf_counter() - write_started) * 1000, 2)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(_summarize(results, time.perf_counter() - started, len(groups), workers), file=sys.stderr)
+    sys.exit(1 if any('error' in result for result in results) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Benchmark suite for the Project Samarth query path
+
+Times query parsing, the connector filters, every _handle_* intent handler and
+end-to-end answers over synthetic datasets of increasing size, writes the
+results as JSON and compares them against a saved baseline.
+
+Handler and end-to-end stages run in a child process per size, with the
+synthetic data loaded into a temporary SQLite store that serves every fetch.
+
+Usage:
+    python benchmark.py [--sizes 1000 10000 100000 1000000] [--repeat 5]
+                        [--output benchmark_results.json]
+                        [--baseline benchmark_baseline.json] [--threshold 0.25]
+                        [--save-baseline]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.constants import INDIAN_STATES, COMMON_CROPS
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+FIRST_YEAR = 1997
+YEARS = 24
+# Rainfall is one value per state and year, so its series stays at a century of history
+CLIMATE_YEARS = 120
+
+# A representative query for every intent handler
+INTENT_QUERIES = {
+    'climate_info': "What is the rainfall in Punjab?",
+    'compare_rainfall': "Compare rainfall in Punjab, Kerala and Bihar",
+    'seasonal_rainfall': "How was the monsoon rainfall in Punjab from 2010 to 2015?",
+    'drought_years': "Which were the drought years in Punjab?",
+    'rainfall_anomalies': "Which states had the worst monsoon deficits in 2015?",
+    'crop_production': "Show me rice production in Punjab",
+    'crop_trend': "Show wheat production trend in Punjab from 2000 to 2020",
+    'highest_wheat_production': "Which district grows the most wheat in Punjab?",
+    'top_districts': "What are the top 10 rice districts in India?",
+    'top_crops': "What are the top crops in Punjab?",
+    'top_crops_by_type': "List the top crops of type Rice in Maharashtra and Punjab",
+    'compare_crop_production': "Compare rice and wheat production in Punjab and Haryana",
+    'highest_yield_district': "Which district had the highest rice yield in Punjab in 2018?",
+    'yield_trend': "Show the wheat yield trend in Punjab from 2000 to 2020",
+    'fastest_growing_crops': "What are the fastest growing crops in Punjab?",
+    'crop_growth_by_state': "In which states is wheat production declining?",
+    'analyze_correlation': "Analyze correlation between wheat production and rainfall in Punjab",
+    'general_query': "What can you tell me about India?",
+}
+
+def make_agriculture_frame(rows, seed=0):
+    """
+    Synthetic crop production data with one row per (district, crop, year)
+    Every state gets every year first, then more crops, then more districts
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    i = np.arange(rows)
+    state_codes = i % len(INDIAN_STATES)
+    years = FIRST_YEAR + (i // len(INDIAN_STATES)) % YEARS
+    crop_codes = (i // (len(INDIAN_STATES) * YEARS)) % len(COMMON_CROPS)
+    district_codes = i // (len(INDIAN_STATES) * YEARS * len(COMMON_CROPS))
+    states = np.array(INDIAN_STATES, dtype=object)[state_codes]
+    return pd.DataFrame({
+        'State': states,
+        'District': [f"{state} District {code}" for state, code in zip(states, district_codes)],
+        'Year': years,
+        'Crop': np.array(COMMON_CROPS, dtype=object)[crop_codes],
+        'Production': rng.integers(10000, 300000, rows),
+    })
+
+def make_climate_frame(rows, seed=0):
+    """Synthetic annual rainfall data with one row per (state, year)"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    i = np.arange(rows)
+    return pd.DataFrame({
+        'State': np.array(INDIAN_STATES, dtype=object)[i % len(INDIAN_STATES)],
+        'Year': FIRST_YEAR + YEARS - 1 - i // len(INDIAN_STATES),
+        'Rainfall': rng.normal(1100, 250, rows).round(1),
+    })
+
+def time_call(func, repeat):
+    """Median wall time of func() in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+def bench_parse(repeat, queries=1000):
+    """Time parsing a batch of queries; reported per 1000 queries"""
+    from core.query_parser import parse_query
+
+    texts = list(INTENT_QUERIES.values())
+    batch = [texts[i % len(texts)] for i in range(queries)]
+
+    def run():
+        for text in batch:
+            parse_query(text)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        elapsed = time_call(run, repeat)
+    return {'parse.per_1000_queries': round(elapsed * 1000 / queries, 3)}
+
+def bench_filters(size, repeat):
+    """Time the connector filters on synthetic frames of a given size"""
+    from data_connectors.agriculture_data import filter_agriculture_frame
+    from data_connectors.climate_data import filter_climate_frame
+
+    agriculture = make_agriculture_frame(size)
+    climate = make_climate_frame(size)
+    return {
+        f'filter.agriculture.{size}': time_call(
+            lambda: filter_agriculture_frame(agriculture, state='Punjab', crop='Wheat', year_start=2010, year_end=2020), repeat),
+        f'filter.climate.{size}': time_call(
+            lambda: filter_climate_frame(climate, state='Punjab', year_start=2010, year_end=2020), repeat),
+    }
+
+def bench_handlers(size, repeat):
+    """
+    Time every intent handler and end-to-end answers against a store holding `size` rows
+    Runs inside the child process started by run_handler_benchmarks
+    """
+    from core import data_integrator
+    from core.query_parser import parse_query
+    from core.rainfall_index import clear_rainfall_index
+    from core.seasonal_rainfall import clear_season_tables
+    from core.crop_trends import clear_trend_tables
+    from core.rainfall_anomalies import clear_anomaly_tables
+    from core.district_leaderboards import clear_leaderboards
+    from data_connectors.sqlite_store import ingest_agriculture_frame, ingest_climate_frame, record_loaded_slice
+    from utils.cache import clear_cache
+
+    ingest_agriculture_frame(make_agriculture_frame(size))
+    ingest_climate_frame(make_climate_frame(min(size, len(INDIAN_STATES) * CLIMATE_YEARS)))
+    # Slices with no filters cover every request, so all fetches are served by the store
+    record_loaded_slice('agriculture')
+    record_loaded_slice('climate')
+
+    def cold():
+        clear_cache()
+        clear_rainfall_index()
+        clear_season_tables()
+        clear_trend_tables()
+        clear_anomaly_tables()
+        clear_leaderboards()
+
+    results = {}
+    handlers = sorted(name for name in dir(data_integrator) if name.startswith('_handle_'))
+    for handler_name in handlers:
+        intent = handler_name[len('_handle_'):]
+        query = INTENT_QUERIES.get(intent)
+        if query is None:
+            print(f"No benchmark query for {handler_name}", file=sys.stderr)
+            continue
+        _, params = parse_query(query)
+        handler = getattr(data_integrator, handler_name)
+        results[f'handler.{intent}.{size}'] = time_call(lambda: (cold(), handler(params)), repeat)
+
+        def end_to_end():
+            parsed_intent, parsed_params = parse_query(query)
+            return data_integrator.generate_answer(parsed_intent, parsed_params)
+        results[f'end_to_end_cold.{intent}.{size}'] = time_call(lambda: (cold(), end_to_end()), repeat)
+        results[f'end_to_end_warm.{intent}.{size}'] = time_call(end_to_end, repeat)
+    return results
+
+def run_handler_benchmarks(size, repeat):
+    """Run bench_handlers in a fresh process with a temporary SQLite store"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SAMARTH_USE_SQLITE_STORE="1", SAMARTH_SQLITE_DB=os.path.join(tmp, "bench.db"))
+        project_root = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child-size", str(size), "--repeat", str(repeat)],
+            capture_output=True, text=True, env=env, cwd=project_root
+        )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "handler benchmark failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Compare timings against a baseline (all metrics are milliseconds, lower is better)
+    Returns a list of (metric, baseline_ms, current_ms, change) for regressions beyond threshold
+    """
+    regressions = []
+    for metric, current in sorted(results.items()):
+        previous = baseline.get(metric)
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        if change > threshold:
+            regressions.append((metric, previous, current, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, filtering, handlers and end-to-end answers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="synthetic dataset sizes in rows (up to 10000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (the median is reported)")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the results")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a metric counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="save these results as the new baseline")
+    parser.add_argument("--skip-handlers", action="store_true", help="only benchmark parsing and filters")
+    parser.add_argument("--child-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_size:
+        # Handler output goes to stderr; the last stdout line carries the results
+        with contextlib.redirect_stdout(sys.stderr):
+            results = bench_handlers(args.child_size, args.repeat)
+        print(json.dumps(results))
+        return
+
+    results = bench_parse(args.repeat)
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} rows...", file=sys.stderr)
+        results.update(bench_filters(size, args.repeat))
+        if not args.skip_handlers:
+            results.update(run_handler_benchmarks(size, args.repeat))
+
+    import pandas as pd
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'sizes': args.sizes,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for metric, value in sorted(results.items()):
+        print(f"  {metric:<55} {value:12.3f} ms")
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    for metric, previous, current, change in regressions:
+        print(f"REGRESSION {metric}: {previous:.3f} ms -> {current:.3f} ms (+{change:.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import-time budget check for Project Samarth
+
+Imports the application modules in a fresh interpreter with `-X importtime`,
+reports the slowest imports and fails if the total exceeds the budget.
+
+Usage:
+    python check_import_time.py [--budget-ms 300] [--top 15] [--modules core.data_integrator ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "core.query_parser",
+    "core.data_integrator",
+]
+
+# Modules that should only be imported when data is accessed or a chart is drawn
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "requests"]
+
+def measure_imports(modules):
+    """
+    Import modules in a fresh interpreter
+    Returns a list of (module, self_us, cumulative_us) and the heavy modules that were loaded
+    """
+    code = (
+        "import sys\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    env = dict(os.environ)
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    env["PYTHONPATH"] = project_root + os.pathsep + env.get("PYTHONPATH", "")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, cwd=project_root
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "import failed")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Drop the separator space; remaining leading spaces encode nesting depth
+        timings.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+
+    loaded_heavy = [module for module in result.stdout.strip().split(",") if module]
+    return timings, loaded_heavy
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the slowest imports and enforce an import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="maximum total import time in milliseconds")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to report")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="modules to import")
+    args = parser.parse_args()
+
+    timings, loaded_heavy = measure_imports(args.modules)
+
+    # importtime lists children before parents; everything up to and including
+    # 'site' is interpreter start-up and happens before our imports
+    site_positions = [i for i, (name, _, _) in enumerate(timings) if name == "site"]
+    app_timings = timings[site_positions[-1] + 1:] if site_positions else timings
+
+    # Top-level imports (no indentation) add up to the total import time
+    total_ms = sum(cumulative for name, _, cumulative in app_timings if not name.startswith(" ")) / 1000
+
+    print(f"Slowest imports (cumulative) for: {', '.join(args.modules)}")
+    for name, self_us, cumulative_us in sorted(app_timings, key=lambda item: item[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name.strip()}")
+    print(f"Total import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded_heavy:
+        print(f"Heavy modules imported eagerly: {', '.join(loaded_heavy)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("Import-time budget exceeded")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # Configuration file for Project Samarth
+import os
 
 # API Keys
 # Get your API key from https://data.gov.in/
@@ -11,9 +12,54 @@ RAINFALL_DATA_RESOURCE_ID = "8e0bd482-4aba-4d99-9cb9-ff124f6f1c2f"
 CROP_PRODUCTION_RESOURCE_ID = "35985678-0d79-46b4-9ed6-6f13308a1d24"
 #35be999b-0208-4354-b557-f6ca9a5355de
 # API Settings
-API_BASE_URL = "https://api.data.gov.in/resource"
+# SAMARTH_API_BASE_URL points the connectors at another server, e.g. fake_data_gov_server.py
+API_BASE_URL = os.environ.get("SAMARTH_API_BASE_URL", "https://api.data.gov.in/resource")
 API_FORMAT = "json"
 API_LIMIT = 1000
+FETCH_WORKERS = 8  # Concurrent requests used when fetching many states/crops in one batch
 
 # Application Settings
-USE_MOCK_DATA = True  # Set to True to use mock data instead of real API calls
\ No newline at end of file
+USE_MOCK_DATA = os.environ.get("SAMARTH_USE_MOCK_DATA", "1") == "1"  # Set to True to use mock data instead of real API calls
+
+# Local Storage Settings
+# Both can be overridden from the environment (SAMARTH_USE_SQLITE_STORE=1, SAMARTH_SQLITE_DB=path)
+USE_SQLITE_STORE = os.environ.get("SAMARTH_USE_SQLITE_STORE", "0") == "1"  # Set to True to keep fetched data in an indexed local SQLite database
+SQLITE_DB_PATH = os.environ.get("SAMARTH_SQLITE_DB", "samarth.db")
+
+# Dataset Versions
+VERSION_CHECK_INTERVAL = 5  # Seconds between checks for data synced or snapshotted by another process
+
+# Snapshot Settings (python -m data_connectors.snapshot)
+# SAMARTH_USE_SNAPSHOT=1 serves every fetch from the memory-mapped snapshot shared by all worker processes
+USE_SNAPSHOT = os.environ.get("SAMARTH_USE_SNAPSHOT", "0") == "1"
+SNAPSHOT_DIR = os.environ.get("SAMARTH_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_KEEP = 2  # Snapshots kept on disk (older ones are deleted when a new one is published)
+
+# Sync Settings (python -m data_connectors.sync)
+SYNC_PAGE_SIZE = 1000  # Records requested per page during a sync
+SYNC_RETRIES = 3  # Attempts per page before a sync stops (it resumes from the last stored page)
+SYNC_REVISION_YEARS = 2  # Latest years re-fetched when a resource was revised without new records
+
+# Headless API Settings
+API_SERVER_HOST = "127.0.0.1"
+API_SERVER_PORT = 8000
+API_WORKERS = 4  # Queries answered concurrently by the JSON API
+API_QUEUE_SIZE = 64  # Requests allowed to wait for a worker before the API answers 503
+API_REQUEST_TIMEOUT = 60  # Seconds to wait for an answer before the API answers 504
+
+# Warm-up Settings
+WARM_UP_ON_START = True  # Preload all states/crops and the example answers in the background at start-up
+PREFETCH_RELATED = True  # After a question about a state, load the data likely needed for the next one
+ANSWER_CACHE_SIZE = 256  # Complete answers kept in memory
+
+# Profiling Settings
+PROFILING_ENABLED = os.environ.get("SAMARTH_PROFILING", "0") == "1"  # Record per-query memory and slow-query cProfile dumps
+PROFILE_DIR = os.environ.get("SAMARTH_PROFILE_DIR", "profiles")
+PROFILE_LATENCY_THRESHOLD_MS = 500  # Queries slower than this also keep a cProfile capture
+PROFILE_MAX_DUMPS = 500  # Oldest query profiles beyond this are deleted
+
+# Metrics Settings
+METRICS_ENABLED = os.environ.get("SAMARTH_METRICS", "0") == "1"  # Serve Prometheus metrics from the Streamlit process
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.environ.get("SAMARTH_METRICS_PORT", "9464"))
+SHOW_METRICS_PANEL = False  # Show query, cache and upstream metrics in the app sidebar
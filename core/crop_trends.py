@@ -0,0 +1,212 @@
+"""
+Production trends of every state and crop
+
+The yearly production totals of every (state, crop) series are laid out as one
+series x year matrix, with NaN for the years a series does not report. A linear
+trend is fitted to all series at once by least squares: the sums the normal
+equations need (count, sum of years, of squared years, of production and of
+production x year) are masked matrix-vector products, so the slopes, growth
+rates and volatilities of every series come out of a handful of array
+operations. The matrix is built once per dataset version and the fits once per
+year window, after which ranking the crops of a state or the states of a crop
+only selects rows.
+
+Growth is the fitted slope as a share of the series' average production per
+year; volatility is the spread of the yearly totals around the trend line, as a
+share of the average.
+"""
+import threading
+
+from data_connectors.agriculture_data import get_series_totals, get_agriculture_dataset_version
+from utils.helpers import lookup_entity_code
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Fewest reported years a trend is fitted to
+MIN_TREND_YEARS = 3
+
+TREND_COLUMNS = ['State', 'Crop', 'First', 'Last', 'Years', 'Mean', 'Slope', 'Growth', 'Volatility']
+
+# Built tables, keyed by dataset version; built under the lock, so concurrent
+# first requests wait for one build instead of each running their own
+_TABLE_CACHE = {}
+_table_lock = threading.Lock()
+
+def _current_table():
+    """Trend table of the current dataset version; those of older versions are dropped"""
+    version = get_agriculture_dataset_version()
+    with _table_lock:
+        table = _TABLE_CACHE.get(version)
+        if table is None:
+            table = build_trend_table(get_series_totals())
+            if table is None:
+                return None
+            _TABLE_CACHE.clear()
+            _TABLE_CACHE[version] = table
+        return table
+
+def build_trend_table(totals):
+    """
+    Lay out yearly production totals as a (state, crop) series x year matrix
+    Returns a dictionary, or None without data
+    """
+    if totals is None or totals.empty:
+        return None
+    totals = totals[totals['Production'].notna() & totals['Year'].notna()]
+    if totals.empty:
+        return None
+
+    row_years = totals['Year'].to_numpy(dtype=np.int64)
+    years = np.unique(row_years)
+    series_positions, series = pd.factorize(pd.MultiIndex.from_arrays(
+        [totals['State'].astype(str), totals['Crop'].astype(str)]
+    ))
+    production = np.full((len(series), len(years)), np.nan)
+    production[series_positions, np.searchsorted(years, row_years)] = totals['Production'].to_numpy(dtype=np.float64)
+
+    states = np.asarray(series.get_level_values(0), dtype=object)
+    crops = np.asarray(series.get_level_values(1), dtype=object)
+    # Series are matched on the entity codes, so any spelling of a name selects them
+    state_codes = {name: lookup_entity_code('state', name) for name in set(states)}
+    crop_codes = {name: lookup_entity_code('crop', name) for name in set(crops)}
+    return {
+        'states': states,
+        'crops': crops,
+        'state_codes': np.array([-1 if state_codes[name] is None else state_codes[name] for name in states]),
+        'crop_codes': np.array([-1 if crop_codes[name] is None else crop_codes[name] for name in crops]),
+        'years': years,
+        'production': production,
+        'fits': {},
+    }
+
+def fit_trends(table, year_start=None, year_end=None):
+    """
+    Fit a linear trend to every series over a year window at once
+    Returns a dictionary of per-series arrays (first and last year, count, mean, slope,
+    growth and volatility), NaN for series with fewer than MIN_TREND_YEARS reported years
+    """
+    years = table['years']
+    window = np.ones(len(years), dtype=bool)
+    if year_start:
+        window &= years >= int(year_start)
+    if year_end:
+        window &= years <= int(year_end)
+    if not window.any():
+        series = len(table['states'])
+        nothing = np.full(series, np.nan)
+        return {'first': np.full(series, -1), 'last': np.full(series, -1), 'count': np.zeros(series, dtype=np.int64),
+                'mean': nothing, 'slope': nothing, 'growth': nothing, 'volatility': nothing}
+    values = table['production'][:, window]
+    window_years = years[window]
+
+    reported = ~np.isnan(values)
+    weights = reported.astype(np.float64)
+    filled = np.where(reported, values, 0.0)
+    # Years are counted from the window's start, which keeps the sums well conditioned
+    x = (window_years - window_years[0]).astype(np.float64)
+    count = weights.sum(axis=1)
+    sum_x = weights @ x
+    sum_xx = weights @ (x * x)
+    sum_y = filled.sum(axis=1)
+    sum_xy = filled @ x
+
+    fitted = count >= MIN_TREND_YEARS
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, sum_y / count, np.nan)
+        slope = np.where(fitted, (count * sum_xy - sum_x * sum_y) / (count * sum_xx - sum_x ** 2), np.nan)
+        intercept = (sum_y - slope * sum_x) / count
+        residuals = np.where(reported, values - (intercept[:, None] + slope[:, None] * x), 0.0)
+        spread = np.sqrt((residuals ** 2).sum(axis=1) / (count - 2))
+        growth = np.where(fitted & (mean > 0), slope / mean * 100, np.nan)
+        volatility = np.where(fitted & (mean > 0), spread / mean * 100, np.nan)
+
+    any_reported = reported.any(axis=1)
+    first = np.where(any_reported, window_years[reported.argmax(axis=1)], -1)
+    last = np.where(any_reported, window_years[::-1][reported[:, ::-1].argmax(axis=1)], -1)
+    return {'first': first, 'last': last, 'count': count.astype(np.int64), 'mean': mean,
+            'slope': slope, 'growth': growth, 'volatility': volatility}
+
+def get_trend_fits(year_start=None, year_end=None):
+    """
+    Trend fits of the current dataset version, computed once per year window
+    Returns (table, fits) or (None, None) without data
+    """
+    table = _current_table()
+    if table is None:
+        return None, None
+    key = (int(year_start) if year_start else None, int(year_end) if year_end else None)
+    with _table_lock:
+        fits = table['fits'].get(key)
+        if fits is None:
+            fits = table['fits'][key] = fit_trends(table, *key)
+    return table, fits
+
+def get_crop_trends(state=None, crop=None, year_start=None, year_end=None):
+    """
+    Fitted trends of the series of a state and/or crop (all series without either)
+    Returns a pandas DataFrame with State, Crop, First, Last, Years, Mean, Slope, Growth and Volatility;
+    series with too few reported years are left out
+    """
+    table, fits = get_trend_fits(year_start, year_end)
+    if table is None:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+
+    selected = ~np.isnan(fits['slope'])
+    for kind, name, codes in (('state', state, table['state_codes']), ('crop', crop, table['crop_codes'])):
+        if not name:
+            continue
+        code = lookup_entity_code(kind, name)
+        if code is None:
+            return pd.DataFrame(columns=TREND_COLUMNS)
+        selected &= codes == code
+    return _trend_frame(table, fits, np.flatnonzero(selected))
+
+def fit_frame(totals, year_start=None, year_end=None):
+    """
+    Fit trends to the series of a State, Crop, Year and Production frame directly,
+    for series outside the dataset's table (e.g. mock data generated per request)
+    Returns a pandas DataFrame as get_crop_trends does
+    """
+    table = build_trend_table(totals)
+    if table is None:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+    fits = fit_trends(table, year_start, year_end)
+    return _trend_frame(table, fits, np.flatnonzero(~np.isnan(fits['slope'])))
+
+def _trend_frame(table, fits, rows):
+    return pd.DataFrame({
+        'State': table['states'][rows],
+        'Crop': table['crops'][rows],
+        'First': fits['first'][rows],
+        'Last': fits['last'][rows],
+        'Years': fits['count'][rows],
+        'Mean': fits['mean'][rows],
+        'Slope': fits['slope'][rows],
+        'Growth': fits['growth'][rows],
+        'Volatility': fits['volatility'][rows],
+    }, columns=TREND_COLUMNS)
+
+def rank_trends(state=None, crop=None, year_start=None, year_end=None, declining=False, n=None):
+    """
+    Series of a state and/or crop ranked by growth: fastest growing first, or fastest
+    declining first with declining=True; only series trending that way are kept
+    Returns a pandas DataFrame as get_crop_trends does
+    """
+    return rank_frame(get_crop_trends(state, crop, year_start, year_end), declining, n)
+
+def rank_frame(trends, declining=False, n=None):
+    """
+    Rank fitted trends (e.g. from fit_frame) as rank_trends does; tied series keep their order
+    """
+    trends = trends[trends['Growth'] < 0] if declining else trends[trends['Growth'] > 0]
+    trends = trends.sort_values('Growth', ascending=declining, kind='stable')
+    return trends.head(n) if n else trends
+
+def clear_trend_tables():
+    """
+    Drop all built tables (e.g. after a dataset refresh)
+    """
+    with _table_lock:
+        _TABLE_CACHE.clear()
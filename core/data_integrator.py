@@ -1,9 +1,25 @@
-import pandas as pd
-from data_connectors.agriculture_data import fetch_agriculture_data, get_top_crops_by_production, get_agriculture_data_source
-from data_connectors.climate_data import fetch_climate_data, get_average_rainfall, get_climate_data_source
-from utils.constants import DATA_GOV_BASE_URL
-import matplotlib.pyplot as plt
-import numpy as np
+import threading
+from data_connectors.agriculture_data import get_agriculture_data_source, get_agriculture_dataset_version
+from data_connectors.climate_data import fetch_climate_data, fetch_climate_data_for_states, get_climate_data_source, get_climate_dataset_version
+from data_connectors.versioning import fallback_count
+from core.rainfall_index import get_rainfall_index, get_rainfall_indexes, query_state_index, get_state_series
+from core.seasonal_rainfall import get_season_series, get_season_averages, describe_months, season_year_label
+from core.rainfall_anomalies import (get_state_anomalies, get_year_anomalies, latest_anomaly_year,
+                                     classify_departures, drought_severity)
+from core.district_leaderboards import top_districts, top_districts_of_frame, latest_crop_year
+from core.crop_trends import get_crop_trends, rank_frame, fit_frame
+from core.query_planner import run_intent_plan
+from utils.constants import DATA_GOV_BASE_URL, INTENT_DATASETS, INDIAN_STATES, DROUGHT_DEPARTURE
+from utils.cache import cache_get, cache_set, freeze_value
+from utils.metrics import inc_counter, time_events
+from utils.lazy_import import lazy_import
+from core.profiling import profile_events
+from config import ANSWER_CACHE_SIZE, PROFILING_ENABLED
+
+# Heavy dependencies are imported on first use to keep start-up fast;
+# matplotlib is only imported by _new_chart when a chart is rendered
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
 def generate_answer(intent, params):
     """
@@ -11,16 +27,26 @@ def generate_answer(intent, params):
 
     Returns answer text, chart (if any), and data sources
     """
+    return _collect_answer(_answer_events(intent, params))
+
+def _generate_answer_uncached(intent, params):
+    """
+    Run the handler for an intent
+    """
     answer = ""
     chart = None
     sources = []
     
     if intent == "compare_rainfall":
         answer, chart, sources = _handle_compare_rainfall(params)
+    elif intent == "compare_crop_production":
+        answer, chart, sources = _handle_compare_crop_production(params)
     elif intent == "crop_trend":
         answer, chart, sources = _handle_crop_trend(params)
     elif intent == "highest_wheat_production":
         answer, chart, sources = _handle_highest_wheat_production(params)
+    elif intent == "top_districts":
+        answer, chart, sources = _handle_top_districts(params)
     elif intent == "top_crops":
         answer, chart, sources = _handle_top_crops(params)
     elif intent == "top_crops_by_type":
@@ -29,8 +55,22 @@ def generate_answer(intent, params):
         answer, chart, sources = _handle_analyze_correlation(params)
     elif intent == "climate_info":
         answer, chart, sources = _handle_climate_info(params)
+    elif intent == "seasonal_rainfall":
+        answer, chart, sources = _handle_seasonal_rainfall(params)
+    elif intent == "drought_years":
+        answer, chart, sources = _handle_drought_years(params)
+    elif intent == "rainfall_anomalies":
+        answer, chart, sources = _handle_rainfall_anomalies(params)
     elif intent == "crop_production":
         answer, chart, sources = _handle_crop_production(params)
+    elif intent == "highest_yield_district":
+        answer, chart, sources = _handle_highest_yield_district(params)
+    elif intent == "yield_trend":
+        answer, chart, sources = _handle_yield_trend(params)
+    elif intent == "fastest_growing_crops":
+        answer, chart, sources = _handle_fastest_growing_crops(params)
+    elif intent == "crop_growth_by_state":
+        answer, chart, sources = _handle_crop_growth_by_state(params)
     elif intent == "general_query":
         answer, chart, sources = _handle_general_query(params)
     else:
@@ -39,6 +79,124 @@ def generate_answer(intent, params):
     
     return answer, chart, sources
 
+def generate_answer_stream(intent, params):
+    """
+    Generate an answer progressively
+
+    Yields (kind, payload) events as they become available:
+    'interpretation' (how the query was understood), 'headline' (summary text),
+    'row' (one line of per-state detail), 'chart' (a figure) and 'sources' (list)
+    """
+    yield 'interpretation', describe_query(intent, params)
+    yield from _answer_events(intent, params)
+
+def _answer_key(intent, params):
+    """
+    Answer cache key; includes the versions of the datasets the intent reads, so refreshed
+    data is never answered from the cache and a refresh of one dataset keeps the other's answers
+    """
+    datasets = INTENT_DATASETS.get(_delegated_intent(intent, params), ('agriculture', 'climate'))
+    versions = {'agriculture': get_agriculture_dataset_version, 'climate': get_climate_dataset_version}
+    return (tuple(versions[dataset]() for dataset in datasets), intent, freeze_value(params))
+
+def _answer_events(intent, params):
+    """
+    Answer events of a query, counted and timed per intent and profiled when PROFILING_ENABLED is set
+    """
+    inc_counter('samarth_queries_total', {'intent': intent})
+    events = time_events('samarth_handler_seconds', {'intent': intent}, _cached_answer_events(intent, params))
+    return profile_events(intent, params, events) if PROFILING_ENABLED else events
+
+def _cached_answer_events(intent, params):
+    """
+    Yield the answer events of a query, replaying them from the answer cache when possible
+    Answers backed by data (a non-empty source list) are cached once fully generated, unless
+    mock data stood in for a failed fetch meanwhile
+    """
+    key = _answer_key(intent, params)
+    hit, events = cache_get('answers', key)
+    if hit:
+        yield from events
+        return
+    
+    fallbacks = fallback_count()
+    streamer = _STREAMING_HANDLERS.get(intent)
+    events = []
+    for event in streamer(params) if streamer is not None else _whole_answer_events(intent, params):
+        events.append(event)
+        yield event
+    
+    if events and events[-1][0] == 'sources' and events[-1][1] and fallback_count() == fallbacks:
+        cache_set('answers', key, events, ANSWER_CACHE_SIZE)
+
+def _whole_answer_events(intent, params):
+    """Events for handlers without a streaming variant, which deliver their whole answer at once"""
+    answer, chart, sources = _generate_answer_uncached(intent, params)
+    yield 'headline', answer
+    if chart is not None:
+        yield 'chart', chart
+    yield 'sources', sources
+
+def describe_query(intent, params):
+    """
+    Describe how a query was interpreted, for display before any data is fetched
+    """
+    description = f"Intent: {intent.replace('_', ' ')}"
+    if params.get('states'):
+        description += f" | States: {', '.join(params['states'])}"
+    if params.get('crops'):
+        description += f" | Crops: {', '.join(params['crops'])}"
+    if params.get('months'):
+        description += f" | Months: {describe_months(*params['months'], season=params.get('season'))}"
+    if params.get('trend_direction') and intent in ('fastest_growing_crops', 'crop_growth_by_state'):
+        description += f" | Trend: {params['trend_direction']}"
+    if params.get('year_start') and params.get('year_end'):
+        description += f" | Years: {params['year_start']}-{params['year_end']}"
+    return description
+
+def _message_events(message, sources):
+    """Events for an answer that is just a message"""
+    yield 'headline', message
+    yield 'sources', sources
+
+def _collect_answer(events):
+    """
+    Collect streamed events into the (answer, chart, sources) tuple of generate_answer
+    """
+    lines = []
+    chart = None
+    sources = []
+    for kind, payload in events:
+        if kind in ('headline', 'row'):
+            lines.append(payload)
+        elif kind == 'chart':
+            chart = payload
+        elif kind == 'sources':
+            sources = payload
+    return "\n".join(lines), chart, sources
+
+def _chart_colors(count):
+    """Distinct bar colors for any number of entities"""
+    if count <= 3:
+        return ['blue', 'green', 'red'][:count]
+    from matplotlib import colormaps
+    return colormaps['tab20'](np.linspace(0, 1, count))
+
+# Cached answers share their figures between sessions and threads, and matplotlib
+# drawing is not thread-safe, so whoever renders an answer's chart holds this lock
+chart_render_lock = threading.Lock()
+
+def _new_chart(figsize=(10, 6)):
+    """
+    Create a figure and axes for a chart
+    Figures are built without pyplot, so they hold no global state and are
+    released as soon as the caller drops them
+    """
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    return fig, ax
+
 def _ensure_dataframe(df):
     """Ensure we have a proper pandas DataFrame"""
     if isinstance(df, pd.DataFrame):
@@ -48,43 +206,261 @@ def _ensure_dataframe(df):
 
 def _handle_climate_info(params):
     """Handle climate information queries"""
+    return _collect_answer(_stream_climate_info(params))
+
+def _stream_climate_info(params):
+    """Stream climate information: statistics first, then the trend chart"""
     states = params.get('states', [])
     year_start = params.get('year_start', 2016)
     year_end = params.get('year_end', 2020)
     
     if not states:
-        return "Please specify a state for climate information.", None, []
+        yield from _message_events("Please specify a state for climate information.", [])
+        return
     
     state = states[0]
     
-    # Fetch climate data
-    df = fetch_climate_data(state=state, year_start=year_start, year_end=year_end)
-    df = _ensure_dataframe(df)
+    # Serve statistics and the trend series from the prebuilt range index
+    index = get_rainfall_index(state)
+    stats = query_state_index(index, year_start, year_end) if index is not None else None
     
-    # Check if DataFrame is empty
-    if df.empty:
-        return f"No climate data available for {state}.", None, [get_climate_data_source()]
-    
-    # Calculate statistics
-    avg_rainfall = float(df['Rainfall'].mean())
-    min_rainfall = float(df['Rainfall'].min())
-    max_rainfall = float(df['Rainfall'].max())
+    if stats is not None:
+        years, rainfall = get_state_series(index, year_start, year_end)
+        avg_rainfall = stats['mean']
+        min_rainfall = stats['min']
+        max_rainfall = stats['max']
+    else:
+        # Fall back to fetching and reducing the frame directly
+        df = fetch_climate_data(state=state, year_start=year_start, year_end=year_end)
+        df = _ensure_dataframe(df)
+        
+        # Check if DataFrame is empty
+        if df.empty:
+            yield from _message_events(f"No climate data available for {state}.", [get_climate_data_source()])
+            return
+        
+        years = df['Year']
+        rainfall = df['Rainfall']
+        
+        # Calculate statistics
+        avg_rainfall = float(df['Rainfall'].mean())
+        min_rainfall = float(df['Rainfall'].min())
+        max_rainfall = float(df['Rainfall'].max())
     
     answer = f"Climate information for {state} ({year_start}-{year_end}):\n"
     answer += f"- Average annual rainfall: {avg_rainfall:.0f} mm\n"
     answer += f"- Minimum annual rainfall: {min_rainfall:.0f} mm\n"
     answer += f"- Maximum annual rainfall: {max_rainfall:.0f} mm"
+    yield 'headline', answer
     
     # Create rainfall trend chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(df['Year'], df['Rainfall'], marker='o', color='blue')
+    fig, ax = _new_chart(figsize=(10, 6))
+    ax.plot(years, rainfall, marker='o', color='blue')
     ax.set_ylabel('Rainfall (mm)')
     ax.set_xlabel('Year')
     ax.set_title(f'Annual Rainfall Trend in {state}')
-    plt.tight_layout()
+    fig.tight_layout()
+    yield 'chart', fig
     
-    sources = [get_climate_data_source()]
-    return answer, fig, sources
+    yield 'sources', [get_climate_data_source()]
+
+def _handle_seasonal_rainfall(params):
+    """Handle monthly and seasonal rainfall queries"""
+    return _collect_answer(_stream_seasonal_rainfall(params))
+
+def _stream_seasonal_rainfall(params):
+    """Stream seasonal rainfall: one state's years against its long-term average, or several states ranked"""
+    states = params.get('states', [])
+    first_month, last_month = params.get('months') or (6, 9)
+    period = describe_months(first_month, last_month, params.get('season'))
+    year_start = params.get('year_start', 2016)
+    year_end = params.get('year_end', 2020)
+    
+    if not states:
+        yield from _message_events(f"Please specify a state for {period} rainfall.", [])
+        return
+    
+    # Season totals for every state and year come precomputed from the monthly table
+    if len(states) == 1:
+        state = states[0]
+        series = get_season_series(state, first_month, last_month, year_start, year_end)
+        if series is None or not len(series['years']):
+            yield from _message_events(f"No monthly rainfall data available for {state} during {year_start}-{year_end}.", [get_climate_data_source()])
+            return
+        
+        average = float(series['values'].mean())
+        normal = series['normal']
+        departure = (average - normal) / normal * 100 if normal else 0.0
+        answer = f"{period[0].upper() + period[1:]} rainfall in {state} ({year_start}-{year_end}) averaged {average:.0f} mm, "
+        answer += f"{abs(departure):.0f}% {'above' if departure >= 0 else 'below'} its long-term average of {normal:.0f} mm."
+        yield 'headline', answer
+        for year, value in zip(series['years'], series['values']):
+            label = season_year_label(year, first_month, last_month)
+            yield 'row', f"- {label}: {float(value):.0f} mm ({(value - normal) / normal * 100:+.0f}%)" if normal else f"- {label}: {float(value):.0f} mm"
+        
+        fig, ax = _new_chart(figsize=(10, 6))
+        ax.bar(series['years'], series['values'], color='blue')
+        ax.axhline(normal, color='red', linestyle='--', label='Long-term average')
+        ax.set_ylabel('Rainfall (mm)')
+        ax.set_xlabel('Year')
+        ax.set_title(f'{period[0].upper() + period[1:]} Rainfall in {state}')
+        ax.legend()
+        fig.tight_layout()
+        yield 'chart', fig
+    else:
+        averages = get_season_averages(states, first_month, last_month, year_start, year_end)
+        if not averages:
+            yield from _message_events(f"No monthly rainfall data available for the specified states during {year_start}-{year_end}.", [get_climate_data_source()])
+            return
+        
+        ranked = sorted(averages.items(), key=lambda item: item[1], reverse=True)
+        answer = f"Average {period} rainfall ({year_start}-{year_end}): "
+        answer += ", ".join(f"{state} received {rainfall:.0f} mm" for state, rainfall in ranked) + "."
+        missing = [state for state in states if state not in averages]
+        if missing:
+            answer += f" No monthly data for {', '.join(missing)}."
+        yield 'headline', answer
+        if len(ranked) > 3:
+            for rank, (state, rainfall) in enumerate(ranked, start=1):
+                yield 'row', f"{rank}. {state}: {rainfall:.0f} mm"
+        
+        fig, ax = _new_chart(figsize=(max(10, 0.5 * len(ranked)), 6))
+        ax.bar([state for state, _ in ranked], [rainfall for _, rainfall in ranked], color=_chart_colors(len(ranked)))
+        ax.set_ylabel('Average Rainfall (mm)')
+        ax.set_title(f'Average {period[0].upper() + period[1:]} Rainfall ({year_start}-{year_end})')
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+        fig.tight_layout()
+        yield 'chart', fig
+    
+    yield 'sources', [get_climate_data_source()]
+
+def _anomaly_period(params):
+    """Month range and label of an anomaly question: a named season or month range, else the whole year"""
+    if params.get('months'):
+        first_month, last_month = params['months']
+        return first_month, last_month, describe_months(first_month, last_month, params.get('season'))
+    return 1, 12, "annual"
+
+def _departure_text(departure, zscore):
+    """A departure from the long-term average with its IMD category and z-score"""
+    text = f"{departure:+.0f}%, {classify_departures([departure])[0]}"
+    return text + (f", z {zscore:+.1f}" if not np.isnan(zscore) else "")
+
+def _handle_drought_years(params):
+    """Handle drought year queries"""
+    return _collect_answer(_stream_drought_years(params))
+
+def _stream_drought_years(params):
+    """Stream a state's drought years, or the states in drought in a year"""
+    states = params.get('states', [])
+    first_month, last_month, period = _anomaly_period(params)
+    year_start = params.get('year_start')
+    year_end = params.get('year_end')
+    
+    # Without a particular state, list the states in drought in one year
+    if not states or len(states) == len(INDIAN_STATES):
+        year = params.get('years', [None])[-1] or latest_anomaly_year(first_month, last_month)
+        anomalies = get_year_anomalies(year, first_month, last_month) if year else None
+        if anomalies is None or anomalies.empty:
+            yield from _message_events(f"No monthly rainfall data available to find drought years{f' in {year}' if year else ''}.", [get_climate_data_source()])
+            return
+        droughts = anomalies[anomalies['Departure'] < DROUGHT_DEPARTURE]
+        label = season_year_label(year, first_month, last_month)
+        if droughts.empty:
+            yield 'headline', f"No state had a drought in its {period} rainfall in {label} (a deficiency of more than {-DROUGHT_DEPARTURE}%)."
+        else:
+            yield 'headline', f"{len(droughts)} state{'s' if len(droughts) != 1 else ''} had a drought in {period} rainfall in {label}:"
+            for state, departure, zscore, severity in zip(droughts['State'], droughts['Departure'], droughts['ZScore'],
+                                                          drought_severity(droughts['Departure'])):
+                yield 'row', f"- {state}: {severity} ({_departure_text(departure, zscore)})"
+        yield 'sources', [get_climate_data_source()]
+        return
+    
+    # Departures of every year come precomputed for every state
+    for state in states:
+        anomalies = get_state_anomalies(state, first_month, last_month, year_start, year_end)
+        if anomalies is None or not len(anomalies['years']):
+            yield 'row', f"No monthly rainfall data available for {state}{f' during {year_start}-{year_end}' if year_start else ''}."
+            continue
+        
+        years = anomalies['years']
+        departures = anomalies['departure']
+        normal = anomalies['normal']
+        severity = drought_severity(departures)
+        if len(years) == 1:
+            verdict = f"a {severity} year" if severity[0] else "not a drought year"
+            yield 'row', (f"In {season_year_label(years[0], first_month, last_month)}, {state} received {float(anomalies['values'][0]):.0f} mm of {period} rainfall against "
+                          f"its long-term average of {normal:.0f} mm ({_departure_text(departures[0], anomalies['zscore'][0])}): {verdict}.")
+            continue
+        
+        drought = np.flatnonzero(departures < DROUGHT_DEPARTURE)
+        span = f"{season_year_label(years[0], first_month, last_month)}{' to ' if first_month > last_month else '-'}{season_year_label(years[-1], first_month, last_month)}"
+        if len(drought):
+            yield 'row', (f"{state} had {len(drought)} drought year{'s' if len(drought) != 1 else ''} in {period} rainfall "
+                          f"during {span} (long-term average {normal:.0f} mm):")
+            for i in drought[np.argsort(departures[drought], kind='stable')]:
+                yield 'row', f"- {season_year_label(years[i], first_month, last_month)}: {float(anomalies['values'][i]):.0f} mm, {severity[i]} ({_departure_text(departures[i], anomalies['zscore'][i])})"
+        else:
+            driest = np.argsort(departures, kind='stable')[:3]
+            yield 'row', (f"{state} had no drought year in {period} rainfall during {span} (long-term average {normal:.0f} mm). "
+                          "Driest years: " + ", ".join(f"{season_year_label(years[i], first_month, last_month)} ({_departure_text(departures[i], anomalies['zscore'][i])})" for i in driest) + ".")
+        
+        if state == states[0]:
+            fig, ax = _new_chart(figsize=(10, 6))
+            ax.bar(years, departures, color=np.where(departures < DROUGHT_DEPARTURE, 'red', np.where(departures < 0, 'orange', 'blue')))
+            ax.axhline(DROUGHT_DEPARTURE, color='red', linestyle='--', label='Drought threshold')
+            ax.axhline(0, color='black', linewidth=0.8)
+            ax.set_ylabel('Departure from long-term average (%)')
+            ax.set_xlabel('Year')
+            ax.set_title(f'{period[0].upper() + period[1:]} Rainfall Departures in {state}')
+            ax.legend()
+            fig.tight_layout()
+            yield 'chart', fig
+    
+    yield 'sources', [get_climate_data_source()]
+
+def _handle_rainfall_anomalies(params):
+    """Handle rainfall deficit and excess queries"""
+    return _collect_answer(_stream_rainfall_anomalies(params))
+
+def _stream_rainfall_anomalies(params):
+    """Stream the states with the largest rainfall deficits (or excesses) in a year"""
+    states = params.get('states', [])
+    first_month, last_month, period = _anomaly_period(params)
+    excess = params.get('anomaly') == 'excess'
+    year = params.get('years', [None])[-1] or latest_anomaly_year(first_month, last_month)
+    
+    # One year's column of the precomputed departures, ranked
+    scope = states if states and len(states) < len(INDIAN_STATES) else None
+    anomalies = get_year_anomalies(year, first_month, last_month, scope) if year else None
+    if anomalies is None or anomalies.empty:
+        yield from _message_events(f"No monthly rainfall data available for {period} rainfall{f' in {year}' if year else ''}.", [get_climate_data_source()])
+        return
+    
+    ranked = anomalies.iloc[::-1] if excess else anomalies
+    ranked = ranked[ranked['Departure'] > 0] if excess else ranked[ranked['Departure'] < 0]
+    label, labels = ("excess", "excesses") if excess else ("deficit", "deficits")
+    year = season_year_label(year, first_month, last_month)
+    if ranked.empty:
+        yield from _message_events(f"No state had a {period} rainfall {label} in {year}.", [get_climate_data_source()])
+        return
+    
+    shown = ranked.head(10)
+    yield 'headline', f"Largest {period} rainfall {labels} in {year}, against each state's long-term average:"
+    for state, rainfall, normal, departure, zscore in zip(shown['State'], shown['Rainfall'], shown['Normal'],
+                                                          shown['Departure'], shown['ZScore']):
+        yield 'row', f"- {state}: {rainfall:.0f} mm vs {normal:.0f} mm ({_departure_text(departure, zscore)})"
+    
+    fig, ax = _new_chart(figsize=(10, max(4, 0.5 * len(shown))))
+    ax.barh(list(shown['State'])[::-1], shown['Departure'].to_numpy()[::-1], color='blue' if excess else 'red')
+    ax.axvline(0, color='black', linewidth=0.8)
+    ax.set_xlabel('Departure from long-term average (%)')
+    ax.set_title(f'Largest {period[0].upper() + period[1:]} Rainfall {labels.title()} in {year}')
+    fig.tight_layout()
+    yield 'chart', fig
+    yield 'sources', [get_climate_data_source()]
 
 def _handle_crop_production(params):
     """Handle crop production queries"""
@@ -99,8 +475,8 @@ def _handle_crop_production(params):
     state = states[0]
     crop = crops[0] if crops else "Rice"  # Default to rice
     
-    # Fetch data
-    df = fetch_agriculture_data(state=state, crop=crop, year_start=year_start, year_end=year_end)
+    # Fetch data through the crop production plan
+    df = run_intent_plan('crop_production', state=state, crop=crop, year_start=year_start, year_end=year_end)
     df = _ensure_dataframe(df)
     
     # Check if DataFrame is empty
@@ -111,27 +487,87 @@ def _handle_crop_production(params):
     
     answer = f"{crop} production in {state} was {total_production:,.0f} units during {year_start}-{year_end}."
     
-    # If we have district-wise data, show top districts
-    if len(df) > 1:
-        # Sort by production and get top 3
-        sorted_df = df.sort_values(by='Production', ascending=False)
-        top_districts = sorted_df.head(3)
+    # If we have district-wise data, show the top districts from the leaderboards
+    leaders = _top_districts(crop, year_start, year_end, state, k=3, fetched=df)
+    if len(leaders) > 1:
         answer += "\n\nTop producing districts:"
-        for _, row in top_districts.iterrows():
-            answer += f"\n- {row['District']}: {float(row['Production']):,.0f} units"
+        for district, production in zip(leaders['District'], leaders['Production']):
+            answer += f"\n- {district}: {float(production):,.0f} units"
     
     sources = [get_agriculture_data_source()]
     return answer, None, sources
 
+def _top_districts(crop, year_start, year_end, state, k, fetched=None):
+    """
+    Leading districts from the leaderboard index; slices outside it (e.g. mock data
+    generated per request) are ranked from their fetched rows
+    """
+    leaders = top_districts(crop, year_start, year_end, state, k)
+    if leaders.empty and state:
+        if fetched is None:
+            fetched = run_intent_plan('crop_production', state=state, crop=crop, year_start=year_start, year_end=year_end)
+        fetched = _ensure_dataframe(fetched)
+        leaders = top_districts_of_frame(fetched.assign(State=state) if not fetched.empty else fetched, k)
+    return leaders
+
+def _handle_top_districts(params):
+    """Handle top producing district queries, in a state or nationwide"""
+    crops = params.get('crops', [])
+    states = params.get('states', [])
+    crop = crops[0] if crops else "Rice"  # Default to rice
+    k = params.get('top_n', 10)
+    scopes = states if states and len(states) < len(INDIAN_STATES) else [None]
+    
+    # Without years, rank the latest year the crop has data for
+    if params.get('year_start'):
+        year_start = params['year_start']
+        year_end = params.get('year_end') or latest_crop_year(crop) or year_start
+    else:
+        year_start = year_end = latest_crop_year(crop) or 2018
+    period = f"{year_start}" if year_start == year_end else f"{year_start}-{year_end}"
+    
+    lines = []
+    chart = None
+    for state in scopes:
+        scope = state or "India"
+        leaders = _top_districts(crop, year_start, year_end, state, k)
+        if leaders.empty:
+            lines.append(f"No district {crop} production data available for {scope} in {period}.")
+            continue
+        heading = f"Top {len(leaders)} {crop} producing districts" if len(leaders) > 1 else f"Top {crop} producing district"
+        lines.append(f"{heading} in {scope} ({period}):")
+        for rank, (district, district_state, production) in enumerate(zip(leaders['District'], leaders['State'], leaders['Production']), start=1):
+            place = district if state else f"{district} ({district_state})"
+            lines.append(f"{rank}. {place}: {float(production):,.0f} units")
+        if chart is None:
+            labels = list(leaders['District']) if state else [f"{district} ({district_state})" for district, district_state in zip(leaders['District'], leaders['State'])]
+            chart, ax = _new_chart(figsize=(10, max(4, 0.5 * len(leaders))))
+            ax.barh(labels[::-1], leaders['Production'].to_numpy(dtype=float)[::-1], color='green')
+            ax.set_xlabel('Production')
+            ax.set_title(f'Top {crop} Producing Districts in {scope} ({period})')
+            chart.tight_layout()
+    
+    return "\n".join(lines), chart, [get_agriculture_data_source()]
+
+def _delegated_intent(intent, params):
+    """
+    Intent whose handler answers a query: general queries naming states are answered as
+    crop production (with crops) or climate information (without)
+    """
+    if intent != "general_query" or not params.get('states'):
+        return intent
+    return "crop_production" if params.get('crops') else "climate_info"
+
 def _handle_general_query(params):
     """Handle general queries"""
     states = params.get('states', [])
     crops = params.get('crops', [])
     
-    if states and not crops:
+    delegated = _delegated_intent("general_query", params)
+    if delegated == "climate_info":
         # State-specific query, likely about climate
         return _handle_climate_info(params)
-    elif states and crops:
+    elif delegated == "crop_production":
         # State and crop-specific query
         return _handle_crop_production(params)
     elif crops and not states:
@@ -143,6 +579,10 @@ def _handle_general_query(params):
 
 def _handle_compare_rainfall(params):
     """Handle rainfall comparison queries"""
+    return _collect_answer(_stream_compare_rainfall(params))
+
+def _stream_compare_rainfall(params):
+    """Stream a rainfall comparison: averages first, then the bar chart"""
     print(f"DEBUG: compare_rainfall called with params: {params}")
     
     states = params.get('states', [])
@@ -163,36 +603,123 @@ def _handle_compare_rainfall(params):
     print(f"DEBUG: Using year range: {year_start}-{year_end}")
     
     if len(states) < 2:
-        return "Please specify at least two states for comparison.", None, []
+        yield from _message_events("Please specify at least two states for comparison.", [])
+        return
     
+    # Averages for every requested state, served from indexes built in one batched pass
+    indexes = get_rainfall_indexes(states)
     rainfall_data = {}
-    for state in states[:3]:  # Limit to 3 states
-        df = fetch_climate_data(state=state, year_start=year_start, year_end=year_end)
-        df = _ensure_dataframe(df)
-        if df.empty:
-            continue
-        avg_rainfall = float(get_average_rainfall(df))
-        rainfall_data[state] = avg_rainfall
+    missing_states = []
+    for state in states:
+        index = indexes.get(state.lower())
+        stats = query_state_index(index, year_start, year_end) if index is not None else None
+        if stats is not None:
+            rainfall_data[state] = stats['mean']
+        else:
+            missing_states.append(state)
+    
+    # Fall back to one batched fetch for states the indexes do not cover
+    if missing_states:
+        df = _ensure_dataframe(fetch_climate_data_for_states(missing_states, year_start=year_start, year_end=year_end))
+        if not df.empty:
+            averages = df.groupby(df['State'].str.lower())['Rainfall'].mean()
+            for state in missing_states:
+                if state.lower() in averages.index:
+                    rainfall_data[state] = float(averages[state.lower()])
     
     if not rainfall_data:
-        return "No climate data available for the specified states.", None, [get_climate_data_source()]
+        yield from _message_events("No climate data available for the specified states.", [get_climate_data_source()])
+        return
+    
+    # Rank states from highest to lowest average rainfall
+    ranked = sorted(rainfall_data.items(), key=lambda item: item[1], reverse=True)
     
     # Generate answer
-    state_rainfall_list = [f"{state} received {rainfall:.0f} mm" for state, rainfall in rainfall_data.items()]
+    state_rainfall_list = [f"{state} received {rainfall:.0f} mm" for state, rainfall in ranked]
     answer = f"Average rainfall comparison ({year_start}-{year_end}): " + ", ".join(state_rainfall_list) + "."
+    yield 'headline', answer
+    
+    # A ranked table is easier to read than a long sentence for region-wide comparisons
+    if len(ranked) > 3:
+        for rank, (state, rainfall) in enumerate(ranked, start=1):
+            yield 'row', f"{rank}. {state}: {rainfall:.0f} mm"
     
     # Create bar chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    states_list = list(rainfall_data.keys())
-    rainfall_list = list(rainfall_data.values())
-    ax.bar(states_list, rainfall_list, color=['blue', 'green', 'red'])
+    fig, ax = _new_chart(figsize=(max(10, 0.5 * len(ranked)), 6))
+    states_list = [state for state, _ in ranked]
+    rainfall_list = [rainfall for _, rainfall in ranked]
+    ax.bar(states_list, rainfall_list, color=_chart_colors(len(ranked)))
     ax.set_ylabel('Average Rainfall (mm)')
     ax.set_title(f'Average Rainfall Comparison ({year_start}-{year_end})')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
+    yield 'chart', fig
     
-    sources = [get_climate_data_source()]
-    return answer, fig, sources
+    yield 'sources', [get_climate_data_source()]
+
+def _handle_compare_crop_production(params):
+    """Handle multi-state and multi-crop production comparison queries"""
+    return _collect_answer(_stream_compare_crop_production(params))
+
+def _stream_compare_crop_production(params):
+    """Stream a production comparison: ranked table first, then the grouped chart"""
+    states = params.get('states', [])
+    crops = params.get('crops', [])
+    year_start = params.get('year_start', 2018)
+    year_end = params.get('year_end', 2018)
+    
+    if not states:
+        yield from _message_events("Please specify the states to compare.", [])
+        return
+    
+    if len(states) < 2 and len(crops) < 2:
+        yield from _message_events("Please specify at least two states or two crops for comparison.", [])
+        return
+    
+    crops = crops or ["Rice"]  # Default to rice
+    
+    # One batched plan fetches every (state, crop) slice and sums production per pair
+    totals = run_intent_plan('compare_crop_production', states=states, crops=crops, year_start=year_start, year_end=year_end)
+    totals = _ensure_dataframe(totals)
+    
+    if totals.empty:
+        yield from _message_events(f"No production data available for {', '.join(crops)} in the specified states during {year_start}-{year_end}.", [get_agriculture_data_source()])
+        return
+    
+    # States x crops table, ranked by total production
+    table = totals.pivot_table(index='State', columns='Crop', values='Production', aggfunc='sum', fill_value=0)
+    crop_columns = list(table.columns)
+    table['Total'] = table[crop_columns].sum(axis=1)
+    table = table.sort_values('Total', ascending=False)
+    
+    leader = table.index[0]
+    answer = f"{', '.join(crops)} production comparison ({year_start}-{year_end}) across {len(table)} states: "
+    answer += f"{leader} ranks first with {float(table.loc[leader, 'Total']):,.0f} units."
+    yield 'headline', answer
+    
+    values = table[crop_columns].to_numpy()
+    for rank, (state, total, row_values) in enumerate(zip(table.index, table['Total'], values), start=1):
+        details = ", ".join(f"{crop} {float(value):,.0f}" for crop, value in zip(crop_columns, row_values))
+        yield 'row', f"{rank}. {state}: {float(total):,.0f} units ({details})"
+    
+    # Create grouped bar chart with one bar per crop for each state
+    fig, ax = _new_chart(figsize=(max(10, min(30, 0.4 * len(table) * len(crop_columns))), 6))
+    positions = np.arange(len(table))
+    width = 0.8 / len(crop_columns)
+    colors = _chart_colors(len(crop_columns))
+    for i, crop in enumerate(crop_columns):
+        ax.bar(positions + i * width - 0.4 + width / 2, table[crop].values, width, label=crop, color=colors[i])
+    ax.set_xticks(positions)
+    ax.set_xticklabels(table.index, rotation=45, ha='right')
+    ax.set_ylabel('Production')
+    ax.set_title(f'Crop Production Comparison ({year_start}-{year_end})')
+    ax.legend()
+    fig.tight_layout()
+    yield 'chart', fig
+    
+    yield 'sources', [get_agriculture_data_source()]
 
 def _handle_crop_trend(params):
     """Handle crop trend analysis queries"""
@@ -207,29 +734,128 @@ def _handle_crop_trend(params):
     state = states[0]
     crop = crops[0] if crops else "Rice"  # Default to rice
     
-    # Fetch data
-    df = fetch_agriculture_data(state=state, crop=crop, year_start=year_start, year_end=year_end)
+    # Yearly totals through the crop trend plan
+    df = run_intent_plan('crop_trend', state=state, crop=crop, year_start=year_start, year_end=year_end)
     df = _ensure_dataframe(df)
     
     if df.empty:
         return f"No data available for {crop} production in {state}.", None, [get_agriculture_data_source()]
     
-    # Calculate trend
-    avg_production = float(df['Production'].mean())
-    
-    answer = f"{crop} production in {state} averaged {avg_production:,.0f} units from {year_start}-{year_end}."
+    years = df['Year'].to_numpy()
+    production = df['Production'].to_numpy(dtype=float)
+    answer = f"{crop} production in {state} averaged {float(production.mean()):,.0f} units a year from {year_start}-{year_end}."
+    
+    # The fitted trend comes precomputed with those of every other state and crop
+    trends = get_crop_trends(state, crop, year_start, year_end)
+    if trends.empty:
+        # Series the dataset's table lacks (e.g. mock data generated for this request) are fitted here
+        trends = fit_frame(df.assign(State=state, Crop=crop), year_start, year_end)
+    fit = None if trends.empty else trends.iloc[0]
+    if fit is not None:
+        direction = "rising" if fit['Slope'] > 0 else "falling"
+        answer += (f" Over {int(fit['First'])}-{int(fit['Last'])} it has been {direction} by about "
+                   f"{abs(float(fit['Slope'])):,.0f} units a year ({float(fit['Growth']):+.1f}% of the average per year), "
+                   f"with yearly totals typically {float(fit['Volatility']):.0f}% off the trend line.")
     
     # Create trend chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(df['Year'], df['Production'], marker='o')
+    fig, ax = _new_chart(figsize=(10, 6))
+    ax.plot(years, production, marker='o', label='Production')
+    if fit is not None:
+        fitted = float(fit['Mean']) + float(fit['Slope']) * (years - years.mean())
+        ax.plot(years, fitted, linestyle='--', color='red', label='Trend')
+        ax.legend()
     ax.set_ylabel('Production')
     ax.set_xlabel('Year')
     ax.set_title(f'{crop} Production Trend in {state}')
-    plt.tight_layout()
+    fig.tight_layout()
     
     sources = [get_agriculture_data_source()]
     return answer, fig, sources
 
+def _growth_lines(names, ranked):
+    """Ranked lines of a growth answer, one per series"""
+    return [
+        f"- {name}: {growth:+.1f}% a year ({slope:+,.0f} units a year, {first}-{last}, volatility {volatility:.0f}%)"
+        for name, growth, slope, first, last, volatility in zip(
+            names, ranked['Growth'], ranked['Slope'], ranked['First'], ranked['Last'], ranked['Volatility'])
+    ]
+
+def _growth_chart(labels, growth, title):
+    """Horizontal bars of yearly growth rates"""
+    fig, ax = _new_chart(figsize=(10, max(4, 0.5 * len(labels))))
+    ax.barh(labels[::-1], growth[::-1], color=['green' if value > 0 else 'red' for value in growth[::-1]])
+    ax.axvline(0, color='black', linewidth=0.8)
+    ax.set_xlabel('Trend (% of average production per year)')
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
+
+def _series_trends(year_start, year_end, state=None, crop=None, states=None):
+    """
+    Fitted trends of a state's crops or of a crop's states, from the trends fitted for every
+    series at once; when the dataset's table has none (e.g. mock data generated per request),
+    the series are fetched over the crop trend window and fitted here, as for a crop trend
+    """
+    trends = get_crop_trends(state, crop, year_start, year_end)
+    if trends.empty:
+        year_start, year_end = year_start or 2010, year_end or 2020
+        totals = run_intent_plan('crop_series', state=state, crop=crop, states=states,
+                                 crops=[crop] if crop and states else None, year_start=year_start, year_end=year_end)
+        trends = fit_frame(_ensure_dataframe(totals), year_start, year_end)
+    return trends
+
+def _handle_fastest_growing_crops(params):
+    """Handle fastest growing (or declining) crops queries"""
+    states = params.get('states', [])
+    year_start = params.get('year_start')
+    year_end = params.get('year_end')
+    declining = params.get('trend_direction') == 'declining'
+    label = "declining" if declining else "growing"
+    
+    if not states:
+        return f"Please specify a state to find its fastest {label} crops.", None, []
+    
+    # Rankings only select rows of the trends fitted for every state and crop at once
+    lines = []
+    chart = None
+    for state in states:
+        ranked = rank_frame(_series_trends(year_start, year_end, state=state), declining, n=5)
+        if ranked.empty:
+            lines.append(f"No crop in {state} shows a {label} production trend over the years with data.")
+            continue
+        lines.append(f"Fastest {label} crops in {state}, by the trend of yearly production:")
+        lines.extend(_growth_lines(ranked['Crop'], ranked))
+        if chart is None:
+            chart = _growth_chart(list(ranked['Crop']), ranked['Growth'].to_numpy(dtype=float), f'Fastest {label.title()} Crops in {state}')
+    
+    return "\n".join(lines), chart, [get_agriculture_data_source()]
+
+def _handle_crop_growth_by_state(params):
+    """Handle queries for the states where a crop is growing or declining"""
+    crops = params.get('crops', [])
+    states = params.get('states', [])
+    year_start = params.get('year_start')
+    year_end = params.get('year_end')
+    declining = params.get('trend_direction') == 'declining'
+    label = "declining" if declining else "growing"
+    crop = crops[0] if crops else "Rice"  # Default to rice
+    
+    scope = states if states and len(states) < len(INDIAN_STATES) else None
+    ranked = rank_frame(_series_trends(year_start, year_end, crop=crop, states=scope or INDIAN_STATES), declining)
+    if scope:
+        ranked = ranked[ranked['State'].isin(scope)]
+    
+    if ranked.empty:
+        return f"No state shows a {label} {crop} production trend over the years with data.", None, [get_agriculture_data_source()]
+    
+    shown = ranked.head(10)
+    answer = f"{crop} production is {label} in {len(ranked)} state{'s' if len(ranked) != 1 else ''}"
+    answer += f"; the fastest {label}:" if len(ranked) > len(shown) else ":"
+    answer += "\n" + "\n".join(_growth_lines(shown['State'], shown))
+    
+    chart = _growth_chart(list(shown['State']), shown['Growth'].to_numpy(dtype=float), f'States Where {crop} Production Is {label.title()}')
+    return answer, chart, [get_agriculture_data_source()]
+
 def _handle_highest_wheat_production(params):
     """Handle highest wheat production queries"""
     states = params.get('states', [])
@@ -240,71 +866,150 @@ def _handle_highest_wheat_production(params):
     
     state = states[0]
     
-    # Fetch data for wheat in the specified state and year
-    df = fetch_agriculture_data(state=state, crop="Wheat", year_start=year, year_end=year)
-    df = _ensure_dataframe(df)
+    # The leading district comes from the precomputed district leaderboards
+    leaders = _top_districts("Wheat", year, year, state, k=1)
     
-    if df.empty:
+    if leaders.empty:
         return f"No wheat production data available for {state} in {year}.", None, [get_agriculture_data_source()]
     
-    # Find district with highest production
-    max_idx = df['Production'].idxmax()
-    max_production_row = df.loc[max_idx]
-    district = max_production_row['District']
-    production = float(max_production_row['Production'])
+    district = leaders['District'].iloc[0]
+    production = float(leaders['Production'].iloc[0])
     
     answer = f"In {year}, {district} district in {state} produced the most wheat with {production:,.0f} units."
     
     sources = [get_agriculture_data_source()]
     return answer, None, sources
 
+def _yield_scopes(states):
+    """States a yield question covers; no state, or every state, means all of India (None)"""
+    if not states or len(states) == len(INDIAN_STATES):
+        return [None]
+    return states
+
+def _handle_highest_yield_district(params):
+    """Handle highest yield district queries"""
+    crops = params.get('crops', [])
+    year = params.get('years', [2018])[-1]  # Use the latest year if multiple provided
+    crop = crops[0] if crops else "Rice"  # Default to rice
+    state = _yield_scopes(params.get('states', []))[0]
+    scope = state or "India"
+    
+    # Yields come from the pre-aggregated district areas and productions
+    df = run_intent_plan('highest_yield_district', state=state, crop=crop, year_start=year, year_end=year, k=5)
+    df = _ensure_dataframe(df)
+    
+    if df.empty:
+        return f"No {crop} area and production data available for {scope} in {year}.", None, [get_agriculture_data_source()]
+    
+    leaders = list(zip(df['District'], df['State'], df['Yield'], df['Production'], df['Area']))
+    district, district_state, best_yield, production, area = leaders[0]
+    place = district if state else f"{district} ({district_state})"
+    answer = (f"In {year}, {place} had the highest {crop} yield in {scope} at {float(best_yield):,.2f} units per hectare "
+              f"({float(production):,.0f} units from {float(area):,.0f} hectares).")
+    
+    if len(leaders) > 1:
+        answer += "\n\nHighest-yield districts:"
+        for district, district_state, district_yield, _, _ in leaders:
+            place = district if state else f"{district} ({district_state})"
+            answer += f"\n- {place}: {float(district_yield):,.2f} units per hectare"
+    
+    return answer, None, [get_agriculture_data_source()]
+
+def _handle_yield_trend(params):
+    """Handle crop yield trend queries"""
+    crops = params.get('crops', [])
+    year_start = params.get('year_start', 2010)
+    year_end = params.get('year_end', 2020)
+    crop = crops[0] if crops else "Rice"  # Default to rice
+    
+    # One yearly area-weighted yield series per state (or for India), from the yield aggregates
+    lines = []
+    series = []
+    for state in _yield_scopes(params.get('states', [])):
+        scope = state or "India"
+        df = _ensure_dataframe(run_intent_plan('yield_trend', state=state, crop=crop, year_start=year_start, year_end=year_end))
+        if df.empty:
+            lines.append(f"No {crop} area and production data available for {scope} during {year_start}-{year_end}.")
+            continue
+        
+        years = df['Year'].to_numpy()
+        yields = df['Yield'].to_numpy(dtype=float)
+        average = float(df['Production'].sum() / df['Area'].sum())
+        if len(years) > 1:
+            change = (yields[-1] - yields[0]) / yields[0] * 100 if yields[0] else 0.0
+            lines.append(f"{crop} yield in {scope} went from {yields[0]:,.2f} units per hectare in {int(years[0])} "
+                         f"to {yields[-1]:,.2f} in {int(years[-1])} ({change:+.0f}%), averaging {average:,.2f} over the period.")
+        else:
+            lines.append(f"{crop} yield in {scope} was {yields[0]:,.2f} units per hectare in {int(years[0])}.")
+        series.append((scope, years, yields))
+    
+    if not series:
+        return "\n".join(lines), None, [get_agriculture_data_source()]
+    
+    fig, ax = _new_chart(figsize=(10, 6))
+    for scope, years, yields in series:
+        ax.plot(years, yields, marker='o', label=scope)
+    ax.set_ylabel('Yield (units per hectare)')
+    ax.set_xlabel('Year')
+    ax.set_title(f'{crop} Yield Trend')
+    if len(series) > 1:
+        ax.legend()
+    fig.tight_layout()
+    
+    return "\n".join(lines), fig, [get_agriculture_data_source()]
+
 def _handle_top_crops(params):
     """Handle top crops queries"""
+    return _collect_answer(_stream_top_crops(params))
+
+def _stream_top_crops(params):
+    """Stream top crops one state at a time"""
     states = params.get('states', [])
     year = params.get('years', [2020])[-1]  # Use the latest year if multiple provided
     
     if not states:
-        return "Please specify a state for crop analysis.", None, []
+        yield from _message_events("Please specify a state for crop analysis.", [])
+        return
     
-    answer_parts = []
-    sources = [get_agriculture_data_source()]
+    # With several states, one batched plan fetches and aggregates all of them at once
+    batch_totals = None
+    if len(states) > 1:
+        batch_totals = run_intent_plan('top_crops_by_state', states=states, year_start=year, year_end=year)
     
-    # Process all states
+    # Process all states, emitting each state's result as soon as it is ready
     for state in states:
         # Get top crops by production volume (regardless of any specific crop mentioned in query)
-        df = fetch_agriculture_data(state=state, year_start=year, year_end=year)
-        df = _ensure_dataframe(df)
-        
-        if df.empty:
-            answer_parts.append(f"No crop production data available for {state} in {year}.")
-            continue
-        
-        # Get top crops
-        top_crops = get_top_crops_by_production(df, 3)
+        # The planner pushes the grouping and top-N selection down to the data connector
+        if batch_totals is None:
+            top_crops = run_intent_plan('top_crops', state=state, year_start=year, year_end=year, k=3)
+        elif batch_totals.empty:
+            top_crops = batch_totals
+        else:
+            top_crops = batch_totals[batch_totals['State'].str.lower() == state.lower()].head(3)
         
-        if not top_crops:
-            answer_parts.append(f"No crop production data available for {state} in {year}.")
+        if top_crops.empty:
+            yield 'row', f"No crop production data available for {state} in {year}."
             continue
         
-        # Get production values for these crops
+        # Format production values for these crops
         crop_details = []
-        for crop in top_crops:
-            crop_df = df[df['Crop'] == crop]
-            if not crop_df.empty:
-                total_production = float(crop_df['Production'].sum())
-                crop_details.append(f"{crop} ({total_production:,.0f} units)")
+        for crop, total_production in zip(top_crops['Crop'], top_crops['Production']):
+            crop_details.append(f"{crop} ({float(total_production):,.0f} units)")
         
         if crop_details:
             crops_list = ", ".join(crop_details)
-            answer_parts.append(f"The top 3 crops in {state} by production volume in {year} were: {crops_list}.")
+            yield 'row', f"The top 3 crops in {state} by production volume in {year} were: {crops_list}."
         else:
-            answer_parts.append(f"Could not determine top crops for {state} in {year}.")
+            yield 'row', f"Could not determine top crops for {state} in {year}."
     
-    answer = "\n".join(answer_parts)
-    return answer, None, sources
+    yield 'sources', [get_agriculture_data_source()]
 
 def _handle_top_crops_by_type(params):
     """Handle top crops by specific type queries"""
+    return _collect_answer(_stream_top_crops_by_type(params))
+
+def _stream_top_crops_by_type(params):
+    """Stream top crops of a specific type one state at a time"""
     states = params.get('states', [])
     crops = params.get('crops', [])
     year_start = params.get('year_start', 2018)
@@ -315,103 +1020,66 @@ def _handle_top_crops_by_type(params):
     top_m = 3  # Default value
     
     if not states:
-        return "Please specify states for crop analysis.", None, []
+        yield from _message_events("Please specify states for crop analysis.", [])
+        return
     
     if not crops:
-        return "Please specify a crop type for analysis.", None, []
+        yield from _message_events("Please specify a crop type for analysis.", [])
+        return
     
     crop_type = crops[0]  # Use the first crop type mentioned
     
-    answer_parts = []
-    sources = [get_agriculture_data_source()]
-    
-    # Process all states
+    # Process all states, emitting each state's result as soon as it is ready
     for state in states:
-        # Fetch data for the specific crop type in the specified state and year range
-        df = fetch_agriculture_data(state=state, crop=crop_type, year_start=year_start, year_end=year_end)
-        df = _ensure_dataframe(df)
-        
-        if df.empty:
-            answer_parts.append(f"No {crop_type} production data available for {state} during {year_start}-{year_end}.")
-            continue
-        
         # Get all crops of the specified type and their production values
-        # Group by crop and sum production
-        crop_production = df.groupby('Crop')['Production'].sum().sort_values(ascending=False).head(top_m)
+        # The planner pushes the grouping and top-M selection down to the data connector
+        crop_production = run_intent_plan('top_crops_by_type', state=state, crop=crop_type, year_start=year_start, year_end=year_end, k=top_m)
         
         if crop_production.empty:
-            answer_parts.append(f"No {crop_type} production data available for {state} during {year_start}-{year_end}.")
+            yield 'row', f"No {crop_type} production data available for {state} during {year_start}-{year_end}."
             continue
         
         # Format the results
         crop_details = []
-        for crop, production in crop_production.items():
+        for crop, production in zip(crop_production['Crop'], crop_production['Production']):
             crop_details.append(f"{crop} ({float(production):,.0f} units)")
         
         if crop_details:
             crops_list = ", ".join(crop_details)
-            answer_parts.append(f"The top {top_m} most produced crops of type '{crop_type}' in {state} during {year_start}-{year_end} were: {crops_list}.")
+            yield 'row', f"The top {top_m} most produced crops of type '{crop_type}' in {state} during {year_start}-{year_end} were: {crops_list}."
         else:
-            answer_parts.append(f"Could not determine top crops of type '{crop_type}' for {state} during {year_start}-{year_end}.")
+            yield 'row', f"Could not determine top crops of type '{crop_type}' for {state} during {year_start}-{year_end}."
     
-    answer = "\n".join(answer_parts)
-    return answer, None, sources
+    yield 'sources', [get_agriculture_data_source()]
 
 def _handle_analyze_correlation(params):
     """Handle correlation analysis queries"""
+    return _collect_answer(_stream_analyze_correlation(params))
+
+def _stream_analyze_correlation(params):
+    """Stream a correlation analysis: coefficient first, then the scatter plot"""
     states = params.get('states', [])
     crops = params.get('crops', [])
     year_start = params.get('year_start', 2010)
     year_end = params.get('year_end', 2020)
     
     if not states:
-        return "Please specify a state for correlation analysis.", None, []
+        yield from _message_events("Please specify a state for correlation analysis.", [])
+        return
     
     state = states[0]
     crop = crops[0] if crops else "Rice"  # Default to rice
     
-    # Fetch both agriculture and climate data
-    agri_df = fetch_agriculture_data(state=state, crop=crop, year_start=year_start, year_end=year_end)
-    climate_df = fetch_climate_data(state=state, year_start=year_start, year_end=year_end)
-    
-    agri_df = _ensure_dataframe(agri_df)
-    climate_df = _ensure_dataframe(climate_df)
-    
-    print(f"DEBUG: Agriculture data shape: {agri_df.shape}")
-    print(f"DEBUG: Climate data shape: {climate_df.shape}")
-    
-    if agri_df.empty or climate_df.empty:
-        sources = []
-        if not agri_df.empty:
-            sources.append(get_agriculture_data_source())
-        if not climate_df.empty:
-            sources.append(get_climate_data_source())
-        if not sources:
-            sources = [get_agriculture_data_source(), get_climate_data_source()]
-        return f"Insufficient data for correlation analysis between {crop} production and rainfall in {state}.", None, sources
-    
-    # For agriculture data, we need to aggregate by year since it has district-level data
-    if 'Year' in agri_df.columns and 'Production' in agri_df.columns:
-        agri_df_agg = agri_df.groupby('Year')['Production'].sum().reset_index()
-        print(f"DEBUG: Aggregated agriculture data shape: {agri_df_agg.shape}")
-        print(f"DEBUG: Aggregated agriculture data:\n{agri_df_agg.head()}")
-    else:
-        return f"Insufficient data for correlation analysis between {crop} production and rainfall in {state}.", None, [get_agriculture_data_source(), get_climate_data_source()]
-    
-    # Make sure climate data has the right columns
-    print(f"DEBUG: Climate data:\n{climate_df.head()}")
-    
-    if 'Year' not in climate_df.columns or 'Rainfall' not in climate_df.columns:
-        return f"Insufficient data for correlation analysis between {crop} production and rainfall in {state}.", None, [get_agriculture_data_source(), get_climate_data_source()]
-    
-    # Merge dataframes on year
-    merged_df = pd.merge(agri_df_agg, climate_df, on='Year', how='inner')
+    # Yearly production totals joined with rainfall on Year, executed as one plan
+    merged_df = run_intent_plan('analyze_correlation', state=state, crop=crop, year_start=year_start, year_end=year_end)
+    merged_df = _ensure_dataframe(merged_df)
     
     print(f"DEBUG: Merged data shape: {merged_df.shape}")
     print(f"DEBUG: Merged data:\n{merged_df.head()}")
     
-    if merged_df.empty:
-        return f"Could not correlate {crop} production and rainfall data for {state}.", None, [get_agriculture_data_source(), get_climate_data_source()]
+    if merged_df.empty or 'Production' not in merged_df.columns or 'Rainfall' not in merged_df.columns:
+        yield from _message_events(f"Insufficient data for correlation analysis between {crop} production and rainfall in {state}.", [get_agriculture_data_source(), get_climate_data_source()])
+        return
     
     # Calculate correlation using a simple approach
     try:
@@ -445,17 +1113,31 @@ def _handle_analyze_correlation(params):
         correlation = 0.0
     
     answer = f"The correlation between {crop} production and rainfall in {state} from {year_start}-{year_end} is {correlation:.2f}."
+    yield 'headline', answer
     
     # Create scatter plot
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _new_chart(figsize=(10, 6))
     ax.scatter(merged_df['Rainfall'], merged_df['Production'], alpha=0.7)
     ax.set_xlabel('Rainfall (mm)')
     ax.set_ylabel('Production')
     ax.set_title(f'{crop} Production vs Rainfall in {state}')
-    plt.tight_layout()
+    fig.tight_layout()
+    yield 'chart', fig
     
-    sources = [
+    yield 'sources', [
         get_agriculture_data_source(),
         get_climate_data_source()
     ]
-    return answer, fig, sources
\ No newline at end of file
+
+# Intents whose handlers can yield partial results
+_STREAMING_HANDLERS = {
+    "compare_rainfall": _stream_compare_rainfall,
+    "compare_crop_production": _stream_compare_crop_production,
+    "top_crops": _stream_top_crops,
+    "top_crops_by_type": _stream_top_crops_by_type,
+    "analyze_correlation": _stream_analyze_correlation,
+    "climate_info": _stream_climate_info,
+    "seasonal_rainfall": _stream_seasonal_rainfall,
+    "drought_years": _stream_drought_years,
+    "rainfall_anomalies": _stream_rainfall_anomalies,
+}
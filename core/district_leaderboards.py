@@ -0,0 +1,177 @@
+"""
+District production leaderboards for every crop and year
+
+District production totals are kept as flat arrays (crop and state codes,
+district ids, years, production) with the row positions of every (crop, year)
+group indexed. For each group the national top LEADERBOARD_SIZE districts are
+picked once with a partial selection (numpy argpartition) and only those few
+are ordered, so no group is ever fully sorted. The index is built once per
+dataset version:
+    a national top-k within the kept size          a slice of the stored list
+    a state's top-k, or a larger national top-k    a partial selection over one group's rows
+    a year range                                   the groups' rows summed per district, then selected
+"""
+import threading
+
+from data_connectors.agriculture_data import get_district_totals, get_agriculture_dataset_version
+from utils.helpers import lookup_entity_code, sum_by
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Districts kept in each precomputed national leaderboard
+LEADERBOARD_SIZE = 25
+
+# Built indexes, keyed by dataset version; built under the lock, so concurrent
+# first requests wait for one build instead of each running their own
+_INDEX_CACHE = {}
+_index_lock = threading.Lock()
+
+def _current_index():
+    """Leaderboard index of the current dataset version; those of older versions are dropped"""
+    version = get_agriculture_dataset_version()
+    with _index_lock:
+        index = _INDEX_CACHE.get(version)
+        if index is None:
+            index = build_leaderboards(get_district_totals())
+            if index is None:
+                return None
+            _INDEX_CACHE.clear()
+            _INDEX_CACHE[version] = index
+        return index
+
+def top_positions(values, k):
+    """
+    Positions of the k largest values, largest first, by partial selection
+    Ties go to the earlier position, as with pandas nlargest(keep='first')
+    """
+    k = min(int(k), len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    # The partition only finds the k-th largest value; which of the values tied with it
+    # are kept is settled by position
+    cutoff = values[np.argpartition(-values, k - 1)[k - 1]]
+    above = np.flatnonzero(values > cutoff)
+    chosen = np.sort(np.concatenate([above, np.flatnonzero(values == cutoff)[:k - len(above)]]))
+    return chosen[np.argsort(-values[chosen], kind='stable')]
+
+def build_leaderboards(totals):
+    """
+    Index district totals by (crop, year) and select each group's national leaders
+    Returns a dictionary, or None without data
+    """
+    if totals is None or totals.empty:
+        return None
+    totals = totals[totals['Production'].notna() & totals['Year'].notna()]
+    if totals.empty:
+        return None
+
+    district_ids, districts = pd.factorize(pd.MultiIndex.from_arrays(
+        [totals['State'].astype(str), totals['District'].astype(str)]
+    ))
+    crop_names = totals['Crop'].astype(str)
+    crop_codes = {name: lookup_entity_code('crop', name) for name in crop_names.unique()}
+    state_codes = {name: lookup_entity_code('state', name) for name in set(districts.get_level_values(0))}
+    index = {
+        'district_names': np.asarray(districts.get_level_values(1), dtype=object),
+        'district_states': np.asarray(districts.get_level_values(0), dtype=object),
+        'district_state_codes': np.array([-1 if state_codes[name] is None else state_codes[name]
+                                          for name in districts.get_level_values(0)]),
+        'district_ids': district_ids,
+        'production': totals['Production'].to_numpy(dtype=np.float64),
+        'groups': {},
+        'leaders': {},
+        'years': {},
+    }
+
+    # Row positions of every (crop, year) group, from hash grouping rather than a sort by production
+    codes = crop_names.map(crop_codes).fillna(-1).astype(np.int64).to_numpy()
+    years = totals['Year'].to_numpy(dtype=np.int64)
+    groups = pd.Series(np.arange(len(totals))).groupby([codes, years]).indices
+    for (crop_code, year), rows in groups.items():
+        if crop_code < 0:
+            continue
+        key = (int(crop_code), int(year))
+        index['groups'][key] = rows
+        index['leaders'][key] = rows[top_positions(index['production'][rows], LEADERBOARD_SIZE)]
+        index['years'].setdefault(int(crop_code), []).append(int(year))
+    for crop_code in index['years']:
+        index['years'][crop_code].sort()
+    return index
+
+def latest_crop_year(crop):
+    """
+    Latest year with district data for a crop, or None
+    """
+    index = _current_index()
+    code = lookup_entity_code('crop', crop)
+    if index is None or code is None or code not in index['years']:
+        return None
+    return index['years'][code][-1]
+
+def top_districts(crop, year_start, year_end=None, state=None, k=10):
+    """
+    The k districts producing the most of a crop in a year (or over a year range), in a state or nationwide
+    Returns a pandas DataFrame with District, State and Production, largest first
+    """
+    columns = ['District', 'State', 'Production']
+    index = _current_index()
+    crop_code = lookup_entity_code('crop', crop)
+    if index is None or crop_code is None:
+        return pd.DataFrame(columns=columns)
+    year_end = year_start if year_end is None else year_end
+    keys = [(crop_code, year) for year in index['years'].get(crop_code, []) if int(year_start) <= year <= int(year_end)]
+    if not keys:
+        return pd.DataFrame(columns=columns)
+
+    state_code = None
+    if state:
+        state_code = lookup_entity_code('state', state)
+        if state_code is None:
+            return pd.DataFrame(columns=columns)
+
+    if len(keys) == 1:
+        key = keys[0]
+        if state_code is None and k <= LEADERBOARD_SIZE:
+            rows = index['leaders'][key][:k]
+        else:
+            rows = index['groups'][key]
+            if state_code is not None:
+                rows = rows[index['district_state_codes'][index['district_ids'][rows]] == state_code]
+            rows = rows[top_positions(index['production'][rows], k)]
+        ids = index['district_ids'][rows]
+        production = index['production'][rows]
+    else:
+        # Districts are summed over the years of the range, then selected
+        rows = np.concatenate([index['groups'][key] for key in keys])
+        if state_code is not None:
+            rows = rows[index['district_state_codes'][index['district_ids'][rows]] == state_code]
+        sums = np.bincount(index['district_ids'][rows], weights=index['production'][rows],
+                           minlength=len(index['district_names']))
+        present = np.flatnonzero(np.bincount(index['district_ids'][rows], minlength=len(index['district_names'])))
+        ids = present[top_positions(sums[present], k)]
+        production = sums[ids]
+    return pd.DataFrame({
+        'District': index['district_names'][ids],
+        'State': index['district_states'][ids],
+        'Production': production,
+    }, columns=columns)
+
+def top_districts_of_frame(df, k=10):
+    """
+    The k largest districts of a fetched crop production slice, for slices outside the
+    dataset's index (e.g. mock data generated per request)
+    Returns a pandas DataFrame as top_districts does
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['District', 'State', 'Production'])
+    totals = sum_by(df, ['District', 'State']).reset_index()
+    return totals.iloc[top_positions(totals['Production'].to_numpy(dtype=np.float64), k)].reset_index(drop=True)
+
+def clear_leaderboards():
+    """
+    Drop all built indexes (e.g. after a dataset refresh)
+    """
+    with _index_lock:
+        _INDEX_CACHE.clear()
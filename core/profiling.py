@@ -0,0 +1,164 @@
+"""
+Opt-in per-query profiling
+
+When PROFILING_ENABLED is set, every answered query records its latency and
+its peak and retained memory (tracemalloc); queries slower than
+PROFILE_LATENCY_THRESHOLD_MS also keep a cProfile capture and their largest
+live allocation sites. Each query is written to PROFILE_DIR as JSON with its
+intent and params (plus a .prof file for slow ones); only the newest
+PROFILE_MAX_DUMPS queries are kept.
+
+tracemalloc is process-wide, so memory figures of queries that overlap in
+time include each other's allocations.
+
+Summary of the heaviest intents:
+    python -m core.profiling [profile_dir]
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from config import PROFILE_DIR, PROFILE_LATENCY_THRESHOLD_MS, PROFILE_MAX_DUMPS
+
+_lock = threading.Lock()
+_sequence = 0
+
+def profile_events(intent, params, events):
+    """
+    Wrap an answer event generator so it is profiled while it runs
+    Time spent by the consumer between events (e.g. rendering) is not counted
+    """
+    import cProfile
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    memory_before, _ = tracemalloc.get_traced_memory()
+
+    profiler = cProfile.Profile()
+    elapsed = 0.0
+    events = iter(events)
+    while True:
+        started = time.perf_counter()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active (e.g. a concurrent query on Python 3.12+);
+                # the rest of the query is timed without a capture
+                profiler = None
+        try:
+            event = next(events)
+        except StopIteration:
+            break
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            elapsed += time.perf_counter() - started
+        yield event
+
+    memory_after, peak = tracemalloc.get_traced_memory()
+    record = {
+        'intent': intent,
+        'params': params,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'latency_ms': round(elapsed * 1000, 2),
+        'peak_kb': round((peak - memory_before) / 1024, 1),
+        'retained_kb': round((memory_after - memory_before) / 1024, 1),
+    }
+    if record['latency_ms'] >= PROFILE_LATENCY_THRESHOLD_MS:
+        # Snapshots are expensive, so allocation sites are only captured for slow queries
+        record['largest_live_allocations'] = [
+            {'location': str(stat.traceback), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+            for stat in tracemalloc.take_snapshot().statistics('lineno')[:10]
+        ]
+    slow = profiler is not None and record['latency_ms'] >= PROFILE_LATENCY_THRESHOLD_MS
+    _write_dump(record, profiler if slow else None)
+
+def _write_dump(record, profiler=None):
+    """Write one query's profile and drop the oldest dumps beyond PROFILE_MAX_DUMPS"""
+    global _sequence
+    with _lock:
+        _sequence += 1
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_sequence:05d}-{record['intent']}"
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if profiler is not None:
+            import io
+            import pstats
+            stats_path = os.path.join(PROFILE_DIR, name + '.prof')
+            profiler.dump_stats(stats_path)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(15)
+            record['cprofile'] = {'file': stats_path, 'top_functions': summary.getvalue()}
+        with open(os.path.join(PROFILE_DIR, name + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2, default=str)
+        _rotate()
+    except OSError as e:
+        print(f"Error writing query profile: {e}")
+
+def _rotate():
+    with _lock:
+        dumps = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.json'))
+        for name in dumps[:max(0, len(dumps) - PROFILE_MAX_DUMPS)]:
+            for path in (name, name[:-len('.json')] + '.prof'):
+                try:
+                    os.remove(os.path.join(PROFILE_DIR, path))
+                except FileNotFoundError:
+                    pass
+
+def load_profiles(directory=PROFILE_DIR):
+    """Read all query profiles from a dump directory"""
+    if not os.path.isdir(directory):
+        return []
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                records.append(json.load(f))
+    return records
+
+def summarize_profiles(records):
+    """
+    Rank intents by total time spent on them
+    Returns a list of dictionaries, heaviest first
+    """
+    by_intent = {}
+    for record in records:
+        by_intent.setdefault(record['intent'], []).append(record)
+    summary = []
+    for intent, items in by_intent.items():
+        latencies = sorted(item['latency_ms'] for item in items)
+        slowest = max(items, key=lambda item: item['latency_ms'])
+        summary.append({
+            'intent': intent,
+            'queries': len(items),
+            'total_ms': round(sum(latencies), 1),
+            'mean_ms': round(sum(latencies) / len(latencies), 1),
+            'max_ms': latencies[-1],
+            'max_peak_kb': max(item['peak_kb'] for item in items),
+            'mean_retained_kb': round(sum(item['retained_kb'] for item in items) / len(items), 1),
+            'slow_captures': sum(1 for item in items if 'cprofile' in item),
+            'slowest_params': slowest['params'],
+        })
+    return sorted(summary, key=lambda item: item['total_ms'], reverse=True)
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else PROFILE_DIR
+    summary = summarize_profiles(load_profiles(directory))
+    if not summary:
+        print(f"No query profiles in {directory}")
+        return
+    print(f"{'intent':<26} {'queries':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} "
+          f"{'peak KB':>9} {'retained KB':>12} {'cProfile':>8}")
+    for item in summary:
+        print(f"{item['intent']:<26} {item['queries']:>7} {item['total_ms']:>10.1f} {item['mean_ms']:>9.1f} "
+              f"{item['max_ms']:>9.1f} {item['max_peak_kb']:>9.1f} {item['mean_retained_kb']:>12.1f} "
+              f"{item['slow_captures']:>8}")
+        print(f"    slowest: {item['slowest_params']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
 import re
-from utils.constants import INDIAN_STATES, COMMON_CROPS
+from utils.constants import INDIAN_STATES, COMMON_CROPS, STATE_ALIASES, CROP_ALIASES, RAINFALL_SEASONS
+from utils.metrics import timed
 import datetime
 
+# Month names and abbreviations, mapped to month numbers
+_MONTHS = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3, 'april': 4, 'apr': 4,
+    'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7, 'august': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9, 'october': 10, 'oct': 10, 'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+_MONTH_PATTERN = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+
+# Words asking which way production is trending
+_GROWING_PATTERN = r'\b(?:growing|growth|rising|rose|increasing|increased)\b'
+_DECLINING_PATTERN = r'\b(?:declin\w*|falling|fell|shrinking|shrank|decreasing|decreased|dropping|dropped)\b'
+
+# Words asking about unusually dry or wet years
+_DROUGHT_PATTERN = r'\b(?:droughts?|dry years?|driest)\b'
+_ANOMALY_PATTERN = r'\b(?:deficits?|deficien\w*|shortfalls?|anomal\w*|surplus\w*|excess\w*|wettest)\b'
+_EXCESS_PATTERN = r'\b(?:surplus\w*|excess\w*|wettest)\b'
+
+@timed('samarth_parse_seconds')
 def parse_query(query):
     """
     Parse user query to extract intent and parameters
@@ -25,6 +45,16 @@ def parse_query(query):
         elif _is_similar_state_name(state_lower, query):
             states_found.append(state)
     
+    # Other spellings (e.g. Orissa, NCT of Delhi) resolve to the canonical name
+    query_key = query.replace('&', ' and ')
+    for alias, state in STATE_ALIASES.items():
+        if state not in states_found and re.search(r'\b' + re.escape(alias) + r'\b', query_key):
+            states_found.append(state)
+    
+    # Region-wide questions cover every state and union territory
+    if re.search(r'\b(?:all|every)\s+(?:the\s+)?states?\b', query) or "across india" in query or "nationwide" in query:
+        states_found = list(INDIAN_STATES)
+    
     if states_found:
         params['states'] = states_found
     
@@ -33,6 +63,11 @@ def parse_query(query):
     for crop in COMMON_CROPS:
         if crop.lower() in query:
             crops_found.append(crop)
+    for alias, crop in CROP_ALIASES.items():
+        if crop not in crops_found and re.search(r'\b' + re.escape(alias) + r'(?!\w)', query_key):
+            crops_found.append(crop)
+    if re.search(r'\b(?:all|every)\s+(?:the\s+)?crops?\b', query):
+        crops_found = list(COMMON_CROPS)
     if crops_found:
         params['crops'] = crops_found
     
@@ -111,6 +146,33 @@ def parse_query(query):
             # If only one year is specified, use it as both start and end
             params['year_start'] = years[0]
             params['year_end'] = years[0]
+            # "since 2005" leaves the range open up to the latest year
+            if re.search(r'\bsince\s+' + str(years[0]) + r'\b', query):
+                del params['year_end']
+    
+    # Seasons ("monsoon", "kharif season") and month ranges ("June to September", "in July")
+    season, months = _extract_season(query)
+    if season:
+        params['season'] = season
+    if months:
+        params['months'] = months
+    
+    # Ranking sizes ("top 10 rice districts")
+    top_n = re.search(r'\b(?:top|best|leading|largest|biggest)\s+(\d{1,3})\b', query)
+    if top_n and int(top_n.group(1)) > 0:
+        params['top_n'] = int(top_n.group(1))
+    
+    # Growth questions ("fastest growing crops", "where wheat is declining")
+    declining = re.search(_DECLINING_PATTERN, query)
+    trending = declining or re.search(_GROWING_PATTERN, query)
+    if trending:
+        params['trend_direction'] = 'declining' if declining else 'growing'
+    
+    # Rainfall anomaly questions ("drought years", "worst monsoon deficits")
+    rainfall_words = "rain" in query or "monsoon" in query or "precipitation" in query or bool(months)
+    anomaly = re.search(_ANOMALY_PATTERN, query) and rainfall_words
+    if anomaly:
+        params['anomaly'] = 'excess' if re.search(_EXCESS_PATTERN, query) else 'deficit'
     
     # Debug: Print the parsed parameters
     print(f"DEBUG: Parsed params: {params}")
@@ -119,8 +181,28 @@ def parse_query(query):
     # Check for specific intents first
     if "analyze" in query and ("correlate" in query or "correlation" in query):
         intent = "analyze_correlation"
+    elif re.search(_DROUGHT_PATTERN, query):
+        intent = "drought_years"
+    elif anomaly:
+        intent = "rainfall_anomalies"
+    elif months and ("rain" in query or "monsoon" in query or "precipitation" in query):
+        intent = "seasonal_rainfall"
+    elif "yield" in query and ("district" in query or re.search(r'\b(?:highest|best|top|most|leading)\b', query)):
+        intent = "highest_yield_district"
+    elif "yield" in query:
+        intent = "yield_trend"
+    elif re.search(r'\b(?:top|leading|largest|biggest)\b', query) and re.search(r'\bdistricts?\b', query):
+        intent = "top_districts"
+    elif trending and crops_found and re.search(r'\bstates\b|\bwhich state\b', query):
+        intent = "crop_growth_by_state"
+    elif trending and re.search(r'\bcrops\b', query):
+        intent = "fastest_growing_crops"
+    elif trending and crops_found and states_found:
+        intent = "crop_trend"
     elif "compare" in query and "rainfall" in query:
         intent = "compare_rainfall"
+    elif "compare" in query and ("production" in query or crops_found):
+        intent = "compare_crop_production"
     elif "trend" in query and ("crop" in query or "production" in query):
         intent = "crop_trend"
     elif "most" in query and "wheat" in query:
@@ -145,6 +227,27 @@ def parse_query(query):
     
     return intent, params
 
+def _extract_season(query):
+    """
+    Find a named season or a month range in a lower-case query
+    Returns (season name or None, [first month, last month] or None)
+    """
+    for season, (first, last) in RAINFALL_SEASONS.items():
+        if re.search(r'\b' + re.escape(season) + r'\b', query):
+            return season, [first, last]
+    
+    month_range = re.search(
+        rf'\b({_MONTH_PATTERN})\b\.?\s*(?:to|-|through|till|until|and)\s*\b({_MONTH_PATTERN})\b', query
+    )
+    if month_range:
+        return None, [_MONTHS[month_range.group(1)], _MONTHS[month_range.group(2)]]
+    
+    single_month = re.search(rf'\b(?:in|during|for|of)\s+({_MONTH_PATTERN})\b', query)
+    if single_month:
+        month = _MONTHS[single_month.group(1)]
+        return None, [month, month]
+    return None, None
+
 def _is_similar_state_name(state_name, query):
     """
     Check if query contains a similar state name (handles common misspellings)
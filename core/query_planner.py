@@ -0,0 +1,263 @@
+from data_connectors.agriculture_data import fetch_agriculture_data, fetch_agriculture_data_for_states, get_production_totals, get_yield_totals
+from data_connectors.climate_data import fetch_climate_data, fetch_climate_data_for_states
+from utils.helpers import entity_mask, sum_by, yield_by
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+# Connector behind each scannable dataset and the filters it understands
+# Scans filtered on a list of states (and crops) use the batched connector fetch
+DATASETS = {
+    'agriculture': {
+        'fetch': fetch_agriculture_data,
+        'batch_fetch': fetch_agriculture_data_for_states,
+        'filters': ['state', 'crop', 'states', 'crops', 'year_start', 'year_end']
+    },
+    'climate': {
+        'fetch': fetch_climate_data,
+        'batch_fetch': fetch_climate_data_for_states,
+        'filters': ['state', 'states', 'year_start', 'year_end']
+    }
+}
+
+# Logical plan nodes are plain dictionaries with an 'op' key:
+#   scan      - read a dataset through its connector
+#   filter    - keep rows matching state/crop/year predicates
+#   project   - keep a subset of columns
+#   aggregate - sum a column grouped by one or more columns
+#   yield     - area-weighted yield (production over area) grouped by a column
+#   topk      - keep the k rows with the largest values of a column
+#   join      - inner join two inputs on a column (usually Year)
+
+def scan(dataset):
+    """Create a scan node over a dataset"""
+    return {'op': 'scan', 'dataset': dataset, 'filters': {}, 'columns': None}
+
+def filter_rows(node, **predicates):
+    """Create a filter node; None predicates are ignored"""
+    predicates = {key: value for key, value in predicates.items() if value is not None}
+    return {'op': 'filter', 'input': node, 'predicates': predicates}
+
+def project(node, columns):
+    """Create a projection node"""
+    return {'op': 'project', 'input': node, 'columns': list(columns)}
+
+def aggregate(node, group_by, column='Production'):
+    """Create a sum aggregation node"""
+    return {'op': 'aggregate', 'input': node, 'group_by': group_by, 'column': column}
+
+def weighted_yield(node, group_by):
+    """Create an area-weighted yield node"""
+    return {'op': 'yield', 'input': node, 'group_by': group_by}
+
+def topk(node, k, column='Production'):
+    """Create a top-k node"""
+    return {'op': 'topk', 'input': node, 'k': k, 'column': column}
+
+def join(left, right, on='Year'):
+    """Create an inner join node"""
+    return {'op': 'join', 'left': left, 'right': right, 'on': on}
+
+def _filtered_agriculture(p, **overrides):
+    predicates = dict(state=p['state'], crop=p['crop'], states=p['states'], crops=p['crops'],
+                      year_start=p['year_start'], year_end=p['year_end'])
+    predicates.update(overrides)
+    return filter_rows(scan('agriculture'), **predicates)
+
+def _plan_crop_production(p):
+    return project(_filtered_agriculture(p), ['District', 'Year', 'Crop', 'Production'])
+
+def _plan_crop_trend(p):
+    return aggregate(_filtered_agriculture(p), 'Year')
+
+def _plan_crop_series(p):
+    return aggregate(_filtered_agriculture(p), ['State', 'Crop', 'Year'])
+
+def _plan_top_crops(p):
+    return topk(aggregate(_filtered_agriculture(p, crop=None), 'Crop'), p['k'])
+
+def _plan_top_crops_by_type(p):
+    return topk(aggregate(_filtered_agriculture(p), 'Crop'), p['k'])
+
+def _plan_production_by_state_and_crop(p):
+    return aggregate(_filtered_agriculture(p), ['State', 'Crop'])
+
+def _plan_analyze_correlation(p):
+    production = aggregate(_filtered_agriculture(p), 'Year')
+    climate = filter_rows(scan('climate'), state=p['state'], year_start=p['year_start'], year_end=p['year_end'])
+    return join(production, project(climate, ['Year', 'Rainfall']), on='Year')
+
+def _plan_highest_yield_district(p):
+    return topk(weighted_yield(_filtered_agriculture(p), 'District'), p['k'], column='Yield')
+
+def _plan_yield_trend(p):
+    return weighted_yield(_filtered_agriculture(p), 'Year')
+
+# Logical plan builder for each intent
+_INTENT_PLANS = {
+    'crop_production': _plan_crop_production,
+    'crop_trend': _plan_crop_trend,
+    'crop_series': _plan_crop_series,
+    'top_crops': _plan_top_crops,
+    'top_crops_by_type': _plan_top_crops_by_type,
+    'top_crops_by_state': _plan_production_by_state_and_crop,
+    'compare_crop_production': _plan_production_by_state_and_crop,
+    'analyze_correlation': _plan_analyze_correlation,
+    'highest_yield_district': _plan_highest_yield_district,
+    'yield_trend': _plan_yield_trend,
+}
+
+def build_plan(intent, state=None, crop=None, year_start=None, year_end=None, k=3, states=None, crops=None):
+    """
+    Compile an intent and its parameters into a logical plan
+    Returns the plan or None if the intent has no data plan
+    """
+    builder = _INTENT_PLANS.get(intent)
+    if builder is None:
+        return None
+    return builder({
+        'state': state, 'crop': crop, 'states': states, 'crops': crops,
+        'year_start': year_start, 'year_end': year_end, 'k': k
+    })
+
+def optimize_plan(plan):
+    """
+    Rewrite a logical plan so work happens as close to the data as possible
+
+    - filter predicates are pushed into the scan and become connector arguments
+    - projections are pushed into the scan
+    - production sums (and a top-k over them) become a single aggregate scan
+      that the connector can run inside the local store
+    - yields (and a top-k over them) likewise become a yield scan served from
+      the pre-aggregated areas and productions
+    """
+    op = plan['op']
+
+    if op == 'scan':
+        return dict(plan, filters=dict(plan['filters']))
+
+    if op == 'join':
+        return dict(plan, left=optimize_plan(plan['left']), right=optimize_plan(plan['right']))
+
+    child = optimize_plan(plan['input'])
+
+    if op == 'filter' and child['op'] == 'scan':
+        supported = DATASETS[child['dataset']]['filters']
+        pushed = {key: value for key, value in plan['predicates'].items() if key in supported}
+        remaining = {key: value for key, value in plan['predicates'].items() if key not in supported}
+        child['filters'].update(pushed)
+        if remaining:
+            return dict(plan, input=child, predicates=remaining)
+        return child
+
+    if op == 'project' and child['op'] == 'scan':
+        child['columns'] = list(plan['columns'])
+        return child
+
+    if (op == 'aggregate' and child['op'] == 'scan' and child['dataset'] == 'agriculture'
+            and plan['column'] == 'Production' and isinstance(plan['group_by'], str)
+            and 'states' not in child['filters'] and 'crops' not in child['filters']):
+        return {'op': 'aggregate_scan', 'filters': child['filters'], 'group_by': plan['group_by'], 'k': None}
+
+    if op == 'topk' and child['op'] == 'aggregate_scan' and plan['column'] == 'Production':
+        k = plan['k'] if child['k'] is None else min(plan['k'], child['k'])
+        return dict(child, k=k)
+
+    if (op == 'yield' and child['op'] == 'scan' and child['dataset'] == 'agriculture'
+            and 'states' not in child['filters'] and 'crops' not in child['filters']):
+        return {'op': 'yield_scan', 'filters': child['filters'], 'group_by': plan['group_by'], 'k': None}
+
+    if op == 'topk' and child['op'] == 'yield_scan' and plan['column'] == 'Yield':
+        k = plan['k'] if child['k'] is None else min(plan['k'], child['k'])
+        return dict(child, k=k)
+
+    return dict(plan, input=child)
+
+def execute_plan(plan, memo=None):
+    """
+    Execute an optimized plan and return a pandas DataFrame
+    Identical scans within one execution are fetched only once
+    """
+    if memo is None:
+        memo = {}
+    op = plan['op']
+
+    if op in ('scan', 'aggregate_scan', 'yield_scan'):
+        filter_key = tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                                  for name, value in plan['filters'].items()))
+        group_key = tuple(plan['group_by']) if isinstance(plan.get('group_by'), list) else plan.get('group_by')
+        key = (op, plan.get('dataset'), filter_key, group_key, plan.get('k'),
+               tuple(plan.get('columns') or ()))
+        if key in memo:
+            return memo[key]
+        if op == 'scan':
+            filters = dict(plan['filters'])
+            if 'states' in filters or 'crops' in filters:
+                states = filters.pop('states', None) or [filters.get('state')]
+                filters.pop('state', None)
+                if 'crops' not in filters and filters.get('crop'):
+                    filters['crops'] = [filters['crop']]
+                filters.pop('crop', None)
+                df = DATASETS[plan['dataset']]['batch_fetch'](states, **filters)
+            else:
+                df = DATASETS[plan['dataset']]['fetch'](**filters)
+            df = df if isinstance(df, pd.DataFrame) else pd.DataFrame()
+            if plan['columns'] and not df.empty:
+                df = df[[col for col in plan['columns'] if col in df.columns]]
+        elif op == 'yield_scan':
+            df = get_yield_totals(plan['group_by'], n=plan['k'], **plan['filters'])
+            if plan['group_by'] == 'Year' and not df.empty:
+                df = df.sort_values('Year').reset_index(drop=True)
+        else:
+            totals = get_production_totals(plan['group_by'], n=plan['k'], **plan['filters'])
+            # Name the index explicitly: empty totals carry no index name
+            df = totals.rename('Production').rename_axis(plan['group_by']).reset_index()
+            if plan['group_by'] == 'Year':
+                df = df.sort_values('Year').reset_index(drop=True)
+        memo[key] = df
+        return df
+
+    if op == 'join':
+        left = execute_plan(plan['left'], memo)
+        right = execute_plan(plan['right'], memo)
+        if left.empty or right.empty or plan['on'] not in left.columns or plan['on'] not in right.columns:
+            return pd.DataFrame()
+        return pd.merge(left, right, on=plan['on'], how='inner')
+
+    df = execute_plan(plan['input'], memo)
+    if df.empty:
+        return df
+
+    if op == 'filter':
+        predicates = plan['predicates']
+        # Names are matched on their integer codes (see utils.helpers.entity_mask)
+        for key, column in (('state', 'State'), ('crop', 'Crop'), ('states', 'State'), ('crops', 'Crop')):
+            if key in predicates and column in df.columns:
+                df = df[entity_mask(df, column, predicates[key])]
+        if 'year_start' in predicates and 'Year' in df.columns:
+            df = df[df['Year'] >= predicates['year_start']]
+        if 'year_end' in predicates and 'Year' in df.columns:
+            df = df[df['Year'] <= predicates['year_end']]
+        return df
+    if op == 'project':
+        return df[[col for col in plan['columns'] if col in df.columns]]
+    if op == 'aggregate':
+        totals = sum_by(df, plan['group_by'], plan['column'])
+        return totals.sort_values(ascending=False).reset_index()
+    if op == 'yield':
+        df = yield_by(df, ['State', 'District'] if plan['group_by'] == 'District' else plan['group_by'])
+        return df.sort_values('Year').reset_index(drop=True) if plan['group_by'] == 'Year' else df
+    if op == 'topk':
+        return df.nlargest(plan['k'], plan['column'])
+
+    raise ValueError(f"Unknown plan operator: {op}")
+
+def run_intent_plan(intent, state=None, crop=None, year_start=None, year_end=None, k=3, states=None, crops=None):
+    """
+    Build, optimize and execute the data plan of an intent in one step
+    Returns a pandas DataFrame (empty if the intent has no plan or no data)
+    """
+    plan = build_plan(intent, state, crop, year_start, year_end, k, states, crops)
+    if plan is None:
+        return pd.DataFrame()
+    return execute_plan(optimize_plan(plan))
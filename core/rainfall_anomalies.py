@@ -0,0 +1,158 @@
+"""
+Rainfall anomalies of every state and year
+
+Annual and season rainfall totals for every state and year come from the
+seasonal rainfall table as one state x year matrix. A single vectorized pass
+over it gives each state's long-term average and standard deviation (over all
+years it reports) and, for every state-year, the percent departure from that
+average and the standardized anomaly (z-score). Tables are built once per
+dataset version and month range, after which a state's drought years or a
+year's worst deficits are reads of the precomputed arrays.
+
+Departures are classified with the IMD categories (excess, normal, deficient,
+...); a deficiency of more than 25% is a meteorological drought, more than 50%
+a severe one.
+"""
+import threading
+
+from core.seasonal_rainfall import get_season_table, state_position
+from data_connectors.climate_data import get_climate_dataset_version
+from utils.constants import RAINFALL_DEPARTURE_CATEGORIES, DROUGHT_DEPARTURE, SEVERE_DROUGHT_DEPARTURE
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Fewest reported years a baseline is computed from
+MIN_BASELINE_YEARS = 3
+
+# Built tables, keyed by dataset version and then by month range; built under the
+# lock, so concurrent first requests wait for one build instead of each running their own
+_TABLE_CACHE = {}
+_table_lock = threading.Lock()
+
+def get_anomaly_table(first_month=1, last_month=12):
+    """
+    Anomalies of a month range (the whole year by default) for every state and year
+    Returns a dictionary, or None without monthly data
+    """
+    version = get_climate_dataset_version()
+    key = (first_month, last_month)
+    with _table_lock:
+        if version not in _TABLE_CACHE:
+            _TABLE_CACHE.clear()
+        tables = _TABLE_CACHE.setdefault(version, {})
+        table = tables.get(key)
+        if table is None:
+            season_table, totals = get_season_table(first_month, last_month)
+            if season_table is None:
+                return None
+            table = tables[key] = dict(build_anomalies(totals), season_table=season_table, years=season_table['years'])
+        return table
+
+def build_anomalies(totals):
+    """
+    Baselines and anomalies of a (state, year) rainfall array, NaN where a year is missing
+    Returns {'totals', 'normal', 'std', 'departure', 'zscore'}; states with fewer than
+    MIN_BASELINE_YEARS reported years get no baseline
+    """
+    reported = ~np.isnan(totals)
+    count = reported.sum(axis=1)
+    filled = np.where(reported, totals, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        normal = np.where(count >= MIN_BASELINE_YEARS, filled.sum(axis=1) / count, np.nan)
+        deviation = totals - normal[:, None]
+        std = np.sqrt((np.where(reported, deviation, 0.0) ** 2).sum(axis=1) / (count - 1))
+        std = np.where(count >= MIN_BASELINE_YEARS, std, np.nan)
+        departure = np.where(normal[:, None] > 0, deviation / normal[:, None] * 100, np.nan)
+        zscore = np.where(std[:, None] > 0, deviation / std[:, None], np.nan)
+    return {'totals': totals, 'normal': normal, 'std': std, 'departure': departure, 'zscore': zscore}
+
+def classify_departures(departures):
+    """
+    IMD category of each percent departure (NaN gives None)
+    Returns a numpy array of category names
+    """
+    departures = np.round(np.asarray(departures, dtype=float))
+    conditions = [departures >= lowest for lowest, _ in RAINFALL_DEPARTURE_CATEGORIES]
+    return np.select(conditions, [category for _, category in RAINFALL_DEPARTURE_CATEGORIES], default=None)
+
+def drought_severity(departures):
+    """
+    'severe drought', 'moderate drought' or None for each percent departure
+    """
+    departures = np.asarray(departures, dtype=float)
+    return np.select([departures < SEVERE_DROUGHT_DEPARTURE, departures < DROUGHT_DEPARTURE],
+                     ["severe drought", "moderate drought"], default=None)
+
+def get_state_anomalies(state, first_month=1, last_month=12, year_start=None, year_end=None):
+    """
+    A state's rainfall, departure and z-score in each year of a range, with its long-term average
+    Returns {'years', 'values', 'departure', 'zscore', 'normal'} or None without a baseline for the state
+    """
+    table = get_anomaly_table(first_month, last_month)
+    if table is None:
+        return None
+    position = state_position(table['season_table'], state)
+    if position is None or np.isnan(table['normal'][position]):
+        return None
+    years = table['years']
+    selected = ~np.isnan(table['totals'][position])
+    if year_start:
+        selected &= years >= int(year_start)
+    if year_end:
+        selected &= years <= int(year_end)
+    return {
+        'years': years[selected],
+        'values': table['totals'][position][selected],
+        'departure': table['departure'][position][selected],
+        'zscore': table['zscore'][position][selected],
+        'normal': float(table['normal'][position]),
+    }
+
+def get_year_anomalies(year, first_month=1, last_month=12, states=None):
+    """
+    Every state's (or the given states') rainfall against its long-term average in one year
+    Returns a pandas DataFrame with State, Rainfall, Normal, Departure and ZScore, largest deficit first
+    """
+    columns = ['State', 'Rainfall', 'Normal', 'Departure', 'ZScore']
+    table = get_anomaly_table(first_month, last_month)
+    if table is None:
+        return pd.DataFrame(columns=columns)
+    years = table['years']
+    column = int(np.searchsorted(years, int(year)))
+    if column >= len(years) or years[column] != int(year):
+        return pd.DataFrame(columns=columns)
+
+    season_table = table['season_table']
+    if states:
+        rows = [state_position(season_table, state) for state in states]
+        rows = np.array([row for row in rows if row is not None], dtype=np.int64)
+    else:
+        rows = np.arange(len(season_table['states']))
+    rows = rows[~np.isnan(table['departure'][rows, column])]
+    order = rows[np.argsort(table['departure'][rows, column], kind='stable')]
+    return pd.DataFrame({
+        'State': [season_table['states'][row] for row in order],
+        'Rainfall': table['totals'][order, column],
+        'Normal': table['normal'][order],
+        'Departure': table['departure'][order, column],
+        'ZScore': table['zscore'][order, column],
+    }, columns=columns)
+
+def latest_anomaly_year(first_month=1, last_month=12):
+    """
+    Latest year any state has an anomaly for, or None without data
+    """
+    table = get_anomaly_table(first_month, last_month)
+    if table is None:
+        return None
+    reported = np.flatnonzero(~np.isnan(table['departure']).all(axis=0))
+    return int(table['years'][reported[-1]]) if len(reported) else None
+
+def clear_anomaly_tables():
+    """
+    Drop all built tables (e.g. after a dataset refresh)
+    """
+    with _table_lock:
+        _TABLE_CACHE.clear()
@@ -0,0 +1,152 @@
+import threading
+
+from data_connectors.climate_data import fetch_climate_data, fetch_climate_frames, get_climate_dataset_version
+from data_connectors.versioning import is_fallback
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Built indexes, keyed by dataset version and then by state name (lower case); read and
+# updated under the lock, as the warm-up, the prefetch pool and requests share them.
+# Fetches run outside it, so states are still read concurrently
+_INDEX_CACHE = {}
+_index_lock = threading.Lock()
+
+def _current_indexes():
+    """Indexes of the current dataset version; those of older versions are dropped"""
+    version = get_climate_dataset_version()
+    with _index_lock:
+        if version not in _INDEX_CACHE:
+            _INDEX_CACHE.clear()
+        return _INDEX_CACHE.setdefault(version, {})
+
+def build_state_index(years, values):
+    """
+    Build a range statistics index for one state's annual rainfall series
+
+    Stores cumulative sums for O(1) range means and sparse tables for
+    O(1) range minimum and maximum queries
+    """
+    years = np.asarray(years, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+
+    # Drop missing values and keep the series ordered by year
+    valid = ~np.isnan(values)
+    years = years[valid]
+    values = values[valid]
+    order = np.argsort(years, kind='stable')
+    years = years[order]
+    values = values[order]
+
+    prefix = np.concatenate(([0.0], np.cumsum(values)))
+
+    # Level k of a sparse table holds the min/max of each window of length 2**k
+    min_table = [values]
+    max_table = [values]
+    width = 1
+    while width * 2 <= len(values):
+        prev_min = min_table[-1]
+        prev_max = max_table[-1]
+        min_table.append(np.minimum(prev_min[:-width], prev_min[width:]))
+        max_table.append(np.maximum(prev_max[:-width], prev_max[width:]))
+        width *= 2
+
+    return {
+        'years': years,
+        'values': values,
+        'prefix': prefix,
+        'min_table': min_table,
+        'max_table': max_table
+    }
+
+def query_state_index(index, year_start=None, year_end=None):
+    """
+    Get mean, min and max rainfall for a year range from a state index
+    Returns a dictionary of statistics or None if no years fall in the range
+    """
+    years = index['years']
+    lo = 0 if year_start is None else int(np.searchsorted(years, year_start, side='left'))
+    hi = len(years) if year_end is None else int(np.searchsorted(years, year_end, side='right'))
+    count = hi - lo
+    if count <= 0:
+        return None
+
+    level = count.bit_length() - 1
+    span = 1 << level
+    min_level = index['min_table'][level]
+    max_level = index['max_table'][level]
+
+    return {
+        'mean': float((index['prefix'][hi] - index['prefix'][lo]) / count),
+        'min': float(min(min_level[lo], min_level[hi - span])),
+        'max': float(max(max_level[lo], max_level[hi - span])),
+        'count': count,
+        'year_start': int(years[lo]),
+        'year_end': int(years[hi - 1])
+    }
+
+def get_state_series(index, year_start=None, year_end=None):
+    """
+    Get the (years, values) arrays of a state index within a year range
+    """
+    years = index['years']
+    lo = 0 if year_start is None else int(np.searchsorted(years, year_start, side='left'))
+    hi = len(years) if year_end is None else int(np.searchsorted(years, year_end, side='right'))
+    return years[lo:hi], index['values'][lo:hi]
+
+def get_rainfall_index(state):
+    """
+    Get the range statistics index for a state, building it on first use
+    The index is built once per dataset version
+    """
+    version_indexes = _current_indexes()
+    key = state.lower()
+    with _index_lock:
+        index = version_indexes.get(key)
+    if index is None:
+        df = fetch_climate_data(state=state)
+        if df is None or df.empty or 'Year' not in df.columns or 'Rainfall' not in df.columns:
+            return None
+        index = build_state_index(df['Year'].values, df['Rainfall'].values)
+        if is_fallback(df):
+            # Mock data standing in for a failed fetch is not kept under the live version
+            return index
+        with _index_lock:
+            index = version_indexes.setdefault(key, index)
+    return index
+
+def get_rainfall_indexes(states):
+    """
+    Get range statistics indexes for many states, building the missing ones from one concurrent fetch
+    Returns a dictionary keyed by lower-case state name
+    """
+    version_indexes = _current_indexes()
+    with _index_lock:
+        indexes = {state.lower(): version_indexes[state.lower()] for state in states if state.lower() in version_indexes}
+    missing = [state for state in states if state.lower() not in indexes]
+    # Fetched one state at a time, so the mock data standing in for a failed fetch is told apart
+    for state, df in zip(missing, fetch_climate_frames(missing)):
+        if df is None or df.empty or 'Year' not in df.columns or 'Rainfall' not in df.columns:
+            continue
+        indexes[state.lower()] = build_state_index(df['Year'].values, df['Rainfall'].values)
+        if not is_fallback(df):
+            with _index_lock:
+                indexes[state.lower()] = version_indexes.setdefault(state.lower(), indexes[state.lower()])
+    return indexes
+
+def get_rainfall_range_stats(state, year_start=None, year_end=None):
+    """
+    Get rainfall statistics for (state, year_start, year_end) in constant time
+    Returns a dictionary of statistics or None if the range is not covered
+    """
+    index = get_rainfall_index(state)
+    if index is None:
+        return None
+    return query_state_index(index, year_start, year_end)
+
+def clear_rainfall_index():
+    """
+    Drop all built indexes (e.g. after a dataset refresh)
+    """
+    with _index_lock:
+        _INDEX_CACHE.clear()
@@ -0,0 +1,187 @@
+"""
+Monthly and seasonal rainfall for every state
+
+The climate connector provides monthly rainfall as a region x year x month
+matrix. Subdivision matrices are aggregated to states with the subdivision area
+weights in one einsum, and a running sum along the month axis is kept, so the
+total of any month range (a season) for every state and year at once is a
+single vectorized subtraction. Tables are built once per dataset version and
+season totals once per month range.
+
+Ranges that wrap past December (e.g. rabi, October-March) are one season across
+two calendar years: the months from October of year Y and those up to March of
+Y+1 are added up and reported as season year Y (shown as 'Y-(Y+1)'). A season
+whose following year is not reported is left blank.
+"""
+import threading
+
+from data_connectors.climate_data import fetch_monthly_rainfall, get_climate_dataset_version, subdivision_weights
+from utils.constants import MONTH_NAMES
+from utils.helpers import entity_key, lookup_entity_code
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+# Built tables, keyed by dataset version; built under the lock, so concurrent
+# first requests wait for one build instead of each running their own
+_TABLE_CACHE = {}
+_table_lock = threading.Lock()
+
+def _current_table():
+    """State month table of the current dataset version; those of older versions are dropped"""
+    version = get_climate_dataset_version()
+    with _table_lock:
+        table = _TABLE_CACHE.get(version)
+        if table is None:
+            table = build_state_months(fetch_monthly_rainfall())
+            if table is None:
+                return None
+            _TABLE_CACHE.clear()
+            _TABLE_CACHE[version] = table
+        return table
+
+def build_state_months(monthly):
+    """
+    Build the state x year x month rainfall table with month prefix sums
+    Subdivision values are combined as area-weighted means over the subdivisions reported
+    Returns a dictionary, or None without monthly data
+    """
+    if monthly is None or not len(monthly['regions']):
+        return None
+    values = monthly['values'].astype(np.float64)
+    states = monthly['regions']
+
+    if monthly['kind'] == 'subdivision':
+        weights = subdivision_weights()
+        region_positions = {entity_key(region): i for i, region in enumerate(monthly['regions'])}
+        states = list(dict.fromkeys(weights['State']))
+        state_positions = {state: i for i, state in enumerate(states)}
+        area = np.zeros((len(states), len(region_positions)))
+        for key, state, weight in weights.itertuples(index=False, name=None):
+            if key in region_positions:
+                area[state_positions[state], region_positions[key]] = weight
+        reported = ~np.isnan(values)
+        weighted = np.einsum('tr,rym->tym', area, np.where(reported, values, 0.0))
+        covered = np.einsum('tr,rym->tym', area, reported)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(covered > 0, weighted / covered, np.nan)
+
+    # Missing months are counted separately, so one gap only blanks the ranges that contain it
+    missing = np.isnan(values)
+    start = np.zeros(values.shape[:2] + (1,))
+    prefix = np.concatenate([start, np.cumsum(np.where(missing, 0.0, values), axis=2)], axis=2)
+    missing_prefix = np.concatenate([start, np.cumsum(missing, axis=2)], axis=2)
+    positions = {}
+    for i, state in enumerate(states):
+        code = lookup_entity_code('state', state)
+        positions[code if code is not None else entity_key(state)] = i
+    return {'states': states, 'positions': positions, 'years': monthly['years'], 'values': values,
+            'prefix': prefix, 'missing_prefix': missing_prefix, 'seasons': {}}
+
+def season_totals(table, first_month, last_month):
+    """
+    Rainfall of a month range (inclusive) for every state and (season) year
+    Returns a (state, year) array; NaN where a month in the range is missing
+    """
+    prefix, missing_prefix = table['prefix'], table['missing_prefix']
+    if first_month <= last_month:
+        missing = missing_prefix[:, :, last_month] - missing_prefix[:, :, first_month - 1]
+        return np.where(missing > 0, np.nan, prefix[:, :, last_month] - prefix[:, :, first_month - 1])
+
+    # The tail of year Y joins the head of Y+1, which must be the next reported year
+    years = table['years']
+    following = np.minimum(np.searchsorted(years, years + 1), len(years) - 1)
+    consecutive = years[following] == years + 1
+    missing = (missing_prefix[:, :, 12] - missing_prefix[:, :, first_month - 1]) + missing_prefix[:, following, last_month]
+    totals = (prefix[:, :, 12] - prefix[:, :, first_month - 1]) + prefix[:, following, last_month]
+    return np.where((missing > 0) | ~consecutive, np.nan, totals)
+
+def season_year_label(year, first_month, last_month):
+    """
+    Label of a season year: '2018' for a range within the year, '2018-19' for one wrapping past December
+    """
+    year = int(year)
+    return f"{year}-{(year + 1) % 100:02d}" if first_month > last_month else f"{year}"
+
+def get_season_table(first_month, last_month):
+    """
+    Season totals of the current dataset version, computed once per month range
+    Returns (table, totals) or (None, None) without monthly data
+    """
+    table = _current_table()
+    if table is None:
+        return None, None
+    key = (first_month, last_month)
+    with _table_lock:
+        totals = table['seasons'].get(key)
+        if totals is None:
+            totals = table['seasons'][key] = season_totals(table, first_month, last_month)
+    return table, totals
+
+def state_position(table, state):
+    """Row of a state in a state month table, or None if it has no monthly data"""
+    code = lookup_entity_code('state', state)
+    return table['positions'].get(code if code is not None else entity_key(state))
+
+def get_season_series(state, first_month, last_month, year_start=None, year_end=None):
+    """
+    A state's rainfall for a month range in each year, with its long-term average
+    Returns {'years', 'values', 'normal'} or None if the state has no monthly data
+    """
+    table, totals = get_season_table(first_month, last_month)
+    if table is None:
+        return None
+    position = state_position(table, state)
+    if position is None:
+        return None
+    row = totals[position]
+    valid = ~np.isnan(row)
+    if not valid.any():
+        return None
+    years = table['years']
+    in_range = valid.copy()
+    if year_start:
+        in_range &= years >= int(year_start)
+    if year_end:
+        in_range &= years <= int(year_end)
+    return {'years': years[in_range], 'values': row[in_range], 'normal': float(row[valid].mean())}
+
+def get_season_averages(states, first_month, last_month, year_start=None, year_end=None):
+    """
+    Average rainfall of a month range over a year range for several states
+    Returns {state: average in mm} for the states with data
+    """
+    table, totals = get_season_table(first_month, last_month)
+    if table is None:
+        return {}
+    years = table['years']
+    in_range = np.ones(len(years), dtype=bool)
+    if year_start:
+        in_range &= years >= int(year_start)
+    if year_end:
+        in_range &= years <= int(year_end)
+    found = [(state, state_position(table, state)) for state in states]
+    found = [(state, position) for state, position in found if position is not None]
+    if not found or not in_range.any():
+        return {}
+    window = totals[[position for _, position in found]][:, in_range]
+    counts = (~np.isnan(window)).sum(axis=1)
+    sums = np.nansum(window, axis=1)
+    return {state: float(total / count) for (state, _), total, count in zip(found, sums, counts) if count}
+
+def describe_months(first_month, last_month, season=None):
+    """
+    Label of a month range, e.g. 'monsoon (June-September)'
+    """
+    if first_month == last_month:
+        months = MONTH_NAMES[first_month - 1]
+    else:
+        months = f"{MONTH_NAMES[first_month - 1]}-{MONTH_NAMES[last_month - 1]}"
+    return f"{season} ({months})" if season else months
+
+def clear_season_tables():
+    """
+    Drop all built tables (e.g. after a dataset refresh)
+    """
+    with _table_lock:
+        _TABLE_CACHE.clear()
@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import WARM_UP_ON_START, PREFETCH_RELATED
+from core.query_parser import parse_query
+from core.data_integrator import generate_answer
+from core.rainfall_index import get_rainfall_indexes
+from core.district_leaderboards import latest_crop_year
+from data_connectors.agriculture_data import fetch_agriculture_data_for_states, get_production_totals, get_agriculture_dataset_version
+from data_connectors.climate_data import get_climate_dataset_version
+from utils.constants import INDIAN_STATES, COMMON_CROPS, QUICK_QUERY_EXAMPLES
+
+# Intents answered from crop production data and from rainfall data
+CROP_INTENTS = {
+    'crop_production', 'crop_trend', 'highest_wheat_production',
+    'top_crops', 'top_crops_by_type', 'compare_crop_production',
+    'highest_yield_district', 'yield_trend', 'fastest_growing_crops', 'crop_growth_by_state', 'top_districts'
+}
+CLIMATE_INTENTS = {'climate_info', 'compare_rainfall', 'seasonal_rainfall', 'drought_years', 'rainfall_anomalies'}
+
+# Single-state questions whose default answers are precomputed for every state
+STATE_WARM_UP_INTENTS = ['climate_info', 'top_crops']
+
+_lock = threading.Lock()
+_warmed_versions = set()
+_prefetch_pool = None
+_prefetching = set()
+
+def warm_up(states=None, crops=None, examples=None):
+    """
+    Preload data, aggregates and example answers into the caches
+    Returns the time taken in seconds
+    """
+    states = INDIAN_STATES if states is None else states
+    crops = COMMON_CROPS if crops is None else crops
+    examples = QUICK_QUERY_EXAMPLES if examples is None else examples
+    started = time.perf_counter()
+
+    # Rainfall series and their range indexes
+    get_rainfall_indexes(states)
+
+    # Crop production per state and per state and crop
+    fetch_agriculture_data_for_states(states)
+    fetch_agriculture_data_for_states(states, crops)
+
+    # District leaderboards, built the first time their index is read
+    if crops:
+        latest_crop_year(crops[0])
+    
+    # Per-state crop totals and the default single-state answers
+    for state in states:
+        get_production_totals('Crop', state=state)
+        for intent in STATE_WARM_UP_INTENTS:
+            generate_answer(intent, {'states': [state]})
+    precompute_answers(examples)
+    return time.perf_counter() - started
+
+def precompute_answers(queries):
+    """
+    Answer queries once so later identical questions are served from the answer cache
+    """
+    for query in queries:
+        intent, params = parse_query(query)
+        generate_answer(intent, params)
+
+def start_warm_up():
+    """
+    Run the warm-up in a background thread, once per dataset version
+    Safe to call on every request: it only starts work after start-up, a dataset refresh or a failed warm-up
+    Returns the started thread, or None if there was nothing to do
+    """
+    if not WARM_UP_ON_START:
+        return None
+    version = (get_agriculture_dataset_version(), get_climate_dataset_version())
+    with _lock:
+        if version in _warmed_versions:
+            return None
+        _warmed_versions.add(version)
+
+    thread = threading.Thread(target=_run_warm_up, args=(version,), name='samarth-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+def _run_warm_up(version):
+    try:
+        elapsed = warm_up()
+        print(f"Warm-up finished in {elapsed:.1f} s")
+    except Exception as e:
+        print(f"Error during warm-up: {e}")
+        # The next request tries again
+        with _lock:
+            _warmed_versions.discard(version)
+
+def prefetch_for_query(intent, params):
+    """
+    Load the data a follow-up question is likely to need, in the background
+    A crop question about a state prefetches its rainfall; a rainfall question prefetches its crop totals
+    """
+    global _prefetch_pool
+    states = tuple(params.get('states', []))
+    if not PREFETCH_RELATED or not states:
+        return None
+    if intent in CROP_INTENTS:
+        task = ('climate', states)
+    elif intent in CLIMATE_INTENTS:
+        task = ('agriculture', states)
+    else:
+        return None
+
+    with _lock:
+        if task in _prefetching:
+            return None
+        _prefetching.add(task)
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='samarth-prefetch')
+    return _prefetch_pool.submit(_run_prefetch, task)
+
+def _run_prefetch(task):
+    dataset, states = task
+    try:
+        if dataset == 'climate':
+            get_rainfall_indexes(list(states))
+        else:
+            fetch_agriculture_data_for_states(list(states))
+            for state in states:
+                get_production_totals('Crop', state=state)
+    except Exception as e:
+        print(f"Error prefetching {dataset} data: {e}")
+    finally:
+        with _lock:
+            _prefetching.discard(task)
@@ -1,41 +1,52 @@
-import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from utils.constants import DATA_GOV_BASE_URL
-from config import DATA_GOV_API_KEY, API_BASE_URL, API_FORMAT, API_LIMIT, USE_MOCK_DATA, CROP_PRODUCTION_RESOURCE_ID
+from config import DATA_GOV_API_KEY, API_BASE_URL, API_FORMAT, API_LIMIT, USE_MOCK_DATA, CROP_PRODUCTION_RESOURCE_ID, USE_SQLITE_STORE, USE_SNAPSHOT, FETCH_WORKERS
+from data_connectors.sqlite_store import ingest_agriculture_frame, record_loaded_slice, is_slice_loaded, query_agriculture_data, query_production_totals, query_yield_totals, query_production_summary
+from data_connectors.snapshot import query_snapshot
+from data_connectors.versioning import get_dataset_version, observe_upstream, describe_version, mark_fallback, mark_derived, is_fallback
+from utils.cache import cached
+from utils.helpers import add_entity_codes, entity_mask, sum_by, yield_by
+from utils.metrics import inc_counter, timed
 import random
+import zlib
+from utils.lazy_import import lazy_import
 
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+def get_agriculture_dataset_version():
+    """
+    Identify the agriculture dataset that fetched data and derived results belong to
+    """
+    return get_agriculture_dataset_info()['id']
+
+def get_agriculture_dataset_info():
+    """
+    Version of the agriculture data being served: source, content hash, fetch time and upstream metadata
+    """
+    return get_dataset_version('agriculture', lambda: pd.DataFrame(_generate_mock_agriculture_data()))
+
+@cached('agriculture_data', maxsize=1024, version=get_agriculture_dataset_version, should_cache=lambda df: not df.empty and not is_fallback(df))
 def fetch_agriculture_data(state=None, crop=None, year_start=None, year_end=None):
     """
     Fetch agriculture data from data.gov.in
     Returns a pandas DataFrame with crop production data
     """
     try:
+        # Serve the request from the memory-mapped snapshot when one is configured
+        if USE_SNAPSHOT:
+            df = query_snapshot('agriculture', state, crop, year_start, year_end)
+            if df is not None:
+                return add_yield_column(add_entity_codes(df))
+        
+        # Serve the request from the local store if it already holds this slice
+        if USE_SQLITE_STORE and is_slice_loaded('agriculture', state, crop, year_start, year_end):
+            return add_yield_column(add_entity_codes(query_agriculture_data(state, crop, year_start, year_end)))
+        
         # Check if we should use mock data
         if USE_MOCK_DATA:
-            # For demo purposes, we'll create mock data that simulates real data structure
-            mock_data = _generate_mock_agriculture_data()
-            df = pd.DataFrame(mock_data)
-            
-            # Filter data based on parameters
-            if state:
-                # Use case-insensitive comparison with standard Python string operations
-                state_lower = state.lower()
-                mask = [str(x).lower() == state_lower for x in df['State']]
-                df = df[mask]
-                # If no data found for the specific state, generate mock data for it
-                if df.empty:
-                    df = _generate_mock_data_for_state(state, crop, year_start or 2018, year_end or 2018)
-            if crop:
-                # Use case-insensitive comparison with standard Python string operations
-                crop_lower = crop.lower()
-                mask = [str(x).lower() == crop_lower for x in df['Crop']]
-                df = df[mask]
-            if year_start:
-                df = df[df['Year'] >= year_start]
-            if year_end:
-                df = df[df['Year'] <= year_end]
-                
-            return df
+            return _mock_agriculture_slice(state, crop, year_start, year_end)
         
         # Try to fetch real data from data.gov.in
         df = _fetch_real_agriculture_data(state, crop, year_start, year_end)
@@ -43,61 +54,109 @@ def fetch_agriculture_data(state=None, crop=None, year_start=None, year_end=None
         # If real data fetch failed, fall back to mock data
         if df is None or df.empty:
             print("Using mock data as fallback")
-            # For demo purposes, we'll create mock data that simulates real data structure
-            mock_data = _generate_mock_agriculture_data()
-            df = pd.DataFrame(mock_data)
-            
-            # Filter data based on parameters
-            if state:
-                # Use case-insensitive comparison with standard Python string operations
-                state_lower = state.lower()
-                mask = [str(x).lower() == state_lower for x in df['State']]
-                df = df[mask]
-                # If no data found for the specific state, generate mock data for it
-                if df.empty:
-                    df = _generate_mock_data_for_state(state, crop, year_start or 2018, year_end or 2018)
-            if crop:
-                # Use case-insensitive comparison with standard Python string operations
-                crop_lower = crop.lower()
-                mask = [str(x).lower() == crop_lower for x in df['Crop']]
-                df = df[mask]
-            if year_start:
-                df = df[df['Year'] >= year_start]
-            if year_end:
-                df = df[df['Year'] <= year_end]
-                
-        return df
+            inc_counter('samarth_mock_fallbacks_total', {'dataset': 'agriculture'})
+            return mark_fallback(_mock_agriculture_slice(state, crop, year_start, year_end))
+        
+        # Only complete upstream responses are kept in the local store
+        return _store_agriculture_slice(df, state, crop, year_start, year_end)
     except Exception as e:
         print(f"Error fetching agriculture data: {e}")
         # Return empty DataFrame in case of error
         return pd.DataFrame()
 
+def filter_agriculture_frame(df, state=None, crop=None, year_start=None, year_end=None):
+    """
+    Filter a crop production DataFrame by state, crop (any known spelling) and year range
+    """
+    if state:
+        df = df[entity_mask(df, 'State', state)]
+    if crop:
+        df = df[entity_mask(df, 'Crop', crop)]
+    if year_start:
+        df = df[df['Year'] >= year_start]
+    if year_end:
+        df = df[df['Year'] <= year_end]
+    return df
+
+def fetch_agriculture_data_for_states(states, crops=None, year_start=None, year_end=None):
+    """
+    Fetch agriculture data for several states (and optionally several crops) in one batched pass
+    The per-slice requests run concurrently so latency stays close to that of a single fetch
+    Returns a single pandas DataFrame
+    """
+    slices = [(state, crop) for state in states for crop in (crops or [None])]
+    if not slices:
+        return pd.DataFrame()
+    
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(slices))) as pool:
+        frames = list(pool.map(
+            lambda item: fetch_agriculture_data(state=item[0], crop=item[1], year_start=year_start, year_end=year_end),
+            slices
+        ))
+    
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+def _mock_agriculture_slice(state, crop, year_start, year_end):
+    """
+    Mock data for a slice; it is never written to the local store
+    """
+    # For demo purposes, we'll create mock data that simulates real data structure
+    mock_data = _generate_mock_agriculture_data()
+    df = pd.DataFrame(mock_data)
+    
+    # Filter data based on parameters
+    if state:
+        df = filter_agriculture_frame(df, state=state)
+        # If no data found for the specific state, generate mock data for it
+        if df.empty:
+            df = _generate_mock_data_for_state(state, crop, year_start or 2018, year_end or 2018)
+    df = filter_agriculture_frame(df, crop=crop, year_start=year_start, year_end=year_end)
+    return add_yield_column(add_entity_codes(df))
+
+def _store_agriculture_slice(df, state, crop, year_start, year_end):
+    """
+    Canonicalize the names of a complete live slice, derive its yields and keep it in the
+    local store so later requests are served from its indexes
+    """
+    df = add_yield_column(add_entity_codes(df))
+    if USE_SQLITE_STORE and df is not None and not df.empty and ingest_agriculture_frame(df):
+        record_loaded_slice('agriculture', state, crop, year_start, year_end)
+    return df
+
+def add_yield_column(df):
+    """
+    Derive Yield (production per unit area) for every row at once; rows without an area get NaN
+    """
+    if df is None or df.empty or 'Area' not in df.columns or 'Yield' in df.columns:
+        return df
+    area = df['Area'].to_numpy(dtype=float, na_value=np.nan)
+    production = df['Production'].to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return df.assign(Yield=np.where(area > 0, production / area, np.nan))
+
 def get_agriculture_data_source():
     """
-    Get the data source information for agriculture data
+    Get the data source information for agriculture data, including the dataset version
     """
-    if USE_MOCK_DATA:
-        return f"{DATA_GOV_BASE_URL} (Mock Data - Crop Production Statistics)"
+    version = get_agriculture_dataset_info()
+    if version['source'] == 'mock':
+        return f"{DATA_GOV_BASE_URL} (Mock Data - Crop Production Statistics, {describe_version(version)})"
     
     # For real data, provide descriptive information about the data source
-    return f"{DATA_GOV_BASE_URL} (Crop Production Statistics Dataset)"
+    return f"{DATA_GOV_BASE_URL} (Crop Production Statistics Dataset, {describe_version(version)})"
 
 def _fetch_real_agriculture_data(state=None, crop=None, year_start=None, year_end=None):
     """
-    Fetch real agriculture data from data.gov.in API
-    Returns a pandas DataFrame or None if failed
+    Fetch real agriculture data from data.gov.in API, paging through every matching record
+    Returns a pandas DataFrame, or None if failed or the listing ended before its reported total
     """
     try:
         # Build API request
         url = f"{API_BASE_URL}/{CROP_PRODUCTION_RESOURCE_ID}"
         
-        # Set up parameters
-        params = {
-            "api-key": DATA_GOV_API_KEY,
-            "format": API_FORMAT,
-            "limit": API_LIMIT
-        }
-        
         # Add filters based on parameters
         filters = []
         if state:
@@ -108,76 +167,121 @@ def _fetch_real_agriculture_data(state=None, crop=None, year_start=None, year_en
             filters.append(f"year>={year_start}")
         if year_end:
             filters.append(f"year<={year_end}")
-            
-        if filters:
-            params["filters"] = "|".join(filters)
-        
-        # Make API request
-        response = requests.get(url, params=params)
-        response.raise_for_status()
         
-        # Parse response
-        data = response.json()
-        
-        # Convert to DataFrame
-        if 'records' in data:
-            df = pd.DataFrame(data['records'])
-            
-            # Handle different possible column names
-            # Map common column variations to our expected names
-            column_mapping = {}
-            
-            # State column mapping - Fix for actual API data
-            state_columns = ['state', 'state_name', 'State', 'State_Name']
-            for col in state_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'State'
-                    break
-            
-            # District column mapping - Fix for actual API data
-            district_columns = ['district', 'district_name', 'District', 'District_Name']
-            for col in district_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'District'
-                    break
-            
-            # Year column mapping - Fix for actual API data
-            year_columns = ['year', 'Year', 'crop_year', 'Year_Name']
-            for col in year_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'Year'
-                    break
+        frames = []
+        offset = 0
+        while True:
+            # Set up parameters
+            params = {
+                "api-key": DATA_GOV_API_KEY,
+                "format": API_FORMAT,
+                "offset": offset,
+                "limit": API_LIMIT
+            }
+            if filters:
+                params["filters"] = "|".join(filters)
             
-            # Crop column mapping - Fix for actual API data
-            crop_columns = ['crop', 'Crop', 'crop_name', 'Crop_Name']
-            for col in crop_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'Crop'
-                    break
+            # Make API request
+            try:
+                with timed('samarth_upstream_request_seconds', {'dataset': 'agriculture'}):
+                    response = requests.get(url, params=params)
+            except requests.RequestException:
+                inc_counter('samarth_upstream_requests_total', {'dataset': 'agriculture', 'status': 'error'})
+                raise
+            inc_counter('samarth_upstream_requests_total', {'dataset': 'agriculture', 'status': str(response.status_code)})
+            response.raise_for_status()
             
-            # Production column mapping - Fix for actual API data
-            # The API returns 'production_' not 'production'
-            production_columns = ['production', 'Production', 'crop_production', 'Production_Value', 'production_']
-            for col in production_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'Production'
-                    break
-            
-            # Apply column mapping
-            df = df.rename(columns=column_mapping)
-            
-            # Convert data types
-            if 'Year' in df.columns:
-                df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-            if 'Production' in df.columns:
-                df['Production'] = pd.to_numeric(df['Production'], errors='coerce')
-                
-            return df
+            # Parse response
+            data = response.json()
+            records = data.get('records') or []
+            total = int(data.get('total') or 0)
+            if records:
+                frames.append(agriculture_frame_from_records(records))
+                # Short pages advance by what actually arrived
+                offset += len(records)
+            if offset >= total:
+                break
+            if not records:
+                # A partial listing would pass for the whole slice, so it is not used at all
+                print(f"Crop production listing ended after {offset:,} of {total:,} records")
+                return None
+        
+        df = pd.concat(frames, ignore_index=True) if frames else None
+        # The live version follows the content of complete slices
+        observe_upstream('agriculture', data, df, (state, crop, year_start, year_end))
+        return df
             
     except Exception as e:
         print(f"Error fetching real agriculture data: {e}")
         return None
 
+def agriculture_frame_from_records(records):
+    """
+    Convert data.gov.in crop production records into a DataFrame in the connector's column layout
+    """
+    df = pd.DataFrame(records)
+
+    # Handle different possible column names
+    # Map common column variations to our expected names
+    column_mapping = {}
+
+    # State column mapping - Fix for actual API data
+    state_columns = ['state', 'state_name', 'State', 'State_Name']
+    for col in state_columns:
+        if col in df.columns:
+            column_mapping[col] = 'State'
+            break
+
+    # District column mapping - Fix for actual API data
+    district_columns = ['district', 'district_name', 'District', 'District_Name']
+    for col in district_columns:
+        if col in df.columns:
+            column_mapping[col] = 'District'
+            break
+
+    # Year column mapping - Fix for actual API data
+    year_columns = ['year', 'Year', 'crop_year', 'Year_Name']
+    for col in year_columns:
+        if col in df.columns:
+            column_mapping[col] = 'Year'
+            break
+
+    # Crop column mapping - Fix for actual API data
+    crop_columns = ['crop', 'Crop', 'crop_name', 'Crop_Name']
+    for col in crop_columns:
+        if col in df.columns:
+            column_mapping[col] = 'Crop'
+            break
+
+    # Production column mapping - Fix for actual API data
+    # The API returns 'production_' not 'production'
+    production_columns = ['production', 'Production', 'crop_production', 'Production_Value', 'production_']
+    for col in production_columns:
+        if col in df.columns:
+            column_mapping[col] = 'Production'
+            break
+
+    # Area column mapping (hectares); the API returns 'area_'
+    area_columns = ['area', 'Area', 'area_', 'Area_Value']
+    for col in area_columns:
+        if col in df.columns:
+            column_mapping[col] = 'Area'
+            break
+
+    # Apply column mapping
+    df = df.rename(columns=column_mapping)
+
+    # Convert data types
+    if 'Year' in df.columns:
+        df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+    if 'Production' in df.columns:
+        df['Production'] = pd.to_numeric(df['Production'], errors='coerce')
+    if 'Area' in df.columns:
+        df['Area'] = pd.to_numeric(df['Area'], errors='coerce', downcast='float')
+
+    # Upstream spellings (e.g. Orissa, Paddy) become canonical names with integer codes
+    return add_yield_column(add_entity_codes(df))
+
 def _generate_mock_data_for_state(state, crop, year_start, year_end):
     """
     Generate mock agriculture data for a specific state
@@ -212,28 +316,41 @@ def _generate_mock_data_for_state(state, crop, year_start, year_end):
     year_data = []
     crop_data = []
     production_data = []
+    area_data = []
     
-    for year in years:
-        for district in districts:
-            for i, crop_name in enumerate(selected_crops):
+    for crop_name in selected_crops:
+        # Each series gets its own level and trend; values are seeded by series and row,
+        # so every slice asked for (one crop, all crops, any years) shows the same figures
+        series = _seeded_random(state, crop_name)
+        base_production = series.randint(70000, 160000)
+        growth = series.uniform(-0.04, 0.05)
+        for year in years:
+            for district in districts:
+                row = _seeded_random(state, district, crop_name, year)
                 state_data.append(state)
                 district_data.append(district)
                 year_data.append(year)
                 crop_data.append(crop_name)
-                # Generate production values with some variation based on crop type
-                base_production = 100000 + (i * 30000)  # Different base for different crops
-                production_data.append(random.randint(base_production - 50000, base_production + 50000))
+                production = round(base_production * (1 + growth) ** (year - 2010) * row.uniform(0.75, 1.25))
+                production_data.append(production)
+                # Area from a yield of 1.5-4 units per hectare
+                area_data.append(round(production / row.uniform(1.5, 4.0)))
     
     mock_data = {
         'State': state_data,
         'District': district_data,
         'Year': year_data,
         'Crop': crop_data,
-        'Production': production_data
+        'Production': production_data,
+        'Area': area_data
     }
     
     return pd.DataFrame(mock_data)
 
+def _seeded_random(*key):
+    """Random generator seeded by a key, the same in every process (unlike hash())"""
+    return random.Random(zlib.crc32("|".join(str(part).lower() for part in key).encode('utf-8')))
+
 def _generate_mock_agriculture_data():
     """
     Generate mock agriculture data for demonstration purposes
@@ -264,7 +381,13 @@ def _generate_mock_agriculture_data():
                        180000, 110000, 75000, 105000, 65000,
                        135000, 92000, 88000, 220000, 52000,
                        150000, 140000, 98000, 240000, 102000,
-                       125000, 108000, 89000, 210000, 97000]
+                       125000, 108000, 89000, 210000, 97000],
+        # Hectares
+        'Area': [47200, 29100, 3200, 202700, 28000,
+                 69700, 39600, 70500, 259400, 77300,
+                 55200, 25900, 59100, 2700, 27900,
+                 38000, 50500, 36600, 3000, 216200,
+                 39100, 39100, 31200, 2400, 186500]
     }
     return mock_data
 
@@ -276,5 +399,84 @@ def get_top_crops_by_production(df, n=5):
         return []
     
     # Group by crop and sum production
-    top_crops = df.groupby('Crop')['Production'].sum().sort_values(ascending=False).head(n)
-    return top_crops.index.tolist()
\ No newline at end of file
+    top_crops = sum_by(df, 'Crop').sort_values(ascending=False).head(n)
+    return top_crops.index.tolist()
+
+def get_production_totals(group_by='Crop', state=None, crop=None, year_start=None, year_end=None, n=None):
+    """
+    Get total production grouped by a column ('Crop', 'District', 'Year' or 'State'), largest first
+    The aggregation runs inside the local store when it holds the slice
+    Returns a pandas Series indexed by the group column
+    """
+    if USE_SQLITE_STORE and is_slice_loaded('agriculture', state, crop, year_start, year_end):
+        return query_production_totals(group_by, state, crop, year_start, year_end, n)
+    
+    totals = _production_totals(group_by, state, crop, year_start, year_end)
+    return totals.head(n) if n else totals
+
+def get_yield_totals(group_by='District', state=None, crop=None, year_start=None, year_end=None, n=None):
+    """
+    Get area-weighted yields grouped by 'District', 'State', 'Crop' or 'Year', highest first
+    Served from the store's district rows and production summary when it holds the slice
+    Returns a pandas DataFrame with the group column(s), Production, Area and Yield
+    (District groups also carry their State)
+    """
+    if USE_SQLITE_STORE and is_slice_loaded('agriculture', state, crop, year_start, year_end):
+        return query_yield_totals(group_by, state, crop, year_start, year_end, n)
+    
+    totals = _yield_totals(group_by, state, crop, year_start, year_end)
+    return totals.head(n) if n else totals
+
+def get_series_totals():
+    """
+    Get the total production of every state, crop and year, e.g. to fit trends
+    Read from the store's production summary when it holds the whole dataset, else from
+    the whole resource (every page of it); empty when only mock data stands in for it
+    Returns a pandas DataFrame with State, Crop, Year and Production
+    """
+    if USE_SQLITE_STORE and is_slice_loaded('agriculture'):
+        return query_production_summary()
+
+    df = fetch_agriculture_data()
+    if df is None or df.empty or is_fallback(df):
+        return pd.DataFrame(columns=['State', 'Crop', 'Year', 'Production'])
+    return sum_by(df, ['State', 'Crop', 'Year']).reset_index()
+
+def get_district_totals():
+    """
+    Get the total production of every district, crop and year, e.g. to rank districts
+    Read from the store when it holds the whole dataset, else from the whole resource
+    (every page of it); empty when only mock data stands in for it
+    Returns a pandas DataFrame with State, District, Crop, Year and Production
+    """
+    if USE_SQLITE_STORE and is_slice_loaded('agriculture'):
+        df = add_entity_codes(query_agriculture_data())
+    else:
+        df = fetch_agriculture_data()
+    if df is None or df.empty or is_fallback(df):
+        return pd.DataFrame(columns=['State', 'District', 'Crop', 'Year', 'Production'])
+    return sum_by(df, ['State', 'District', 'Crop', 'Year']).reset_index()
+
+@cached('yield_totals', maxsize=1024, version=get_agriculture_dataset_version, should_cache=lambda totals: not totals.empty and not is_fallback(totals))
+def _yield_totals(group_by, state=None, crop=None, year_start=None, year_end=None):
+    """
+    Full sorted yield table for a slice, aggregated once per dataset version
+    """
+    df = fetch_agriculture_data(state=state, crop=crop, year_start=year_start, year_end=year_end)
+    if df is None or df.empty or group_by not in df.columns:
+        return pd.DataFrame()
+    
+    # District names repeat across states, so districts are reported with their state
+    totals = yield_by(df, ['State', 'District'] if group_by == 'District' else group_by)
+    return mark_derived(totals, df)
+
+@cached('production_totals', maxsize=1024, version=get_agriculture_dataset_version, should_cache=lambda totals: not totals.empty and not is_fallback(totals))
+def _production_totals(group_by, state=None, crop=None, year_start=None, year_end=None):
+    """
+    Full sorted production totals for a slice, cached so any top-N is a cheap head()
+    """
+    df = fetch_agriculture_data(state=state, crop=crop, year_start=year_start, year_end=year_end)
+    if df is None or df.empty or group_by not in df.columns:
+        return pd.Series(dtype=float)
+    
+    return mark_derived(sum_by(df, group_by).sort_values(ascending=False), df)
@@ -1,36 +1,62 @@
-import pandas as pd
-import requests
-from utils.constants import DATA_GOV_BASE_URL
-from config import DATA_GOV_API_KEY, API_BASE_URL, API_FORMAT, API_LIMIT, USE_MOCK_DATA, RAINFALL_DATA_RESOURCE_ID
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.constants import DATA_GOV_BASE_URL, RAINFALL_SUBDIVISION_AREAS
+from config import DATA_GOV_API_KEY, API_BASE_URL, API_FORMAT, API_LIMIT, USE_MOCK_DATA, RAINFALL_DATA_RESOURCE_ID, USE_SQLITE_STORE, USE_SNAPSHOT, FETCH_WORKERS
+from data_connectors.sqlite_store import ingest_climate_frame, record_loaded_slice, is_slice_loaded, query_climate_data, query_subdivision_months
+from data_connectors.snapshot import query_snapshot
+from data_connectors.versioning import get_dataset_version, observe_upstream, describe_version, mark_fallback, is_fallback
+from utils.cache import cached
+from utils.helpers import add_entity_codes, entity_mask, entity_key, lookup_entity_code
+from utils.metrics import inc_counter, timed
 import random
+from utils.lazy_import import lazy_import
 
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+# Monthly rainfall columns of the connector frames, in calendar order
+MONTH_COLUMNS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Typical share of annual rainfall per month, used to spread the mock annual figures over the year
+_MOCK_MONTH_SHARES = [0.01, 0.015, 0.02, 0.03, 0.05, 0.15, 0.25, 0.22, 0.14, 0.07, 0.03, 0.015]
+
+# State-level and monthly rainfall derived from the live subdivision records, rebuilt once per dataset version
+_live_rainfall = {'version': None, 'states': None, 'monthly': None}
+_live_rainfall_lock = threading.Lock()
+
+def get_climate_dataset_version():
+    """
+    Identify the climate dataset that fetched data and derived results belong to
+    """
+    return get_climate_dataset_info()['id']
+
+def get_climate_dataset_info():
+    """
+    Version of the climate data being served: source, content hash, fetch time and upstream metadata
+    """
+    return get_dataset_version('climate', lambda: pd.DataFrame(_generate_mock_climate_data()))
+
+@cached('climate_data', maxsize=512, version=get_climate_dataset_version, should_cache=lambda df: not df.empty and not is_fallback(df))
 def fetch_climate_data(state=None, year_start=None, year_end=None):
     """
     Fetch climate data (rainfall) from data.gov.in
     Returns a pandas DataFrame with rainfall data
     """
     try:
+        # Serve the request from the memory-mapped snapshot when one is configured
+        if USE_SNAPSHOT:
+            df = query_snapshot('climate', state, year_start=year_start, year_end=year_end)
+            if df is not None:
+                return add_entity_codes(df)
+        
+        # Serve the request from the local store if it already holds this slice
+        if USE_SQLITE_STORE and is_slice_loaded('climate', state, None, year_start, year_end):
+            return add_entity_codes(query_climate_data(state, year_start, year_end))
+        
         # Check if we should use mock data
         if USE_MOCK_DATA:
-            # For demo purposes, we'll create mock data that simulates real data structure
-            mock_data = _generate_mock_climate_data()
-            df = pd.DataFrame(mock_data)
-            
-            # Filter data based on parameters
-            if state:
-                # Use case-insensitive comparison with standard Python string operations
-                state_lower = state.lower()
-                mask = [str(x).lower() == state_lower for x in df['State']]
-                df = df[mask]
-                # If no data found for the specific state, generate mock data for it
-                if df.empty:
-                    df = _generate_mock_data_for_state(state, year_start or 2016, year_end or 2020)
-            if year_start:
-                df = df[df['Year'] >= year_start]
-            if year_end:
-                df = df[df['Year'] <= year_end]
-                
-            return df
+            return _mock_climate_slice(state, year_start, year_end)
         
         # Try to fetch real data from data.gov.in
         df = _fetch_real_climate_data(state, year_start, year_end)
@@ -38,121 +64,297 @@ def fetch_climate_data(state=None, year_start=None, year_end=None):
         # If real data fetch failed, fall back to mock data
         if df is None or df.empty:
             print("Using mock data as fallback")
-            # For demo purposes, we'll create mock data that simulates real data structure
-            mock_data = _generate_mock_climate_data()
-            df = pd.DataFrame(mock_data)
-            
-            # Filter data based on parameters
-            if state:
-                # Use case-insensitive comparison with standard Python string operations
-                state_lower = state.lower()
-                mask = [str(x).lower() == state_lower for x in df['State']]
-                df = df[mask]
-                # If no data found for the specific state, generate mock data for it
-                if df.empty:
-                    df = _generate_mock_data_for_state(state, year_start or 2016, year_end or 2020)
-            if year_start:
-                df = df[df['Year'] >= year_start]
-            if year_end:
-                df = df[df['Year'] <= year_end]
-                
-        return df
+            inc_counter('samarth_mock_fallbacks_total', {'dataset': 'climate'})
+            return mark_fallback(_mock_climate_slice(state, year_start, year_end))
+        
+        # Only complete upstream responses are kept in the local store
+        return _store_climate_slice(df, state, year_start, year_end)
     except Exception as e:
         print(f"Error fetching climate data: {e}")
         # Return empty DataFrame in case of error
         return pd.DataFrame()
 
+def filter_climate_frame(df, state=None, year_start=None, year_end=None):
+    """
+    Filter a rainfall DataFrame by state (any known spelling) and year range
+    """
+    if state:
+        df = df[entity_mask(df, 'State', state)]
+    if year_start:
+        df = df[df['Year'] >= year_start]
+    if year_end:
+        df = df[df['Year'] <= year_end]
+    return df
+
+def fetch_climate_data_for_states(states, year_start=None, year_end=None):
+    """
+    Fetch climate data for several states in one batched pass
+    The per-state requests run concurrently so latency stays close to that of a single fetch
+    Returns a single pandas DataFrame
+    """
+    frames = [df for df in fetch_climate_frames(states, year_start, year_end) if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+def fetch_climate_frames(states, year_start=None, year_end=None):
+    """
+    Fetch the climate data of several states concurrently
+    Returns one pandas DataFrame per state, in the order given
+    """
+    if not states:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(states))) as pool:
+        return list(pool.map(
+            lambda state: fetch_climate_data(state=state, year_start=year_start, year_end=year_end),
+            states
+        ))
+
+def _mock_climate_slice(state, year_start, year_end):
+    """
+    Mock data for a slice; it is never written to the local store
+    """
+    # For demo purposes, we'll create mock data that simulates real data structure
+    mock_data = _generate_mock_climate_data()
+    df = pd.DataFrame(mock_data)
+    
+    # Filter data based on parameters
+    if state:
+        df = filter_climate_frame(df, state=state)
+        # If no data found for the specific state, generate mock data for it
+        if df.empty:
+            df = _generate_mock_data_for_state(state, year_start or 2016, year_end or 2020)
+    df = filter_climate_frame(df, year_start=year_start, year_end=year_end)
+    return add_entity_codes(df)
+
+def _store_climate_slice(df, state, year_start, year_end):
+    """
+    Canonicalize the names of a complete live slice and keep it in the local store so
+    later requests are served from its indexes
+    """
+    df = add_entity_codes(df)
+    if USE_SQLITE_STORE and df is not None and not df.empty and ingest_climate_frame(df):
+        record_loaded_slice('climate', state, None, year_start, year_end)
+    return df
+
 def get_climate_data_source():
     """
-    Get the data source information for climate data
+    Get the data source information for climate data, including the dataset version
     """
-    if USE_MOCK_DATA:
-        return f"{DATA_GOV_BASE_URL} (Mock Data - Rainfall Statistics)"
+    version = get_climate_dataset_info()
+    if version['source'] == 'mock':
+        return f"{DATA_GOV_BASE_URL} (Mock Data - Rainfall Statistics, {describe_version(version)})"
     
     # For real data, provide descriptive information about the data source
-    return f"{DATA_GOV_BASE_URL} (Rainfall Statistics Dataset)"
+    return f"{DATA_GOV_BASE_URL} (Rainfall Statistics Dataset, {describe_version(version)})"
 
 def _fetch_real_climate_data(state=None, year_start=None, year_end=None):
     """
     Fetch real climate data from data.gov.in API
+    The resource is keyed by IMD subdivision, so state rows come from the precomputed
+    area-weighted state table rather than a per-state request
     Returns a pandas DataFrame or None if failed
     """
+    states = get_state_rainfall()
+    if states is None:
+        return None
+    if state:
+        code = lookup_entity_code('state', state)
+        df = states.get(code) if code is not None else None
+        if df is None:
+            return None
+    else:
+        df = pd.concat(list(states.values()), ignore_index=True)
+    return filter_climate_frame(df, year_start=year_start, year_end=year_end)
+
+def get_state_rainfall():
+    """
+    Annual rainfall of every state as the area-weighted mean of its subdivisions
+    Built from the whole live resource once per dataset version; later lookups are a dictionary access
+    Returns {state code: DataFrame}, or None if the resource could not be read
+    """
+    return _load_live_rainfall()['states']
+
+def _load_live_rainfall():
+    with _live_rainfall_lock:
+        if _live_rainfall['states'] is not None and _live_rainfall['version'] == get_climate_dataset_version():
+            return _live_rainfall
+        df = _fetch_subdivision_rainfall()
+        if df is None or df.empty or 'Subdivision' not in df.columns:
+            return {'states': None, 'monthly': None}
+        table = aggregate_subdivisions(df)
+        states = {int(code): rows.reset_index(drop=True) for code, rows in table.groupby('StateCode', sort=False)}
+        monthly = monthly_matrix(df, 'Subdivision') if all(column in df.columns for column in MONTH_COLUMNS) else None
+        # The fetch reports the upstream revision, so the version is read after it
+        _live_rainfall.update(version=get_climate_dataset_version(), states=states, monthly=monthly)
+        return _live_rainfall
+
+def fetch_monthly_rainfall():
+    """
+    Monthly rainfall of every region as a compact region x year x month matrix
+    Read from the local store's subdivision months, the live resource or the mock data
+    Returns {'kind': 'subdivision' or 'state', 'regions', 'years', 'values'}, or None without monthly data
+    """
     try:
-        # Build API request
-        url = f"{API_BASE_URL}/{RAINFALL_DATA_RESOURCE_ID}"
-        
-        # Set up parameters
-        params = {
-            "api-key": DATA_GOV_API_KEY,
-            "format": API_FORMAT,
-            "limit": API_LIMIT
-        }
-        
-        # Add filters based on parameters
-        filters = []
-        if state:
-            # Fix: Use 'subdivision' instead of 'state' for rainfall data API
-            filters.append(f"subdivision=={state}")
-        if year_start:
-            filters.append(f"year>={year_start}")
-        if year_end:
-            filters.append(f"year<={year_end}")
-            
-        if filters:
-            params["filters"] = "|".join(filters)
-        
-        # Make API request
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        if USE_SQLITE_STORE:
+            df = query_subdivision_months()
+            if not df.empty:
+                return monthly_matrix(df, 'Subdivision')
         
-        # Parse response
-        data = response.json()
+        if USE_MOCK_DATA:
+            return monthly_matrix(_generate_mock_monthly_data(), 'State')
         
-        # Convert to DataFrame
-        if 'records' in data:
-            df = pd.DataFrame(data['records'])
-            
-            # Handle different possible column names
-            # Map common column variations to our expected names
-            column_mapping = {}
-            
-            # State column mapping - Fix for actual API data
-            state_columns = ['state', 'state_name', 'State', 'State_Name', 'subdivision']
-            for col in state_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'State'
-                    break
-            
-            # Year column mapping - Fix for actual API data
-            year_columns = ['year', 'Year', 'crop_year', 'Year_Name']
-            for col in year_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'Year'
-                    break
-            
-            # Rainfall column mapping - Fix for actual API data
-            # The API returns 'annual' for annual rainfall data
-            rainfall_columns = ['rainfall', 'annual_rainfall', 'Rainfall', 'Annual_Rainfall', 'precipitation', 'annual']
-            for col in rainfall_columns:
-                if col in df.columns:
-                    column_mapping[col] = 'Rainfall'
-                    break
+        return _load_live_rainfall()['monthly']
+    except Exception as e:
+        print(f"Error fetching monthly rainfall: {e}")
+        return None
+
+def monthly_matrix(df, region_column):
+    """
+    Pack the month columns of a rainfall frame into a float32 (region, year, month) matrix
+    Region-years missing from the frame are NaN
+    """
+    region_codes, regions = pd.factorize(df[region_column])
+    year_codes, years = pd.factorize(pd.to_numeric(df['Year'], errors='coerce').astype('int64'), sort=True)
+    values = np.full((len(regions), len(years), len(MONTH_COLUMNS)), np.nan, dtype=np.float32)
+    months = df[MONTH_COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+    values[region_codes, year_codes] = months
+    kind = 'subdivision' if region_column == 'Subdivision' else 'state'
+    return {'kind': kind, 'regions': [str(region) for region in regions], 'years': np.asarray(years, dtype=np.int64), 'values': values}
+
+def _fetch_subdivision_rainfall():
+    """
+    Page through every record of the subdivision rainfall resource
+    Returns a pandas DataFrame, or None if failed or the listing ended before its reported total
+    """
+    try:
+        url = f"{API_BASE_URL}/{RAINFALL_DATA_RESOURCE_ID}"
+        frames = []
+        offset = 0
+        while True:
+            params = {
+                "api-key": DATA_GOV_API_KEY,
+                "format": API_FORMAT,
+                "offset": offset,
+                "limit": API_LIMIT
+            }
             
-            # Apply column mapping
-            df = df.rename(columns=column_mapping)
+            # Make API request
+            try:
+                with timed('samarth_upstream_request_seconds', {'dataset': 'climate'}):
+                    response = requests.get(url, params=params)
+            except requests.RequestException:
+                inc_counter('samarth_upstream_requests_total', {'dataset': 'climate', 'status': 'error'})
+                raise
+            inc_counter('samarth_upstream_requests_total', {'dataset': 'climate', 'status': str(response.status_code)})
+            response.raise_for_status()
             
-            # Convert data types
-            if 'Year' in df.columns:
-                df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-            if 'Rainfall' in df.columns:
-                df['Rainfall'] = pd.to_numeric(df['Rainfall'], errors='coerce')
-                
-            return df
+            # Parse response
+            data = response.json()
+            records = data.get('records') or []
+            total = int(data.get('total') or 0)
+            if records:
+                frames.append(climate_frame_from_records(records))
+                offset += len(records)
+            if offset >= total:
+                break
+            if not records:
+                # State rainfall from part of the subdivisions would be wrong, so none is derived
+                print(f"Rainfall listing ended after {offset:,} of {total:,} records")
+                return None
+        
+        df = pd.concat(frames, ignore_index=True) if frames else None
+        # The live version follows the content of the complete resource
+        observe_upstream('climate', data, df)
+        return df
             
     except Exception as e:
         print(f"Error fetching real climate data: {e}")
         return None
 
+def subdivision_weights():
+    """
+    The subdivision to state mapping as a DataFrame (SubdivisionKey, State, Area)
+    """
+    weights = pd.DataFrame(RAINFALL_SUBDIVISION_AREAS, columns=['Subdivision', 'State', 'Area'])
+    weights['SubdivisionKey'] = weights['Subdivision'].map(entity_key)
+    return weights[['SubdivisionKey', 'State', 'Area']]
+
+def aggregate_subdivisions(df):
+    """
+    Area-weighted annual rainfall per state and year from subdivision rows
+    A state's weights are renormalized over the subdivisions reported for each year
+    Returns a DataFrame in the connector's column layout
+    """
+    weights = subdivision_weights()
+    rows = df.dropna(subset=['Rainfall']).assign(SubdivisionKey=lambda frame: frame['Subdivision'].map(entity_key))
+    unmapped = sorted(set(rows.loc[~rows['SubdivisionKey'].isin(weights['SubdivisionKey']), 'Subdivision']))
+    if unmapped:
+        print(f"Rainfall subdivisions without a state mapping: {', '.join(map(str, unmapped))}")
+    rows = rows.merge(weights, on='SubdivisionKey')
+    rows = rows.assign(Weighted=rows['Rainfall'] * rows['Area'])
+    totals = rows.groupby(['State', 'Year'], sort=True)[['Weighted', 'Area']].sum()
+    table = (totals['Weighted'] / totals['Area']).rename('Rainfall').reset_index()
+    return add_entity_codes(table)
+
+def climate_frame_from_records(records):
+    """
+    Convert data.gov.in rainfall records into a DataFrame in the connector's column layout
+    IMD records keep their 'Subdivision' column; aggregate_subdivisions gives the state rows
+    """
+    df = pd.DataFrame(records)
+
+    # Handle different possible column names
+    # Map common column variations to our expected names
+    column_mapping = {}
+
+    # Subdivisions are not states (see utils.constants.RAINFALL_SUBDIVISION_AREAS)
+    if 'subdivision' in df.columns:
+        column_mapping['subdivision'] = 'Subdivision'
+
+    # State column mapping
+    state_columns = ['state', 'state_name', 'State', 'State_Name']
+    for col in state_columns:
+        if col in df.columns:
+            column_mapping[col] = 'State'
+            break
+
+    # Year column mapping - Fix for actual API data
+    year_columns = ['year', 'Year', 'crop_year', 'Year_Name']
+    for col in year_columns:
+        if col in df.columns:
+            column_mapping[col] = 'Year'
+            break
+
+    # Rainfall column mapping - Fix for actual API data
+    # The API returns 'annual' for annual rainfall data
+    rainfall_columns = ['rainfall', 'annual_rainfall', 'Rainfall', 'Annual_Rainfall', 'precipitation', 'annual']
+    for col in rainfall_columns:
+        if col in df.columns:
+            column_mapping[col] = 'Rainfall'
+            break
+
+    # Monthly columns (jan ... dec)
+    for column in MONTH_COLUMNS:
+        if column.lower() in df.columns:
+            column_mapping[column.lower()] = column
+
+    # Apply column mapping
+    df = df.rename(columns=column_mapping)
+
+    # Convert data types
+    if 'Year' in df.columns:
+        df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+    if 'Rainfall' in df.columns:
+        df['Rainfall'] = pd.to_numeric(df['Rainfall'], errors='coerce')
+    for column in MONTH_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+
+    # Upstream spellings (e.g. Orissa) become canonical names with integer codes
+    return add_entity_codes(df)
+
 def _generate_mock_data_for_state(state, year_start, year_end):
     """
     Generate mock climate data for a specific state
@@ -195,6 +397,15 @@ def _generate_mock_climate_data():
     }
     return mock_data
 
+def _generate_mock_monthly_data():
+    """
+    Spread the mock annual rainfall over the months with typical monthly shares
+    """
+    df = pd.DataFrame(_generate_mock_climate_data())
+    shares = np.array(_MOCK_MONTH_SHARES) / sum(_MOCK_MONTH_SHARES)
+    months = pd.DataFrame(np.outer(df['Rainfall'].to_numpy(dtype=float), shares), columns=MONTH_COLUMNS, index=df.index)
+    return pd.concat([df[['State', 'Year']], months], axis=1)
+
 def get_average_rainfall(df):
     """
     Calculate average rainfall from the dataframe
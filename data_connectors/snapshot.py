@@ -0,0 +1,211 @@
+"""
+Memory-mapped column snapshots of the ingested datasets
+
+A snapshot holds the crop production and rainfall data from the local SQLite
+store as one .npy file per column. Name columns (State, District, Crop) are
+dictionary-encoded: an integer code array plus a JSON list of the names. Every
+process memory-maps the files read-only, so the operating system keeps a single
+copy of the data in its page cache however many Streamlit, API or batch
+workers read it, and opening a snapshot only reads the small name lists.
+
+Layout of SNAPSHOT_DIR:
+    current                      name of the newest complete snapshot
+    <snapshot>/manifest.json     rows, columns and version per dataset
+    <snapshot>/<dataset>.<column>.npy
+    <snapshot>/<dataset>.<column>.names.json
+
+Snapshots are written to a new directory and published by replacing `current`,
+so readers never see a half-written snapshot. Write one after ingesting or
+syncing data with:
+    python -m data_connectors.snapshot [--dir snapshots]
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+from config import SNAPSHOT_DIR, SNAPSHOT_KEEP
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Column layout of each dataset, in the connectors' order; True marks dictionary-encoded names
+SNAPSHOT_COLUMNS = {
+    'agriculture': [('State', True), ('District', True), ('Year', False), ('Crop', True), ('Production', False), ('Area', False)],
+    'climate': [('State', True), ('Year', False), ('Rainfall', False)],
+}
+
+_lock = threading.Lock()
+_opened = {'directory': None, 'name': None, 'datasets': None, 'manifest': None}
+
+def write_snapshot(frames, directory=SNAPSHOT_DIR, versions=None):
+    """
+    Write {dataset: DataFrame} as a new snapshot and make it the current one
+    versions optionally gives {dataset: {'fetched_at', 'upstream'}} of where the data came from
+    Returns the snapshot directory
+    """
+    from data_connectors.versioning import content_hash
+
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+    manifest = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'datasets': {}, 'versions': {}}
+    for dataset, df in frames.items():
+        origin = (versions or {}).get(dataset) or {}
+        manifest['versions'][dataset] = {
+            'content_hash': content_hash(df),
+            'fetched_at': origin.get('fetched_at') or time.strftime('%Y-%m-%d %H:%M:%S'),
+            'upstream': origin.get('upstream') or {},
+        }
+        # Columns a frame lacks (e.g. Area from older sources) are left out of the snapshot
+        columns = [(column, encoded) for column, encoded in SNAPSHOT_COLUMNS[dataset] if column in df.columns]
+        for column, encoded in columns:
+            values = df[column]
+            if encoded:
+                codes, names = pd.factorize(values, sort=True)
+                np.save(os.path.join(path, f"{dataset}.{column}.npy"), codes.astype(np.int32))
+                with open(os.path.join(path, f"{dataset}.{column}.names.json"), 'w', encoding='utf-8') as f:
+                    json.dump([str(item) for item in names], f)
+            else:
+                dtype = np.int32 if column == 'Year' else np.float64
+                np.save(os.path.join(path, f"{dataset}.{column}.npy"),
+                        pd.to_numeric(values, errors='coerce').to_numpy(dtype=dtype, na_value=-1 if column == 'Year' else np.nan))
+        manifest['datasets'][dataset] = {'rows': len(df), 'columns': [column for column, _ in columns]}
+    with open(os.path.join(path, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Publish atomically, then drop old snapshots (open memory maps of them stay valid)
+    pointer = os.path.join(directory, 'current')
+    with open(pointer + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(pointer + '.tmp', pointer)
+    snapshots = sorted(entry for entry in os.listdir(directory) if os.path.isdir(os.path.join(directory, entry)))
+    for old in snapshots[:max(0, len(snapshots) - SNAPSHOT_KEEP)]:
+        if old != name:
+            shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+    return path
+
+def write_snapshot_from_store(directory=SNAPSHOT_DIR):
+    """
+    Snapshot everything the local SQLite store holds
+    """
+    from data_connectors.sqlite_store import query_agriculture_data, query_climate_data, get_stored_version
+    frames = {'agriculture': query_agriculture_data(), 'climate': query_climate_data()}
+    return write_snapshot(frames, directory, {dataset: get_stored_version(dataset) for dataset in frames})
+
+def open_snapshot(directory=SNAPSHOT_DIR):
+    """
+    Memory-map the current snapshot read-only, re-opening it when a newer one is published
+    Returns {dataset: {'rows', 'columns', 'codes', 'names', 'lookup', 'values'}}, or None without a snapshot
+    """
+    try:
+        with open(os.path.join(directory, 'current'), encoding='utf-8') as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        if _opened['directory'] == directory and _opened['name'] == name:
+            return _opened['datasets']
+        path = os.path.join(directory, name)
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        datasets = {}
+        for dataset, info in manifest['datasets'].items():
+            data = {'rows': info['rows'], 'columns': info['columns'], 'codes': {}, 'names': {}, 'lookup': {}, 'values': {}}
+            for column in info['columns']:
+                array = np.load(os.path.join(path, f"{dataset}.{column}.npy"), mmap_mode='r')
+                names_path = os.path.join(path, f"{dataset}.{column}.names.json")
+                if os.path.exists(names_path):
+                    with open(names_path, encoding='utf-8') as f:
+                        names = json.load(f)
+                    data['codes'][column] = array
+                    # A trailing None decodes the missing-value code -1
+                    data['names'][column] = np.array(names + [None], dtype=object)
+                    data['lookup'][column] = {item.lower(): code for code, item in enumerate(names)}
+                else:
+                    data['values'][column] = array
+            datasets[dataset] = data
+        _opened.update(directory=directory, name=name, datasets=datasets, manifest=manifest)
+        return datasets
+
+def get_snapshot_manifest(directory=SNAPSHOT_DIR):
+    """
+    Get the manifest of the current snapshot, or None without a snapshot
+    """
+    if open_snapshot(directory) is None:
+        return None
+    with _lock:
+        return _opened['manifest']
+
+def load_snapshot_frame(dataset, directory=SNAPSHOT_DIR):
+    """
+    Build a DataFrame over the memory-mapped columns without copying them
+    Name columns are categoricals over the shared code arrays
+    Returns None without a snapshot
+    """
+    snapshot = open_snapshot(directory)
+    if snapshot is None or dataset not in snapshot:
+        return None
+    data = snapshot[dataset]
+    columns = {}
+    for column in data['columns']:
+        if column in data['codes']:
+            columns[column] = pd.Categorical.from_codes(data['codes'][column], categories=data['names'][column][:-1])
+        else:
+            columns[column] = data['values'][column]
+    return pd.DataFrame(columns, copy=False)
+
+def query_snapshot(dataset, state=None, crop=None, year_start=None, year_end=None, directory=SNAPSHOT_DIR):
+    """
+    Read the rows matching the connector filters from the current snapshot
+    Names are matched case-insensitively on their codes; only the selected rows are decoded
+    Returns a pandas DataFrame in the connector's column layout, or None without a snapshot
+    """
+    snapshot = open_snapshot(directory)
+    if snapshot is None or dataset not in snapshot:
+        return None
+    data = snapshot[dataset]
+
+    mask = None
+    for column, value in (('State', state), ('Crop', crop)):
+        if not value or column not in data['codes']:
+            continue
+        code = data['lookup'][column].get(str(value).lower())
+        if code is None:
+            return pd.DataFrame(columns=data['columns'])
+        condition = data['codes'][column] == code
+        mask = condition if mask is None else mask & condition
+    for bound, compare in ((year_start, np.greater_equal), (year_end, np.less_equal)):
+        if bound:
+            condition = compare(data['values']['Year'], int(bound))
+            mask = condition if mask is None else mask & condition
+
+    rows = np.flatnonzero(mask) if mask is not None else np.arange(data['rows'])
+    columns = {}
+    for column in data['columns']:
+        if column in data['codes']:
+            columns[column] = data['names'][column][data['codes'][column][rows]]
+        else:
+            # Years are widened back to int64, the dtype the other sources produce
+            columns[column] = data['values'][column][rows].astype(np.int64 if column == 'Year' else np.float64)
+    return pd.DataFrame(columns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a memory-mapped snapshot of the local SQLite store")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    path = write_snapshot_from_store(args.dir)
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    rows = ", ".join(f"{dataset} {info['rows']:,} rows" for dataset, info in manifest['datasets'].items())
+    print(f"Snapshot written to {path} ({rows}; {size / 2 ** 20:.1f} MB) in {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,570 @@
+import json
+import sqlite3
+import threading
+from config import SQLITE_DB_PATH
+from utils.constants import RAINFALL_SUBDIVISION_AREAS
+from utils.helpers import entity_key, normalize_crop_name, normalize_state_name
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+# Normalized schema for crop production and rainfall data
+# The covering indexes let filtered scans and aggregations run from the index alone
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS states (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS crops (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS districts (
+    id INTEGER PRIMARY KEY,
+    state_id INTEGER NOT NULL REFERENCES states(id),
+    name TEXT NOT NULL COLLATE NOCASE,
+    UNIQUE (state_id, name)
+);
+CREATE TABLE IF NOT EXISTS crop_production (
+    state_id INTEGER NOT NULL REFERENCES states(id),
+    district_id INTEGER NOT NULL REFERENCES districts(id),
+    crop_id INTEGER NOT NULL REFERENCES crops(id),
+    year INTEGER NOT NULL,
+    production REAL,
+    area REAL,
+    PRIMARY KEY (district_id, crop_id, year)
+);
+CREATE INDEX IF NOT EXISTS idx_crop_production_state_crop_year
+    ON crop_production (state_id, crop_id, year, district_id, production);
+CREATE INDEX IF NOT EXISTS idx_crop_production_state_year
+    ON crop_production (state_id, year, crop_id, production);
+CREATE TABLE IF NOT EXISTS rainfall (
+    state_id INTEGER NOT NULL REFERENCES states(id),
+    year INTEGER NOT NULL,
+    rainfall REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rainfall_state_year
+    ON rainfall (state_id, year);
+CREATE TABLE IF NOT EXISTS subdivision_rainfall (
+    subdivision TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    rainfall REAL,
+    PRIMARY KEY (subdivision, year)
+);
+CREATE TABLE IF NOT EXISTS subdivision_months (
+    subdivision TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    jan REAL, feb REAL, mar REAL, apr REAL, may REAL, jun REAL,
+    jul REAL, aug REAL, sep REAL, oct REAL, nov REAL, dec REAL,
+    PRIMARY KEY (subdivision, year)
+);
+CREATE TABLE IF NOT EXISTS subdivision_states (
+    subdivision TEXT NOT NULL,
+    state_id INTEGER NOT NULL REFERENCES states(id),
+    area REAL NOT NULL,
+    PRIMARY KEY (subdivision, state_id)
+);
+CREATE INDEX IF NOT EXISTS idx_subdivision_states_state
+    ON subdivision_states (state_id, subdivision, area);
+CREATE TABLE IF NOT EXISTS production_summary (
+    state_id INTEGER NOT NULL REFERENCES states(id),
+    crop_id INTEGER NOT NULL REFERENCES crops(id),
+    year INTEGER NOT NULL,
+    production REAL,
+    area REAL,
+    yield_production REAL,
+    PRIMARY KEY (state_id, crop_id, year)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource_id TEXT PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    record_offset INTEGER NOT NULL DEFAULT 0,
+    total_records INTEGER,
+    updated_date TEXT,
+    synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS dataset_versions (
+    dataset TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    upstream TEXT
+);
+CREATE TABLE IF NOT EXISTS loaded_slices (
+    dataset TEXT NOT NULL,
+    state TEXT COLLATE NOCASE,
+    crop TEXT COLLATE NOCASE,
+    year_start INTEGER,
+    year_end INTEGER
+);
+"""
+
+# Month columns of subdivision_months, in calendar order
+_MONTH_COLUMNS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# One connection per thread; WAL mode lets readers run alongside a writer
+_local = threading.local()
+_write_lock = threading.Lock()
+
+def get_connection():
+    """
+    Get the SQLite connection for the current thread, creating the schema on first use
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(SQLITE_DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _add_area_columns(conn)
+        _backfill_production_summary(conn)
+        _seed_subdivision_states(conn)
+        _local.conn = conn
+    return conn
+
+def _add_area_columns(conn):
+    """
+    Add the area columns to stores created before yields were tracked
+    """
+    added = {
+        'crop_production': ['area'],
+        'production_summary': ['area', 'yield_production'],
+    }
+    for table, columns in added.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in columns:
+            if column not in existing:
+                with _write_lock, conn:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} REAL")
+
+# Rows counted in yields: those reporting both a production and an area
+_YIELD_ROW = "area > 0 AND production IS NOT NULL"
+
+# Summary columns: total production, and the area and production of the rows counted in
+# yields, so a group's area-weighted yield is yield_production / area
+_SUMMARY_AGGREGATES = (
+    f"SUM(production), SUM(CASE WHEN {_YIELD_ROW} THEN area END), SUM(CASE WHEN {_YIELD_ROW} THEN production END)"
+)
+
+def _backfill_production_summary(conn):
+    """
+    Build the production summary for stores created before it existed
+    """
+    if conn.execute("SELECT 1 FROM production_summary LIMIT 1").fetchone():
+        return
+    if not conn.execute("SELECT 1 FROM crop_production LIMIT 1").fetchone():
+        return
+    with _write_lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO production_summary (state_id, crop_id, year, production, area, yield_production)"
+            f" SELECT state_id, crop_id, year, {_SUMMARY_AGGREGATES} FROM crop_production GROUP BY state_id, crop_id, year"
+        )
+
+def _refresh_production_summary(conn, groups):
+    """
+    Recompute the summary rows of the (state_id, crop_id, year) groups touched by an ingest
+    Only those groups are re-aggregated, so a small delta stays cheap on a large store
+    """
+    groups = list(groups)
+    conn.executemany(
+        "DELETE FROM production_summary WHERE state_id = ? AND crop_id = ? AND year = ?", groups
+    )
+    conn.executemany(
+        "INSERT INTO production_summary (state_id, crop_id, year, production, area, yield_production)"
+        f" SELECT state_id, crop_id, year, {_SUMMARY_AGGREGATES} FROM crop_production"
+        " WHERE state_id = ? AND crop_id = ? AND year = ? GROUP BY state_id, crop_id, year",
+        groups
+    )
+
+def _seed_subdivision_states(conn):
+    """
+    Load the rainfall subdivision to state mapping with its area weights
+    Subdivisions are keyed by entity_key, so '&' and 'and' spellings match
+    """
+    if conn.execute("SELECT COUNT(*) FROM subdivision_states").fetchone()[0] == len(RAINFALL_SUBDIVISION_AREAS):
+        return
+    with _write_lock, conn:
+        state_ids = {}
+        conn.execute("DELETE FROM subdivision_states")
+        conn.executemany(
+            "INSERT OR REPLACE INTO subdivision_states (subdivision, state_id, area) VALUES (?, ?, ?)",
+            [(entity_key(subdivision), _get_or_create_id(conn, 'states', state, state_ids), area)
+             for subdivision, state, area in RAINFALL_SUBDIVISION_AREAS]
+        )
+
+def _refresh_state_rainfall(conn, groups):
+    """
+    Recompute the annual rainfall of the (state_id, year) groups touched by a subdivision ingest
+    A state's rainfall is the area-weighted mean of the subdivisions reported for that year
+    """
+    groups = list(groups)
+    conn.executemany("DELETE FROM rainfall WHERE state_id = ? AND year = ?", groups)
+    conn.executemany(
+        "INSERT INTO rainfall (state_id, year, rainfall)"
+        " SELECT ss.state_id, sr.year, SUM(sr.rainfall * ss.area) / SUM(ss.area)"
+        " FROM subdivision_states ss JOIN subdivision_rainfall sr ON sr.subdivision = ss.subdivision"
+        " WHERE ss.state_id = ? AND sr.year = ? AND sr.rainfall IS NOT NULL"
+        " GROUP BY ss.state_id, sr.year",
+        groups
+    )
+
+def _get_or_create_id(conn, table, name, cache, state_id=None):
+    """
+    Look up the surrogate key of a dimension row, inserting it if missing
+    """
+    key = (state_id, str(name).lower())
+    if key in cache:
+        return cache[key]
+    if table == 'districts':
+        conn.execute("INSERT OR IGNORE INTO districts (state_id, name) VALUES (?, ?)", (state_id, name))
+        row = conn.execute("SELECT id FROM districts WHERE state_id = ? AND name = ?", (state_id, name)).fetchone()
+    else:
+        conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+        row = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()
+    cache[key] = row[0]
+    return row[0]
+
+def ingest_agriculture_frame(df):
+    """
+    Insert or replace crop production rows from a connector DataFrame
+    """
+    required = ['State', 'District', 'Year', 'Crop', 'Production']
+    if df is None or df.empty or any(col not in df.columns for col in required):
+        return 0
+
+    rows = df[required].dropna(subset=['State', 'District', 'Year', 'Crop'])
+    # Frames without an area column (older sources) store NULL areas
+    areas = df.loc[rows.index, 'Area'] if 'Area' in df.columns else pd.Series(index=rows.index, dtype=float)
+    conn = get_connection()
+    with _write_lock, conn:
+        ids = {}
+        records = []
+        for (state, district, year, crop, production), area in zip(rows.itertuples(index=False, name=None), areas):
+            state_id = _get_or_create_id(conn, 'states', state, ids.setdefault('states', {}))
+            district_id = _get_or_create_id(conn, 'districts', district, ids.setdefault('districts', {}), state_id)
+            crop_id = _get_or_create_id(conn, 'crops', crop, ids.setdefault('crops', {}))
+            production = None if pd.isna(production) else float(production)
+            area = None if pd.isna(area) else float(area)
+            records.append((state_id, district_id, crop_id, int(year), production, area))
+        conn.executemany(
+            "INSERT OR REPLACE INTO crop_production (state_id, district_id, crop_id, year, production, area) VALUES (?, ?, ?, ?, ?, ?)",
+            records
+        )
+        _refresh_production_summary(conn, {(state_id, crop_id, year) for state_id, _, crop_id, year, _, _ in records})
+    return len(records)
+
+def ingest_climate_frame(df):
+    """
+    Insert or replace annual rainfall rows from a connector DataFrame
+    Subdivision rows are kept as such and the rainfall of the states they cover is re-derived
+    """
+    if df is not None and 'Subdivision' in df.columns:
+        return _ingest_subdivision_frame(df)
+    required = ['State', 'Year', 'Rainfall']
+    if df is None or df.empty or any(col not in df.columns for col in required):
+        return 0
+
+    rows = df[required].dropna(subset=['State', 'Year'])
+    conn = get_connection()
+    with _write_lock, conn:
+        state_ids = {}
+        records = []
+        for state, year, rainfall in rows.itertuples(index=False, name=None):
+            state_id = _get_or_create_id(conn, 'states', state, state_ids)
+            rainfall = None if pd.isna(rainfall) else float(rainfall)
+            records.append((state_id, int(year), rainfall))
+        conn.executemany(
+            "INSERT OR REPLACE INTO rainfall (state_id, year, rainfall) VALUES (?, ?, ?)",
+            records
+        )
+    return len(records)
+
+def _ingest_subdivision_frame(df):
+    required = ['Subdivision', 'Year', 'Rainfall']
+    if df.empty or any(col not in df.columns for col in required):
+        return 0
+
+    rows = df[required].dropna(subset=['Subdivision', 'Year'])
+    conn = get_connection()
+    with _write_lock, conn:
+        covered = {}
+        for subdivision, state_id in conn.execute("SELECT subdivision, state_id FROM subdivision_states"):
+            covered.setdefault(subdivision, []).append(state_id)
+        records = []
+        groups = set()
+        for subdivision, year, rainfall in rows.itertuples(index=False, name=None):
+            key = entity_key(subdivision)
+            rainfall = None if pd.isna(rainfall) else float(rainfall)
+            records.append((key, int(year), rainfall))
+            groups.update((state_id, int(year)) for state_id in covered.get(key, ()))
+        conn.executemany(
+            "INSERT OR REPLACE INTO subdivision_rainfall (subdivision, year, rainfall) VALUES (?, ?, ?)",
+            records
+        )
+        _refresh_state_rainfall(conn, groups)
+        months = [column.title() for column in _MONTH_COLUMNS]
+        if all(column in df.columns for column in months):
+            month_rows = df.loc[rows.index, months].astype(float)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO subdivision_months (subdivision, year, {', '.join(_MONTH_COLUMNS)})"
+                f" VALUES (?, ?, {', '.join('?' * len(_MONTH_COLUMNS))})",
+                [(key, year) + tuple(None if pd.isna(value) else value for value in values)
+                 for (key, year, _), values in zip(records, month_rows.itertuples(index=False, name=None))]
+            )
+    return len(records)
+
+def record_loaded_slice(dataset, state=None, crop=None, year_start=None, year_end=None):
+    """
+    Remember that a (state, crop, year range) slice of a dataset is fully held in the store
+    Names are kept in their canonical spelling, so the slice is found under any alias
+    """
+    state = normalize_state_name(state) if state else None
+    crop = normalize_crop_name(crop) if crop else None
+    conn = get_connection()
+    with _write_lock, conn:
+        conn.execute(
+            "INSERT INTO loaded_slices (dataset, state, crop, year_start, year_end) VALUES (?, ?, ?, ?, ?)",
+            (dataset, state, crop, year_start, year_end)
+        )
+
+def get_sync_state(resource_id):
+    """
+    Get the high-water mark of a synced resource
+    Returns a dictionary, or None if the resource was never synced
+    """
+    row = get_connection().execute(
+        "SELECT dataset, record_offset, total_records, updated_date, synced_at FROM sync_state WHERE resource_id = ?",
+        (resource_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(('dataset', 'record_offset', 'total_records', 'updated_date', 'synced_at'), row))
+
+def save_sync_state(resource_id, dataset, record_offset, total_records, updated_date):
+    """
+    Store the high-water mark of a synced resource
+    """
+    conn = get_connection()
+    with _write_lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (resource_id, dataset, record_offset, total_records, updated_date, synced_at)"
+            " VALUES (?, ?, ?, ?, ?, datetime('now'))",
+            (resource_id, dataset, record_offset, total_records, updated_date)
+        )
+
+def get_stored_version(dataset):
+    """
+    Get the version recorded for the data of 'agriculture' or 'climate' held in the store
+    Returns a dictionary, or None if no sync has recorded one
+    """
+    row = get_connection().execute(
+        "SELECT content_hash, fetched_at, upstream FROM dataset_versions WHERE dataset = ?", (dataset,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {'content_hash': row[0], 'fetched_at': row[1], 'upstream': json.loads(row[2] or '{}')}
+
+def save_stored_version(dataset, content_hash, fetched_at, upstream):
+    """
+    Record the version of a dataset held in the store
+    """
+    conn = get_connection()
+    with _write_lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO dataset_versions (dataset, content_hash, fetched_at, upstream) VALUES (?, ?, ?, ?)",
+            (dataset, content_hash, fetched_at, json.dumps(upstream))
+        )
+
+def get_latest_year(dataset):
+    """
+    Latest year held in the store for 'agriculture' or 'climate', or None if empty
+    """
+    table = 'crop_production' if dataset == 'agriculture' else 'rainfall'
+    return get_connection().execute(f"SELECT MAX(year) FROM {table}").fetchone()[0]
+
+def is_slice_loaded(dataset, state=None, crop=None, year_start=None, year_end=None):
+    """
+    Check whether a previously loaded slice covers the requested filters
+    """
+    conditions = ["dataset = ?"]
+    args = [dataset]
+    if state:
+        conditions.append("(state IS NULL OR state = ?)")
+        args.append(normalize_state_name(state))
+    else:
+        conditions.append("state IS NULL")
+    if crop:
+        conditions.append("(crop IS NULL OR crop = ?)")
+        args.append(normalize_crop_name(crop))
+    else:
+        conditions.append("crop IS NULL")
+    if year_start:
+        conditions.append("(year_start IS NULL OR year_start <= ?)")
+        args.append(int(year_start))
+    else:
+        conditions.append("year_start IS NULL")
+    if year_end:
+        conditions.append("(year_end IS NULL OR year_end >= ?)")
+        args.append(int(year_end))
+    else:
+        conditions.append("year_end IS NULL")
+
+    sql = "SELECT 1 FROM loaded_slices WHERE " + " AND ".join(conditions) + " LIMIT 1"
+    return get_connection().execute(sql, args).fetchone() is not None
+
+def _agriculture_filters(state=None, crop=None, year_start=None, year_end=None):
+    """
+    Translate connector filters into an indexed SQL WHERE clause
+    Names are matched in their canonical spelling, which is how rows are ingested
+    """
+    conditions = []
+    args = []
+    if state:
+        conditions.append("cp.state_id = (SELECT id FROM states WHERE name = ?)")
+        args.append(normalize_state_name(state))
+    if crop:
+        conditions.append("cp.crop_id = (SELECT id FROM crops WHERE name = ?)")
+        args.append(normalize_crop_name(crop))
+    if year_start:
+        conditions.append("cp.year >= ?")
+        args.append(int(year_start))
+    if year_end:
+        conditions.append("cp.year <= ?")
+        args.append(int(year_end))
+    where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+    return where, args
+
+def query_agriculture_data(state=None, crop=None, year_start=None, year_end=None):
+    """
+    Read crop production rows matching the filters
+    Returns a pandas DataFrame in the connector's column layout
+    """
+    where, args = _agriculture_filters(state, crop, year_start, year_end)
+    sql = (
+        "SELECT s.name AS State, d.name AS District, cp.year AS Year, c.name AS Crop, cp.production AS Production,"
+        " cp.area AS Area"
+        " FROM crop_production cp"
+        " JOIN states s ON s.id = cp.state_id"
+        " JOIN districts d ON d.id = cp.district_id"
+        " JOIN crops c ON c.id = cp.crop_id"
+        + where +
+        " ORDER BY cp.year, d.name, c.name"
+    )
+    return pd.read_sql_query(sql, get_connection(), params=args)
+
+def query_production_totals(group_by, state=None, crop=None, year_start=None, year_end=None, n=None):
+    """
+    Sum production grouped by 'Crop', 'District', 'Year' or 'State', largest first
+    Groupings above district level read the pre-aggregated production summary
+    Returns a pandas Series indexed by the group column
+    """
+    group_columns = {
+        'Crop': ("c.name", "JOIN crops c ON c.id = cp.crop_id"),
+        'District': ("d.name", "JOIN districts d ON d.id = cp.district_id"),
+        'State': ("s.name", "JOIN states s ON s.id = cp.state_id"),
+        'Year': ("cp.year", ""),
+    }
+    if group_by not in group_columns:
+        raise ValueError(f"Unsupported group column: {group_by}")
+    column, join = group_columns[group_by]
+
+    table = 'crop_production' if group_by == 'District' else 'production_summary'
+
+    where, args = _agriculture_filters(state, crop, year_start, year_end)
+    sql = (
+        f"SELECT {column} AS {group_by}, SUM(cp.production) AS Production"
+        f" FROM {table} cp {join}"
+        + where +
+        f" GROUP BY {column}"
+        " ORDER BY Production DESC"
+    )
+    if n:
+        sql += " LIMIT ?"
+        args = args + [int(n)]
+    df = pd.read_sql_query(sql, get_connection(), params=args)
+    return df.set_index(group_by)['Production']
+
+def query_production_summary():
+    """
+    Read the production summary: total production of every state, crop and year
+    Returns a pandas DataFrame with State, Crop, Year and Production
+    """
+    sql = (
+        "SELECT s.name AS State, c.name AS Crop, ps.year AS Year, ps.production AS Production"
+        " FROM production_summary ps"
+        " JOIN states s ON s.id = ps.state_id"
+        " JOIN crops c ON c.id = ps.crop_id"
+    )
+    return pd.read_sql_query(sql, get_connection())
+
+def query_yield_totals(group_by, state=None, crop=None, year_start=None, year_end=None, n=None):
+    """
+    Area-weighted yield grouped by 'District', 'State', 'Crop' or 'Year', highest first
+    District yields come from the district rows, the others from the production summary;
+    only rows reporting both a production and an area count
+    Returns a pandas DataFrame with the group column(s), Production, Area and Yield
+    """
+    group_columns = {
+        'District': ("s.name AS State, d.name AS District", "cp.district_id",
+                     "JOIN districts d ON d.id = cp.district_id JOIN states s ON s.id = cp.state_id"),
+        'State': ("s.name AS State", "cp.state_id", "JOIN states s ON s.id = cp.state_id"),
+        'Crop': ("c.name AS Crop", "cp.crop_id", "JOIN crops c ON c.id = cp.crop_id"),
+        'Year': ("cp.year AS Year", "cp.year", ""),
+    }
+    if group_by not in group_columns:
+        raise ValueError(f"Unsupported group column: {group_by}")
+    columns, group, join = group_columns[group_by]
+
+    if group_by == 'District':
+        table = 'crop_production'
+        counted = "cp.area > 0 AND cp.production IS NOT NULL"
+        production, area = f"SUM(CASE WHEN {counted} THEN cp.production END)", f"SUM(CASE WHEN {counted} THEN cp.area END)"
+    else:
+        table = 'production_summary'
+        production, area = "SUM(cp.yield_production)", "SUM(cp.area)"
+
+    where, args = _agriculture_filters(state, crop, year_start, year_end)
+    sql = (
+        f"SELECT {columns}, {production} AS Production, {area} AS Area, {production} / {area} AS Yield"
+        f" FROM {table} cp {join}"
+        + where +
+        f" GROUP BY {group} HAVING {area} > 0"
+        " ORDER BY Yield DESC"
+    )
+    if n:
+        sql += " LIMIT ?"
+        args = args + [int(n)]
+    return pd.read_sql_query(sql, get_connection(), params=args)
+
+def query_climate_data(state=None, year_start=None, year_end=None):
+    """
+    Read annual rainfall rows matching the filters
+    Returns a pandas DataFrame in the connector's column layout
+    """
+    conditions = []
+    args = []
+    if state:
+        conditions.append("r.state_id = (SELECT id FROM states WHERE name = ?)")
+        args.append(normalize_state_name(state))
+    if year_start:
+        conditions.append("r.year >= ?")
+        args.append(int(year_start))
+    if year_end:
+        conditions.append("r.year <= ?")
+        args.append(int(year_end))
+    where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+    sql = (
+        "SELECT s.name AS State, r.year AS Year, r.rainfall AS Rainfall"
+        " FROM rainfall r JOIN states s ON s.id = r.state_id"
+        + where +
+        " ORDER BY s.name, r.year"
+    )
+    return pd.read_sql_query(sql, get_connection(), params=args)
+
+def query_subdivision_months():
+    """
+    Read the monthly rainfall of every subdivision and year held in the store
+    Returns a pandas DataFrame with Subdivision, Year and one column per month (Jan ... Dec)
+    """
+    months = ", ".join(f"{column} AS {column.title()}" for column in _MONTH_COLUMNS)
+    sql = f"SELECT subdivision AS Subdivision, year AS Year, {months} FROM subdivision_months ORDER BY subdivision, year"
+    return pd.read_sql_query(sql, get_connection())
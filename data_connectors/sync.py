@@ -0,0 +1,147 @@
+"""
+Incremental sync of the data.gov.in resources into the local SQLite store
+
+Every resource keeps a high-water mark in the store's sync_state table: the
+record offset consumed so far, the resource's total record count and its
+updated_date. A sync first asks the API for the current total and updated_date,
+then fetches only:
+    nothing                        if neither changed
+    records past the stored offset if records were appended
+    the latest SYNC_REVISION_YEARS if the resource was revised in place
+    everything                     on the first run, with --full, or if the resource shrank
+
+Pages are merged into the store as they arrive (rows are keyed, so re-fetched
+records replace the old ones) and the offset is saved after every page, so an
+interrupted sync resumes where it stopped. Production totals per state, crop
+and year are re-aggregated only for the groups a page touched. When rows were
+merged, the dataset's content hash is recomputed and stored as its version.
+
+Usage:
+    python -m data_connectors.sync [--dataset agriculture climate] [--full] [--page-size 1000]
+"""
+import argparse
+import time
+
+from config import (DATA_GOV_API_KEY, API_BASE_URL, CROP_PRODUCTION_RESOURCE_ID, RAINFALL_DATA_RESOURCE_ID,
+                    USE_SQLITE_STORE, SQLITE_DB_PATH, SYNC_PAGE_SIZE, SYNC_RETRIES, SYNC_REVISION_YEARS)
+from data_connectors.agriculture_data import agriculture_frame_from_records
+from data_connectors.climate_data import climate_frame_from_records
+from data_connectors.sqlite_store import (ingest_agriculture_frame, ingest_climate_frame, record_loaded_slice,
+                                          is_slice_loaded, get_sync_state, save_sync_state, get_latest_year,
+                                          query_agriculture_data, query_climate_data,
+                                          get_stored_version, save_stored_version)
+from data_connectors.versioning import content_hash, refresh_versions
+from utils.metrics import inc_counter, timed
+from utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
+
+# dataset: (resource id, records -> DataFrame, DataFrame -> store, store -> DataFrame)
+SYNC_RESOURCES = {
+    'agriculture': (CROP_PRODUCTION_RESOURCE_ID, agriculture_frame_from_records, ingest_agriculture_frame, query_agriculture_data),
+    'climate': (RAINFALL_DATA_RESOURCE_ID, climate_frame_from_records, ingest_climate_frame, query_climate_data),
+}
+
+def fetch_page(dataset, offset, limit, filters=None):
+    """
+    Fetch one page of a resource, retrying failed requests with exponential backoff
+    Returns the decoded JSON payload
+    """
+    resource_id = SYNC_RESOURCES[dataset][0]
+    params = {"api-key": DATA_GOV_API_KEY, "format": "json", "offset": offset, "limit": limit}
+    if filters:
+        params["filters"] = "|".join(filters)
+
+    for attempt in range(SYNC_RETRIES):
+        try:
+            with timed('samarth_upstream_request_seconds', {'dataset': dataset}):
+                response = requests.get(f"{API_BASE_URL}/{resource_id}", params=params, timeout=60)
+            inc_counter('samarth_upstream_requests_total', {'dataset': dataset, 'status': str(response.status_code)})
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            if getattr(e, 'response', None) is None:
+                inc_counter('samarth_upstream_requests_total', {'dataset': dataset, 'status': 'error'})
+            if attempt == SYNC_RETRIES - 1:
+                raise
+            print(f"Retrying {dataset} page at offset {offset}: {e}")
+            time.sleep(2 ** attempt)
+
+def sync_dataset(dataset, full=False, page_size=SYNC_PAGE_SIZE):
+    """
+    Bring one resource in the local store up to date with the API
+    Returns a summary dictionary (mode, records fetched, rows merged, requests made)
+    """
+    resource_id, frame_from_records, ingest, read_store = SYNC_RESOURCES[dataset]
+    state = get_sync_state(resource_id)
+    head = fetch_page(dataset, 0, 1)
+    total = int(head.get('total') or 0)
+    updated_date = head.get('updated_date') or head.get('updated')
+    updated_date = None if updated_date is None else str(updated_date)
+
+    filters = None
+    if full or state is None or total < state['record_offset']:
+        mode, start = 'full', 0
+    elif total > state['record_offset']:
+        mode, start = 'delta', state['record_offset']
+    elif updated_date != state['updated_date']:
+        # Same number of records but a newer revision: corrections land in the latest years
+        latest_year = get_latest_year(dataset)
+        mode, start = 'revision', 0
+        if latest_year is not None:
+            filters = [f"year>={latest_year - SYNC_REVISION_YEARS + 1}"]
+    else:
+        mode, start = 'unchanged', total
+
+    summary = {'dataset': dataset, 'mode': mode, 'total_records': total, 'fetched': 0, 'merged': 0, 'requests': 1}
+    offset = start
+    while mode != 'unchanged':
+        payload = fetch_page(dataset, offset, page_size, filters)
+        summary['requests'] += 1
+        records = payload.get('records') or []
+        if not records:
+            break
+        summary['fetched'] += len(records)
+        summary['merged'] += ingest(frame_from_records(records))
+        # Short pages advance by what actually arrived
+        offset += len(records)
+        if filters is None:
+            save_sync_state(resource_id, dataset, offset, total, updated_date)
+        if offset >= int(payload.get('total') or 0):
+            break
+
+    # A revision pass pages through a filtered listing, so it leaves the high-water offset as it was
+    record_offset = offset if filters is None else state['record_offset']
+    save_sync_state(resource_id, dataset, record_offset, total, updated_date)
+    if record_offset >= total and not is_slice_loaded(dataset):
+        # The store now holds the whole resource, so every fetch can be served from it
+        record_loaded_slice(dataset)
+    stored = get_stored_version(dataset)
+    if summary['merged'] or stored is None:
+        digest = content_hash(read_store())
+        # Identical re-fetched records give the same hash, so the version and cached results stay valid
+        if stored is None or stored['content_hash'] != digest:
+            upstream = {'resource_id': resource_id, 'updated_date': updated_date, 'total_records': total}
+            save_stored_version(dataset, digest, time.strftime('%Y-%m-%d %H:%M:%S'), upstream)
+            refresh_versions()
+        summary['version'] = digest[:12]
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally sync data.gov.in resources into the local SQLite store")
+    parser.add_argument("--dataset", nargs="+", choices=sorted(SYNC_RESOURCES), default=sorted(SYNC_RESOURCES))
+    parser.add_argument("--full", action="store_true", help="re-fetch every record instead of the delta")
+    parser.add_argument("--page-size", type=int, default=SYNC_PAGE_SIZE, help="records per request")
+    args = parser.parse_args()
+
+    if not USE_SQLITE_STORE:
+        print(f"Note: USE_SQLITE_STORE is off, so the app will not read the synced store at {SQLITE_DB_PATH}")
+    for dataset in args.dataset:
+        started = time.perf_counter()
+        summary = sync_dataset(dataset, full=args.full, page_size=args.page_size)
+        print(f"{dataset}: {summary['mode']}, {summary['fetched']:,} records fetched, {summary['merged']:,} rows merged "
+              f"in {summary['requests']} requests ({time.perf_counter() - started:.1f} s); "
+              f"resource holds {summary['total_records']:,} records")
+
+if __name__ == "__main__":
+    main()
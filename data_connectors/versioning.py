@@ -0,0 +1,171 @@
+"""
+Dataset versions for precise cache invalidation
+
+Each dataset the connectors serve ('agriculture', 'climate') has a version:
+where its rows come from (snapshot, store, mock or live API), a content hash,
+the fetch time and the upstream metadata (updated_date, record count). The
+version id is part of every cache key built on a dataset - fetched slices,
+production totals, rainfall indexes and complete answers with their charts -
+so a refresh that changes a dataset invalidates exactly the entries built on
+it, and a refresh that re-fetched identical records invalidates nothing.
+
+Versions come from, in the order the connectors read data:
+    the snapshot manifest    written by python -m data_connectors.snapshot
+    the store                written by python -m data_connectors.sync
+    the mock data            hashed once
+    live API responses       a hash of the updated_date and of the records fetched so far
+
+Versions written by other processes are picked up within VERSION_CHECK_INTERVAL seconds.
+
+Mock data served because a live fetch failed is flagged (mark_fallback) rather
+than versioned: it carries the live version id, so frames, indexes and answers
+built from it are not cached and the next request tries the API again.
+"""
+import hashlib
+import threading
+import time
+
+from config import USE_MOCK_DATA, USE_SQLITE_STORE, USE_SNAPSHOT, VERSION_CHECK_INTERVAL
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+SOURCE_LABELS = {'snapshot': "local snapshot", 'store': "local store", 'mock': "mock data", 'live': "data.gov.in"}
+
+_lock = threading.Lock()
+_versions = {}  # dataset: version currently served
+_checked = {}  # dataset: time of the last check for a newer persisted version
+_live = {}  # dataset: version of the live API responses
+_live_slices = {}  # dataset: {slice: (record total, content hash) as last fetched}
+_fallbacks = 0  # mock fallbacks served so far
+
+def content_hash(df):
+    """
+    Hash the rows of a DataFrame independently of their order
+    """
+    if df is None or df.empty:
+        return hashlib.sha256(b'').hexdigest()[:16]
+    row_hashes = np.sort(pd.util.hash_pandas_object(df[sorted(df.columns)], index=False).to_numpy())
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()[:16]
+
+def make_version(source, digest=None, fetched_at=None, upstream=None):
+    """
+    Build a version dictionary; its 'id' is the content hash, or the source and creation
+    time before any content was hashed
+    """
+    upstream = upstream or {}
+    fetched_at = fetched_at or time.strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        'id': digest[:12] if digest else f"{source}:{fetched_at}",
+        'source': source,
+        'content_hash': digest,
+        'fetched_at': fetched_at,
+        'upstream': upstream,
+    }
+
+def get_dataset_version(dataset, mock_frame):
+    """
+    Get the version of the data a connector currently serves
+    mock_frame is a callable returning the mock data; it is only hashed when mock data is served
+    """
+    now = time.monotonic()
+    with _lock:
+        current = _versions.get(dataset)
+        if current is not None and now - _checked.get(dataset, 0) < VERSION_CHECK_INTERVAL:
+            return current
+        _checked[dataset] = now
+
+    version = _persisted_version(dataset)
+    if version is None and USE_MOCK_DATA:
+        # Mock data only changes with the code, so its hash is computed once
+        version = current if current is not None and current['source'] == 'mock' else make_version('mock', content_hash(mock_frame()))
+    if version is None:
+        with _lock:
+            # Until a live fetch completes, the version is the one made when first asked for
+            version = _live.setdefault(dataset, make_version('live'))
+    with _lock:
+        _versions[dataset] = version
+    return version
+
+def _persisted_version(dataset):
+    """Version recorded by a snapshot or a sync, if the connectors read from one"""
+    if USE_SNAPSHOT:
+        from data_connectors.snapshot import get_snapshot_manifest
+        manifest = get_snapshot_manifest()
+        stored = (manifest or {}).get('versions', {}).get(dataset)
+        if stored:
+            return make_version('snapshot', stored['content_hash'], stored['fetched_at'], stored['upstream'])
+    if USE_SQLITE_STORE:
+        from data_connectors.sqlite_store import get_stored_version
+        stored = get_stored_version(dataset)
+        if stored:
+            return make_version('store', stored['content_hash'], stored['fetched_at'], stored['upstream'])
+    return None
+
+def observe_upstream(dataset, payload, df=None, scope=None):
+    """
+    Note a complete live fetch of one slice of a dataset (scope identifies it, e.g. its filters)
+    payload is the last API response, with the upstream revision and record total; df holds the fetched records
+    A new revision, or a slice fetched before returning other records, becomes a new version;
+    the first fetch of a slice extends the current version
+    """
+    updated_date = payload.get('updated_date') or payload.get('updated')
+    upstream = {'updated_date': str(updated_date) if updated_date is not None else None}
+    fetched = (str(payload.get('total')), content_hash(df))
+    with _lock:
+        current = _live.get(dataset)
+        slices = _live_slices.setdefault(dataset, {})
+        revised = current is None or current['content_hash'] is None or current['upstream'] != upstream
+        if revised:
+            slices.clear()
+        elif slices.get(scope, fetched) == fetched:
+            slices[scope] = fetched
+            return
+        slices[scope] = fetched
+        state = repr((upstream['updated_date'], sorted(slices.items(), key=repr)))
+        _live[dataset] = make_version('live', hashlib.sha256(state.encode()).hexdigest()[:16], upstream=upstream)
+        _checked.pop(dataset, None)
+
+def mark_fallback(df):
+    """
+    Flag a frame as mock data served in place of a failed live fetch
+    """
+    global _fallbacks
+    with _lock:
+        _fallbacks += 1
+    df.attrs['fallback'] = True
+    return df
+
+def mark_derived(result, source):
+    """
+    Carry the fallback flag of a source frame over to a result aggregated from it
+    """
+    if is_fallback(source):
+        result.attrs['fallback'] = True
+    return result
+
+def is_fallback(df):
+    """
+    Whether a frame (or a result marked as derived from one) is mock data standing in for live data
+    """
+    return bool(getattr(df, 'attrs', {}).get('fallback'))
+
+def fallback_count():
+    """
+    Number of mock fallbacks served so far; a result built while it changed may rest on one
+    """
+    with _lock:
+        return _fallbacks
+
+def refresh_versions():
+    """Re-read persisted versions on the next lookup (after a sync or snapshot in this process)"""
+    with _lock:
+        _checked.clear()
+
+def describe_version(version):
+    """Short human-readable description of a version, for data source listings"""
+    text = f"version {version['id']}, {SOURCE_LABELS.get(version['source'], version['source'])}, fetched {version['fetched_at']}"
+    if version['upstream'].get('updated_date') and version['source'] != 'live':
+        text += f", upstream updated {version['upstream']['updated_date']}"
+    return text
@@ -0,0 +1,353 @@
+"""
+Local stand-in for the data.gov.in resource API
+
+Serves /resource/{id} for the crop production and rainfall resources configured
+in config.py from deterministic synthetic data, so the real-API code path in the
+connectors can be exercised offline. Latency, server errors, throttling, short
+pages and truncated payloads can be injected to see how the connectors and the
+caching layers behave under a misbehaving upstream.
+
+Supported query parameters:
+    api-key                  required, any non-empty value
+    format                   json (default), csv or xml
+    limit, offset            pagination
+    filters                  pipe-separated expressions, e.g. state==Punjab|year>=2010
+                             (operators ==, !=, >=, <=, >, <)
+    filters[field]=value     equality filter, as accepted by data.gov.in
+
+GET /stats returns the number of responses sent per status code.
+
+Point the app at it with:
+    SAMARTH_USE_MOCK_DATA=0 SAMARTH_API_BASE_URL=http://127.0.0.1:8765/resource streamlit run app.py
+
+Usage:
+    python fake_data_gov_server.py [--port 8765] [--latency lognormal --latency-ms 200]
+                                   [--error-rate 0.05] [--rate-limit 20]
+                                   [--partial-rate 0.1] [--truncate-rate 0.02]
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+from config import CROP_PRODUCTION_RESOURCE_ID, RAINFALL_DATA_RESOURCE_ID
+from utils.constants import INDIAN_STATES, COMMON_CROPS
+
+# IMD meteorological subdivisions, as named in the rainfall dataset
+RAINFALL_SUBDIVISIONS = [
+    "Andaman & Nicobar Islands", "Arunachal Pradesh", "Assam & Meghalaya", "Naga Mani Mizo Tripura",
+    "Sub Himalayan West Bengal & Sikkim", "Gangetic West Bengal", "Orissa", "Jharkhand", "Bihar",
+    "East Uttar Pradesh", "West Uttar Pradesh", "Uttarakhand", "Haryana Delhi & Chandigarh", "Punjab",
+    "Himachal Pradesh", "Jammu & Kashmir", "West Rajasthan", "East Rajasthan", "West Madhya Pradesh",
+    "East Madhya Pradesh", "Gujarat Region", "Saurashtra & Kutch", "Konkan & Goa", "Madhya Maharashtra",
+    "Matathwada", "Vidarbha", "Chhattisgarh", "Coastal Andhra Pradesh", "Telangana", "Rayalseema",
+    "Tamil Nadu", "Coastal Karnataka", "North Interior Karnataka", "South Interior Karnataka", "Kerala",
+    "Lakshadweep"
+]
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+# Typical share of annual rainfall per month (the south-west monsoon dominates)
+MONTH_WEIGHTS = [0.01, 0.015, 0.02, 0.03, 0.05, 0.15, 0.25, 0.22, 0.14, 0.07, 0.03, 0.015]
+
+# Short filter names accepted for the long record field names
+FIELD_ALIASES = {'state': 'state_name', 'district': 'district_name', 'year': 'crop_year'}
+
+def generate_crop_records(districts_per_state=5, year_start=1997, year_end=2020, seed=0):
+    """Synthetic crop production records in the data.gov.in field layout"""
+    rng = random.Random(seed)
+    records = []
+    for state in INDIAN_STATES:
+        crops = rng.sample(COMMON_CROPS, 6)
+        for district_number in range(1, districts_per_state + 1):
+            district = f"{state} District {district_number}"
+            for year in range(year_start, year_end + 1):
+                for crop in crops:
+                    area = rng.randint(1000, 60000)
+                    records.append({
+                        'state_name': state,
+                        'district_name': district,
+                        'crop_year': year,
+                        'season': 'Whole Year',
+                        'crop': crop,
+                        'area_': area,
+                        'production_': round(area * rng.uniform(0.8, 4.5), 1),
+                    })
+    return records
+
+def generate_rainfall_records(year_start=1901, year_end=2017, seed=0):
+    """Synthetic subdivision rainfall records in the IMD dataset layout (mm)"""
+    rng = random.Random(seed)
+    records = []
+    for subdivision in RAINFALL_SUBDIVISIONS:
+        normal = rng.uniform(500, 3000)
+        for year in range(year_start, year_end + 1):
+            annual = max(50.0, rng.gauss(normal, normal * 0.18))
+            months = [round(annual * weight * rng.uniform(0.6, 1.4), 1) for weight in MONTH_WEIGHTS]
+            record = {'subdivision': subdivision, 'year': year}
+            record.update(zip(MONTHS, months))
+            record['annual'] = round(sum(months), 1)
+            record['jan_feb'] = round(sum(months[0:2]), 1)
+            record['mar_may'] = round(sum(months[2:5]), 1)
+            record['jun_sep'] = round(sum(months[5:9]), 1)
+            record['oct_dec'] = round(sum(months[9:12]), 1)
+            records.append(record)
+    return records
+
+_FILTER_PATTERN = re.compile(r'^\s*([\w.]+)\s*(==|!=|>=|<=|>|<)\s*(.*?)\s*$')
+
+def parse_filters(query_args):
+    """
+    Parse the filters of a request into (field, operator, value) tuples
+    Raises ValueError for malformed expressions
+    """
+    filters = []
+    for expression in query_args.get('filters', []):
+        for part in expression.split('|'):
+            if not part.strip():
+                continue
+            match = _FILTER_PATTERN.match(part)
+            if not match:
+                raise ValueError(f"Invalid filter expression: {part}")
+            filters.append(match.groups())
+    for name, values in query_args.items():
+        if name.startswith('filters[') and name.endswith(']'):
+            filters.extend((name[len('filters['):-1], '==', value) for value in values)
+    return filters
+
+def _compare(record_value, operator, value):
+    try:
+        left, right = float(record_value), float(value)
+    except (TypeError, ValueError):
+        left, right = str(record_value).lower(), str(value).lower()
+    return {
+        '==': left == right, '!=': left != right,
+        '>=': left >= right, '<=': left <= right,
+        '>': left > right, '<': left < right,
+    }[operator]
+
+def apply_filters(records, filters):
+    """Keep the records matching every filter; unknown fields match nothing"""
+    if not filters:
+        return records
+    fields = records[0].keys() if records else ()
+    resolved = [(field if field in fields else FIELD_ALIASES.get(field, field), operator, value)
+                for field, operator, value in filters]
+    return [record for record in records
+            if all(field in record and _compare(record[field], operator, value) for field, operator, value in resolved)]
+
+def render_records(payload, records, output_format):
+    """Serialize a response in the requested format; returns (content type, body bytes)"""
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        if records:
+            writer = csv.DictWriter(buffer, fieldnames=list(records[0].keys()))
+            writer.writeheader()
+            writer.writerows(records)
+        return 'text/csv', buffer.getvalue().encode('utf-8')
+    if output_format == 'xml':
+        items = "".join(
+            "<item>" + "".join(f"<{key}>{escape(str(value))}</{key}>" for key, value in record.items()) + "</item>"
+            for record in records
+        )
+        meta = "".join(f"<{key}>{escape(str(value))}</{key}>" for key, value in payload.items() if key != 'records')
+        return 'application/xml', f"<?xml version=\"1.0\"?><result>{meta}<records>{items}</records></result>".encode('utf-8')
+    return 'application/json', json.dumps(payload).encode('utf-8')
+
+class FaultInjector:
+    """
+    Decides per request whether to delay, fail, throttle, shorten or truncate the response
+    """
+    def __init__(self, latency='none', latency_ms=0.0, latency_max_ms=10000.0, error_rate=0.0,
+                 rate_limit=0.0, partial_rate=0.0, truncate_rate=0.0, seed=None):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_max_ms = latency_max_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.partial_rate = partial_rate
+        self.truncate_rate = truncate_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # Token bucket holding up to one second of requests
+        self.tokens = rate_limit
+        self.refilled_at = time.monotonic()
+
+    def _chance(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def delay_seconds(self):
+        with self.lock:
+            if self.latency == 'constant':
+                delay = self.latency_ms
+            elif self.latency == 'uniform':
+                delay = self.random.uniform(0, 2 * self.latency_ms)
+            elif self.latency == 'lognormal':
+                # latency_ms is the median; sigma 0.75 gives a long tail like a busy upstream
+                delay = self.random.lognormvariate(math.log(max(self.latency_ms, 0.001)), 0.75)
+            else:
+                delay = 0.0
+        return min(delay, self.latency_max_ms) / 1000
+
+    def throttled(self):
+        """Take a token from the bucket; True if the request must be rejected with 429"""
+        if self.rate_limit <= 0:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate_limit, self.tokens + (now - self.refilled_at) * self.rate_limit)
+            self.refilled_at = now
+            if self.tokens < 1:
+                return True
+            self.tokens -= 1
+            return False
+
+    def server_error(self):
+        return self._chance(self.error_rate)
+
+    def partial_page(self):
+        return self._chance(self.partial_rate)
+
+    def truncated(self):
+        return self._chance(self.truncate_rate)
+
+class FakeDataGovHandler(BaseHTTPRequestHandler):
+    """Serves /resource/{id} and /stats"""
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeDataGov/1.0'
+    timeout = 30
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/stats':
+            with self.server.stats_lock:
+                stats = dict(self.server.stats)
+            self._send(200, 'application/json', json.dumps(stats).encode('utf-8'))
+            return
+
+        match = re.fullmatch(r'/resource/([\w-]+)/?', url.path)
+        if not match or match.group(1) not in self.server.resources:
+            self._send_error(404, "Resource not found")
+            return
+        args = parse_qs(url.query)
+        if not args.get('api-key', [''])[0]:
+            self._send_error(403, "Key not authorised")
+            return
+
+        faults = self.server.faults
+        time.sleep(faults.delay_seconds())
+        if faults.throttled():
+            self._send_error(429, "API rate limit exceeded", {'Retry-After': '1'})
+            return
+        if faults.server_error():
+            self._send_error(500, "Internal server error")
+            return
+
+        try:
+            limit = max(0, int(args.get('limit', ['10'])[0]))
+            offset = max(0, int(args.get('offset', ['0'])[0]))
+            filters = parse_filters(args)
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+        output_format = args.get('format', ['json'])[0].lower()
+        if output_format not in ('json', 'csv', 'xml'):
+            self._send_error(400, f"Unsupported format: {output_format}")
+            return
+
+        title, records = self.server.resources[match.group(1)]
+        matching = apply_filters(records, filters)
+        page = matching[offset:offset + limit]
+        if page and faults.partial_page():
+            # A short page: fewer records than requested although more remain
+            page = page[:max(1, len(page) // 2)]
+
+        payload = {
+            'index_name': match.group(1),
+            'title': title,
+            'status': 'ok',
+            'updated_date': self.server.updated_date,
+            'total': len(matching),
+            'count': len(page),
+            'limit': str(limit),
+            'offset': str(offset),
+            'field': [{'id': key, 'name': key, 'type': 'double' if isinstance(value, (int, float)) else 'keyword'}
+                      for key, value in (records[0].items() if records else ())],
+            'records': page,
+        }
+        content_type, body = render_records(payload, page, output_format)
+        if faults.truncated():
+            body = body[:len(body) // 2]
+        self._send(200, content_type, body)
+
+    def _send_error(self, status, message, headers=None):
+        body = json.dumps({'status': 'error', 'message': message}).encode('utf-8')
+        self._send(status, 'application/json', body, headers)
+
+    def _send(self, status, content_type, body, headers=None):
+        with self.server.stats_lock:
+            self.server.stats[str(status)] = self.server.stats.get(str(status), 0) + 1
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def create_server(host='127.0.0.1', port=8765, faults=None, districts_per_state=5, seed=0):
+    """
+    Create the fake API server (call serve_forever() to run it)
+    """
+    server = ThreadingHTTPServer((host, port), FakeDataGovHandler)
+    server.daemon_threads = True
+    server.faults = faults or FaultInjector()
+    server.resources = {
+        CROP_PRODUCTION_RESOURCE_ID: ("District-wise, season-wise crop production statistics",
+                                      generate_crop_records(districts_per_state, seed=seed)),
+        RAINFALL_DATA_RESOURCE_ID: ("Sub-divisional monthly rainfall", generate_rainfall_records(seed=seed)),
+    }
+    # Changed (with the records) to simulate a revised resource
+    server.updated_date = time.strftime('%Y-%m-%dT%H:%M:%S')
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake of the data.gov.in resource API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--districts-per-state", type=int, default=5, help="size of the crop production dataset")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data and the injected faults")
+    parser.add_argument("--latency", choices=["none", "constant", "uniform", "lognormal"], default="none")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="constant/mean/median latency in ms")
+    parser.add_argument("--latency-max-ms", type=float, default=10000.0, help="cap on injected latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before answering 429 (0 = off)")
+    parser.add_argument("--partial-rate", type=float, default=0.0, help="share of pages cut short")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="share of payloads cut off mid-body")
+    args = parser.parse_args()
+
+    faults = FaultInjector(args.latency, args.latency_ms, args.latency_max_ms, args.error_rate,
+                           args.rate_limit, args.partial_rate, args.truncate_rate, args.seed)
+    server = create_server(args.host, args.port, faults, args.districts_per_state, args.seed)
+    print(f"Fake data.gov.in API listening on http://{args.host}:{args.port}/resource")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
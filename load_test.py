@@ -0,0 +1,222 @@
+"""
+Concurrent-session load test for Project Samarth
+
+Simulates N concurrent sessions, each issuing a realistic mix of questions
+(rainfall comparisons, top crops, correlations, ...) over random states and
+crops, and ramps N up step by step. For every step it reports throughput,
+latency percentiles, memory growth and errors per intent.
+
+Sessions either call the query pipeline in-process (like the Streamlit app
+backend, charts rendered to PNG as st.pyplot does) or send requests to a
+running api_server.py.
+
+Usage:
+    python load_test.py [--concurrency 1 2 4 8 16] [--duration 20] [--target inprocess]
+    python load_test.py --target http://127.0.0.1:8000 --concurrency 8 32 128
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import contextlib
+from collections import defaultdict
+from http.client import HTTPConnection
+from urllib.parse import urlparse
+
+from utils.constants import INDIAN_STATES, COMMON_CROPS
+
+# (weight, intent, question template) - roughly what users ask most
+QUERY_MIX = [
+    (20, 'climate_info', "What is the rainfall in {state}?"),
+    (15, 'compare_rainfall', "Compare rainfall in {state} and {other_state}"),
+    (20, 'top_crops', "What are the top crops in {state}?"),
+    (10, 'crop_production', "Show me {crop} production in {state}"),
+    (10, 'crop_trend', "Show {crop} production trend in {state} from 2010 to 2020"),
+    (10, 'analyze_correlation', "Analyze correlation between {crop} production and rainfall in {state}"),
+    (5, 'top_crops_by_type', "List the top crops of type {crop} in {state} and {other_state}"),
+    (5, 'compare_crop_production', "Compare {crop} and {other_crop} production in {state} and {other_state}"),
+    (5, 'highest_wheat_production', "Which district grows the most wheat in {state}?"),
+]
+
+def make_query(rng):
+    """Pick a question from the mix with random states and crops"""
+    weights = [weight for weight, _, _ in QUERY_MIX]
+    _, intent, template = rng.choices(QUERY_MIX, weights=weights)[0]
+    state, other_state = rng.sample(INDIAN_STATES, 2)
+    crop, other_crop = rng.sample(COMMON_CROPS, 2)
+    return intent, template.format(state=state, other_state=other_state, crop=crop, other_crop=other_crop)
+
+def current_rss_mb():
+    """Resident memory of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is a high-water mark in KB (bytes on macOS), the best available fallback
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+class InProcessTarget:
+    """Answers queries with the same calls the app backend makes"""
+    def __init__(self, render_charts=True):
+        from core.query_parser import parse_query
+        from core.data_integrator import generate_answer, chart_render_lock
+        self.parse_query = parse_query
+        self.generate_answer = generate_answer
+        self.chart_render_lock = chart_render_lock
+        self.render_charts = render_charts
+
+    def ask(self, query):
+        intent, params = self.parse_query(query)
+        _, chart, _ = self.generate_answer(intent, params)
+        if chart is not None and self.render_charts:
+            # Cached answers hand the same figure to every session, as in the app
+            with self.chart_render_lock:
+                chart.savefig(io.BytesIO(), format='png')
+
+class HttpTarget:
+    """Sends queries to api_server.py; one keep-alive connection per session thread"""
+    def __init__(self, base_url, timeout=120):
+        url = urlparse(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def ask(self, query):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request('POST', '/query', json.dumps({'query': query}), {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, ConnectionError):
+            connection.close()
+            self.local.connection = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}: {body[:200]!r}")
+
+def run_step(target, concurrency, duration, seed):
+    """
+    Run `concurrency` sessions for `duration` seconds
+    Returns {intent: {'latencies': [...], 'errors': n}} and the elapsed wall time
+    """
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0, 'first_error': None})
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def session(session_id):
+        rng = random.Random(seed * 100003 + session_id)
+        while time.perf_counter() < deadline:
+            intent, query = make_query(rng)
+            started = time.perf_counter()
+            try:
+                target.ask(query)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if error:
+                    results[intent]['errors'] += 1
+                    results[intent]['first_error'] = results[intent]['first_error'] or error
+                else:
+                    results[intent]['latencies'].append(elapsed)
+
+    threads = [threading.Thread(target=session, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict(results), time.perf_counter() - started
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize_step(concurrency, results, elapsed, rss_before, rss_after):
+    """Summary of one ramp step as a dictionary"""
+    latencies = [value for stats in results.values() for value in stats['latencies']]
+    errors = sum(stats['errors'] for stats in results.values())
+    summary = {
+        'concurrency': concurrency,
+        'requests': len(latencies) + errors,
+        'throughput_qps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'errors': errors,
+        'rss_mb': round(rss_after, 1),
+        'rss_growth_mb': round(rss_after - rss_before, 1),
+        'intents': {},
+    }
+    if latencies:
+        summary.update(p50_ms=round(percentile(latencies, 0.5), 1), p90_ms=round(percentile(latencies, 0.9), 1),
+                       p99_ms=round(percentile(latencies, 0.99), 1), max_ms=round(max(latencies), 1))
+    for intent, stats in sorted(results.items()):
+        values = stats['latencies']
+        summary['intents'][intent] = {
+            'requests': len(values) + stats['errors'],
+            'errors': stats['errors'],
+            'p50_ms': round(percentile(values, 0.5), 1) if values else None,
+            'p99_ms': round(percentile(values, 0.99), 1) if values else None,
+            'mean_ms': round(statistics.mean(values), 1) if values else None,
+            'first_error': stats['first_error'],
+        }
+    return summary
+
+def print_step(summary):
+    print(f"concurrency {summary['concurrency']:>4}: {summary['throughput_qps']:8.1f} q/s  "
+          f"p50 {summary.get('p50_ms', 0):8.1f} ms  p90 {summary.get('p90_ms', 0):8.1f} ms  "
+          f"p99 {summary.get('p99_ms', 0):8.1f} ms  errors {summary['errors']:>4}  "
+          f"rss {summary['rss_mb']:7.1f} MB ({summary['rss_growth_mb']:+.1f})")
+    for intent, stats in summary['intents'].items():
+        if stats['p50_ms'] is None:
+            print(f"    {intent:<26} {stats['requests']:>6} req  all failed: {stats['first_error']}")
+            continue
+        print(f"    {intent:<26} {stats['requests']:>6} req  p50 {stats['p50_ms']:8.1f} ms  "
+              f"p99 {stats['p99_ms']:8.1f} ms  errors {stats['errors']}")
+        if stats['first_error']:
+            print(f"        first error: {stats['first_error']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent sessions and report throughput, latency, memory and errors")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="session counts to ramp through")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per ramp step")
+    parser.add_argument("--target", default="inprocess", help="'inprocess' or the base URL of a running api_server.py")
+    parser.add_argument("--no-charts", action="store_true", help="do not render charts in-process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the step summaries to this JSON file")
+    args = parser.parse_args()
+
+    if args.target == "inprocess":
+        target = InProcessTarget(render_charts=not args.no_charts)
+        print("Target: in-process query pipeline (memory figures are for the pipeline itself)")
+    else:
+        target = HttpTarget(args.target)
+        print(f"Target: {args.target} (memory figures are for this client only)")
+
+    summaries = []
+    for step, concurrency in enumerate(args.concurrency):
+        rss_before = current_rss_mb()
+        # The pipeline prints debug output for every query; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            results, elapsed = run_step(target, concurrency, args.duration, args.seed + step)
+        summary = summarize_step(concurrency, results, elapsed, rss_before, current_rss_mb())
+        summaries.append(summary)
+        print_step(summary)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
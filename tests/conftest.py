@@ -0,0 +1,31 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_connectors import sqlite_store
+
+@pytest.fixture
+def panel():
+    """
+    Builder of test frames: one row per combination of the given dimension values, with a
+    uniform random value column. step rounds the values down to a multiple of it (so rows
+    tie), missing blanks a share of the values and gaps drops a share of the rows
+    """
+    def build(dims, value, low=0.0, high=1.0, step=None, missing=0.0, gaps=0.0, seed=0):
+        rng = np.random.default_rng(seed)
+        df = pd.MultiIndex.from_product(list(dims.values()), names=list(dims)).to_frame(index=False)
+        values = rng.uniform(low, high, len(df))
+        df[value] = np.floor(values / step) * step if step else values
+        df.loc[rng.random(len(df)) < missing, value] = np.nan
+        return df[rng.random(len(df)) >= gaps].reset_index(drop=True)
+    return build
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """A fresh local store in a temporary directory"""
+    monkeypatch.setattr(sqlite_store, 'SQLITE_DB_PATH', str(tmp_path / 'store.db'))
+    monkeypatch.setattr(sqlite_store, '_local', threading.local())
+    yield sqlite_store
+    sqlite_store.get_connection().close()
@@ -0,0 +1,129 @@
+"""
+Batched trend fits against np.polyfit on each series
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.crop_trends import MIN_TREND_YEARS, build_trend_table, fit_trends, fit_frame, rank_frame
+
+STATES = ['Punjab', 'Haryana', 'Kerala']
+CROPS = ['Rice', 'Wheat', 'Maize', 'Cotton']
+YEARS = list(range(1998, 2021))
+
+@pytest.fixture
+def totals(panel):
+    """Yearly totals with gaps; Cotton keeps only its first years, fewer than a trend needs"""
+    df = panel({'State': STATES, 'Crop': CROPS, 'Year': YEARS}, 'Production', 1e5, 1e6, gaps=0.3)
+    cotton = df[df['Crop'] == 'Cotton']
+    late = cotton.index[cotton.groupby('State').cumcount() >= MIN_TREND_YEARS - 1]
+    return df.drop(late).reset_index(drop=True)
+
+def polyfit_trends(totals, year_start=None, year_end=None):
+    """Fit of each series on its own: (state, crop) -> (first, last, count, mean, slope, growth, volatility)"""
+    fits = {}
+    window = totals[totals['Year'].between(year_start or 0, year_end or 9999) & totals['Production'].notna()]
+    for (state, crop), series in window.groupby(['State', 'Crop']):
+        years = series['Year'].to_numpy(dtype=float)
+        values = series['Production'].to_numpy()
+        if len(series) < MIN_TREND_YEARS:
+            fits[(state, crop)] = None
+            continue
+        slope, intercept = np.polyfit(years, values, 1)
+        spread = np.sqrt(((values - (intercept + slope * years)) ** 2).sum() / (len(values) - 2))
+        mean = values.mean()
+        fits[(state, crop)] = (years.min(), years.max(), len(values), mean, slope, slope / mean * 100, spread / mean * 100)
+    return fits
+
+def table_rows(table):
+    return {(state, crop): i for i, (state, crop) in enumerate(zip(table['states'], table['crops']))}
+
+@pytest.mark.parametrize('window', [(None, None), (2005, None), (None, 2012), (2003, 2015)])
+def test_fits_match_polyfit(totals, window):
+    table = build_trend_table(totals)
+    fits = fit_trends(table, *window)
+    expected = polyfit_trends(totals, *window)
+
+    rows = table_rows(table)
+    for key, fit in expected.items():
+        i = rows[key]
+        if fit is None:
+            assert np.isnan(fits['slope'][i]) and np.isnan(fits['growth'][i])
+            continue
+        first, last, count, mean, slope, growth, volatility = fit
+        assert (fits['first'][i], fits['last'][i], fits['count'][i]) == (first, last, count)
+        np.testing.assert_allclose([fits['mean'][i], fits['slope'][i], fits['growth'][i], fits['volatility'][i]],
+                                   [mean, slope, growth, volatility], rtol=1e-7)
+
+def test_missing_productions_are_gaps(totals):
+    # A year no series reports, and scattered missing values, count as unreported years
+    gappy = totals.copy()
+    gappy.loc[gappy['Year'] == 2010, 'Production'] = np.nan
+    gappy.loc[gappy.index[::7], 'Production'] = np.nan
+    table = build_trend_table(gappy)
+    assert 2010 not in table['years']
+    fits = fit_trends(table)
+    rows = table_rows(table)
+    for key, fit in polyfit_trends(gappy).items():
+        if fit is not None:
+            assert fits['count'][rows[key]] == fit[2]
+            assert fits['slope'][rows[key]] == pytest.approx(fit[4])
+
+@pytest.mark.parametrize('years', [[2010], [2010, 2015]])
+def test_too_few_points(years):
+    short = pd.DataFrame({'State': 'Punjab', 'Crop': 'Rice', 'Year': years, 'Production': 100.0})
+    fits = fit_trends(build_trend_table(short))
+    assert fits['count'][0] == len(years)
+    assert (fits['first'][0], fits['last'][0]) == (years[0], years[-1])
+    assert np.isnan([fits['slope'][0], fits['growth'][0], fits['volatility'][0]]).all()
+    assert fit_frame(short).empty
+
+def test_empty_frames():
+    empty = pd.DataFrame(columns=['State', 'Crop', 'Year', 'Production'])
+    unreported = pd.DataFrame({'State': ['Punjab'] * 3, 'Crop': 'Rice', 'Year': [2010, 2011, 2012], 'Production': np.nan})
+    for frame in (None, empty, unreported):
+        assert build_trend_table(frame) is None
+    assert fit_frame(empty).empty and fit_frame(unreported).empty
+
+def test_series_outside_window_have_no_fit(totals):
+    fits = fit_trends(build_trend_table(totals), 2030, 2040)
+    assert np.isnan(fits['slope']).all()
+    assert (fits['count'] == 0).all()
+
+def test_exact_line():
+    line = pd.DataFrame({'State': 'Punjab', 'Crop': 'Rice', 'Year': [2010, 2011, 2013, 2016],
+                         'Production': [100.0, 110.0, 130.0, 160.0]})
+    fit = fit_frame(line).iloc[0]
+    assert fit['Slope'] == pytest.approx(10.0)
+    assert fit['Mean'] == pytest.approx(125.0)
+    assert fit['Growth'] == pytest.approx(8.0)
+    assert fit['Volatility'] == pytest.approx(0.0, abs=1e-9)
+    assert (fit['First'], fit['Last'], fit['Years']) == (2010, 2016, 4)
+
+def test_no_growth_without_positive_mean():
+    flat = pd.DataFrame({'State': 'Punjab', 'Crop': 'Rice', 'Year': [2010, 2011, 2012], 'Production': 0.0})
+    fit = fit_frame(flat).iloc[0]
+    assert fit['Slope'] == 0
+    assert np.isnan(fit['Growth']) and np.isnan(fit['Volatility'])
+
+def test_fit_frame_drops_short_series(totals):
+    trends = fit_frame(totals)
+    expected = {key for key, fit in polyfit_trends(totals).items() if fit is not None}
+    assert set(zip(trends['State'], trends['Crop'])) == expected
+
+def test_rank_frame(totals):
+    trends = fit_frame(totals)
+    growing = rank_frame(trends)
+    declining = rank_frame(trends, declining=True, n=2)
+    assert (growing['Growth'] > 0).all() and growing['Growth'].is_monotonic_decreasing
+    assert len(declining) <= 2 and (declining['Growth'] < 0).all() and declining['Growth'].is_monotonic_increasing
+    assert len(growing) + len(rank_frame(trends, declining=True)) == int((trends['Growth'] != 0).sum())
+
+def test_rank_frame_ties_keep_series_order():
+    # Every third state grows rice at the same, fastest rate, so the cut at n falls inside a tie
+    states = [f"State {i:02d}" for i in range(40)]
+    rows = [(state, 'Rice', year, 100.0 + 10 * (year - 2010) + i % 3) for i, state in enumerate(states) for year in range(2010, 2014)]
+    trends = fit_frame(pd.DataFrame(rows, columns=['State', 'Crop', 'Year', 'Production']))
+    fastest = states[::3]
+    assert rank_frame(trends, n=5)['State'].tolist() == fastest[:5]
+    assert rank_frame(trends)['State'].tolist()[:len(fastest)] == fastest
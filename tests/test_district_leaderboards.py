@@ -0,0 +1,114 @@
+"""
+District leaderboards against pandas groupby + nlargest
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import district_leaderboards
+from core.district_leaderboards import LEADERBOARD_SIZE, top_positions, top_districts, top_districts_of_frame
+
+STATES = ['Punjab', 'Haryana', 'Bihar', 'Odisha']
+DISTRICTS = [f"District {i}" for i in range(12)]
+CROPS = ['Rice', 'Wheat']
+YEARS = [2015, 2016, 2017]
+
+@pytest.fixture
+def district_totals(panel):
+    """District totals in coarse steps, so many districts tie, with a few missing productions"""
+    dims = {'State': STATES, 'District': DISTRICTS, 'Crop': CROPS, 'Year': YEARS}
+    return panel(dims, 'Production', 1000, 8000, step=1000, missing=0.02)
+
+@pytest.fixture
+def totals(monkeypatch, district_totals):
+    """Serve district_totals as the dataset the leaderboards are built from"""
+    monkeypatch.setattr(district_leaderboards, 'get_district_totals', lambda: district_totals)
+    monkeypatch.setattr(district_leaderboards, 'get_agriculture_dataset_version', lambda: 'test')
+    district_leaderboards.clear_leaderboards()
+    yield district_totals
+    district_leaderboards.clear_leaderboards()
+
+def grouped_totals(df, crop, year_start, year_end, state=None):
+    """Every district's total for a crop and year range, as pandas computes it, in order of first appearance"""
+    rows = df[(df['Crop'] == crop) & df['Year'].between(year_start, year_end) & df['Production'].notna()]
+    if state:
+        rows = rows[rows['State'] == state]
+    return rows.groupby(['State', 'District'], sort=False)['Production'].sum()
+
+def assert_ranking(leaders, expected, k):
+    """Same productions in the same order as nlargest; tied districts may be any of those tied"""
+    assert leaders['Production'].tolist() == expected.nlargest(k, keep='first').tolist()
+    for district, state, production in zip(leaders['District'], leaders['State'], leaders['Production']):
+        assert expected[(state, district)] == production
+    assert not leaders.duplicated(['State', 'District']).any()
+
+@pytest.mark.parametrize('k', [0, 1, 3, 10, 50])
+def test_top_positions_matches_nlargest(k):
+    rng = np.random.default_rng(k)
+    for _ in range(200):
+        values = rng.integers(0, 5, rng.integers(1, 30)).astype(float)
+        expected = pd.Series(values).nlargest(k, keep='first').index.to_numpy()
+        np.testing.assert_array_equal(top_positions(values, k), expected)
+
+def test_top_positions_breaks_ties_by_position():
+    values = np.array([5.0, 7.0, 5.0, 7.0, 5.0])
+    np.testing.assert_array_equal(top_positions(values, 3), [1, 3, 0])
+    np.testing.assert_array_equal(top_positions(values, 4), [1, 3, 0, 2])
+    assert len(top_positions(np.empty(0), 3)) == 0
+
+@pytest.mark.parametrize('crop', CROPS)
+@pytest.mark.parametrize('year', YEARS)
+@pytest.mark.parametrize('k', [1, 5, LEADERBOARD_SIZE, LEADERBOARD_SIZE + 10])
+def test_national_year(totals, crop, year, k):
+    assert_ranking(top_districts(crop, year, k=k), grouped_totals(totals, crop, year, year), k)
+
+def test_ties_at_kth_place_go_to_the_first_district(totals):
+    expected = grouped_totals(totals, 'Rice', 2016, 2016)
+    for k in range(1, LEADERBOARD_SIZE + 10):
+        # Only cuts through a run of equal productions test the tie rule
+        if k < len(expected) and expected.nlargest(k + 1, keep='first').iloc[-2:].nunique() == 1:
+            leaders = top_districts('Rice', 2016, k=k)
+            first = expected.nlargest(k, keep='first').index
+            assert list(zip(leaders['State'], leaders['District'])) == list(first)
+
+@pytest.mark.parametrize('state', STATES)
+def test_state_year(totals, state):
+    assert_ranking(top_districts('Rice', 2016, state=state, k=4), grouped_totals(totals, 'Rice', 2016, 2016, state), 4)
+
+@pytest.mark.parametrize('state', [None, 'Bihar'])
+def test_year_range(totals, state):
+    leaders = top_districts('Wheat', 2015, 2017, state=state, k=7)
+    assert_ranking(leaders, grouped_totals(totals, 'Wheat', 2015, 2017, state), 7)
+
+def test_unknown_scope_is_empty(totals):
+    assert top_districts('Rice', 1990).empty
+    assert top_districts('Cotton', 2016).empty
+    assert top_districts('Rice', 2016, state='Atlantis').empty
+
+def test_year_without_productions_is_empty(monkeypatch, totals):
+    unreported = totals.copy()
+    unreported.loc[unreported['Year'] == 2017, 'Production'] = np.nan
+    monkeypatch.setattr(district_leaderboards, 'get_district_totals', lambda: unreported)
+    district_leaderboards.clear_leaderboards()
+    assert top_districts('Rice', 2017).empty
+    assert district_leaderboards.latest_crop_year('Rice') == 2016
+    assert_ranking(top_districts('Rice', 2016, 2017, k=5), grouped_totals(unreported, 'Rice', 2016, 2017), 5)
+
+def test_no_data(monkeypatch):
+    monkeypatch.setattr(district_leaderboards, 'get_district_totals', lambda: pd.DataFrame(columns=['State', 'District', 'Crop', 'Year', 'Production']))
+    monkeypatch.setattr(district_leaderboards, 'get_agriculture_dataset_version', lambda: 'empty')
+    district_leaderboards.clear_leaderboards()
+    assert top_districts('Rice', 2016).empty
+    assert district_leaderboards.latest_crop_year('Rice') is None
+    district_leaderboards.clear_leaderboards()
+
+def test_latest_crop_year(totals):
+    assert district_leaderboards.latest_crop_year('Rice') == max(YEARS)
+    assert district_leaderboards.latest_crop_year('Cotton') is None
+
+def test_top_districts_of_frame(panel):
+    df = panel({'State': STATES, 'District': DISTRICTS, 'Crop': CROPS, 'Year': YEARS}, 'Production', 1000, 8000, step=1000, seed=1)
+    rows = df[(df['Crop'] == 'Rice') & (df['Year'] == 2017) & (df['State'] == 'Odisha')]
+    assert_ranking(top_districts_of_frame(rows, 5), grouped_totals(rows, 'Rice', 2017, 2017), 5)
+    assert top_districts_of_frame(rows.iloc[:0]).empty
+    assert top_districts_of_frame(None).empty
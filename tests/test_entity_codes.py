@@ -0,0 +1,81 @@
+"""
+Entity codes: every spelling of a state, crop or district resolves to one code and back to one canonical name
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.constants import INDIAN_STATES, COMMON_CROPS, STATE_ALIASES, CROP_ALIASES
+from utils.helpers import (add_entity_codes, encode_entities, entity_code, entity_mask, entity_names, entity_key,
+                           lookup_entity_code, normalize_crop_name, normalize_state_name, sum_by)
+
+ALIASES = [('state', alias, name) for alias, name in STATE_ALIASES.items()] + \
+          [('crop', alias, name) for alias, name in CROP_ALIASES.items()]
+
+@pytest.mark.parametrize('kind, alias, name', ALIASES)
+def test_alias_round_trip(kind, alias, name):
+    code = lookup_entity_code(kind, name)
+    assert code is not None
+    for spelling in (alias, alias.upper(), f"  {alias.title()} "):
+        assert lookup_entity_code(kind, spelling) == code
+    assert entity_names(kind, [code])[0] == name
+    normalize = normalize_state_name if kind == 'state' else normalize_crop_name
+    assert normalize(alias) == name
+
+@pytest.mark.parametrize('kind, names', [('state', INDIAN_STATES), ('crop', COMMON_CROPS)])
+def test_canonical_names_keep_their_codes(kind, names):
+    codes = [lookup_entity_code(kind, name) for name in names]
+    assert codes == list(range(len(names)))
+    assert entity_names(kind, codes).tolist() == list(names)
+
+def test_ampersand_and_spacing():
+    assert entity_key("Andaman  &  Nicobar") == entity_key("andaman and nicobar")
+    assert lookup_entity_code('state', "Andaman & Nicobar") == lookup_entity_code('state', "Andaman and Nicobar Islands")
+
+def test_new_names_get_stable_codes():
+    code = entity_code('crop', "Dragon  Fruit")
+    assert entity_code('crop', "dragon fruit") == code
+    assert lookup_entity_code('crop', "DRAGON FRUIT") == code
+    assert entity_names('crop', [code])[0] == "Dragon Fruit"
+    assert lookup_entity_code('crop', "Never Seen Before") is None
+    assert entity_names('crop', [-1])[0] is None
+
+def test_encode_entities_missing_names():
+    codes = encode_entities('state', pd.Series(['Orissa', None, 'Odisha', np.nan, 'Punjab']))
+    assert codes.dtype == np.int32
+    odisha, punjab = lookup_entity_code('state', 'Odisha'), lookup_entity_code('state', 'Punjab')
+    assert codes.tolist() == [odisha, -1, odisha, -1, punjab]
+
+def test_districts_are_scoped_by_state():
+    states = encode_entities('state', pd.Series(['Punjab', 'Bihar', 'Punjab', 'Bihar', None]))
+    districts = encode_entities('district', pd.Series(['Sangrur', 'Sangrur', 'SANGRUR', 'Gaya', 'Sangrur']), scope=states)
+    assert districts[0] == districts[2] != districts[1]
+    assert len(set(districts[:4])) == 3
+    assert districts[4] == -1
+
+def test_add_entity_codes_canonicalizes():
+    df = pd.DataFrame({'State': ['Orissa', 'odisha', 'Pondicherry'], 'District': ['Puri', 'puri', 'Karaikal'],
+                       'Crop': ['Paddy', 'rice', 'Rice'], 'Production': [1.0, 2.0, 4.0]})
+    coded = add_entity_codes(df)
+    assert coded['State'].tolist() == ['Odisha', 'Odisha', 'Puducherry']
+    assert coded['Crop'].tolist() == ['Rice'] * 3
+    assert coded['StateCode'][0] == coded['StateCode'][1] and coded['DistrictCode'][0] == coded['DistrictCode'][1]
+    # Frames that already carry codes are returned as they are
+    assert add_entity_codes(coded) is coded
+
+@pytest.mark.parametrize('names', ['Orissa', ['Paddy'], ['odisha', 'Punjab'], ['Atlantis']])
+def test_entity_mask_on_codes_and_names(names):
+    df = pd.DataFrame({'State': ['Odisha', 'Punjab', 'Bihar', 'Odisha'], 'Crop': ['Rice', 'Rice', 'Wheat', 'Wheat']})
+    column = 'Crop' if names == ['Paddy'] else 'State'
+    by_name = entity_mask(df, column, names)
+    by_code = entity_mask(add_entity_codes(df), column, names)
+    np.testing.assert_array_equal(by_name, by_code)
+    wanted = {normalize_crop_name(name) if column == 'Crop' else normalize_state_name(name)
+              for name in ([names] if isinstance(names, str) else names)}
+    np.testing.assert_array_equal(by_code, df[column].isin(wanted).to_numpy())
+
+def test_sum_by_groups_spellings_together():
+    df = add_entity_codes(pd.DataFrame({'State': ['Orissa', 'Odisha', None, 'Punjab'], 'Crop': ['Paddy', 'Rice', 'Rice', 'Rice'],
+                                        'Production': [1.0, 2.0, 4.0, 8.0]}))
+    totals = sum_by(df, ['State', 'Crop'])
+    assert totals.to_dict() == {('Odisha', 'Rice'): 3.0, ('Punjab', 'Rice'): 8.0}
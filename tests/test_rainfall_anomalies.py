@@ -0,0 +1,119 @@
+"""
+Rainfall anomalies against pandas means and standard deviations per state
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import rainfall_anomalies, seasonal_rainfall
+from core.rainfall_anomalies import MIN_BASELINE_YEARS, build_anomalies, classify_departures, drought_severity
+from utils.constants import DROUGHT_DEPARTURE, SEVERE_DROUGHT_DEPARTURE
+
+STATES = ['Punjab', 'Kerala', 'Bihar', 'Odisha']
+YEARS = list(range(2000, 2012))
+MONTHS = list(range(1, 13))
+
+@pytest.fixture
+def annual(panel):
+    """(state, year) rainfall with gaps; Odisha keeps too few years for a baseline"""
+    totals = panel({'State': STATES, 'Year': YEARS}, 'Rainfall', 200, 3000, missing=0.25)
+    totals = totals.pivot(index='State', columns='Year', values='Rainfall').loc[STATES].to_numpy(copy=True)
+    totals[-1, MIN_BASELINE_YEARS - 1:] = np.nan
+    return totals
+
+def assert_matches_pandas(anomalies, totals):
+    for row, values in enumerate(totals):
+        series = pd.Series(values)
+        if series.count() < MIN_BASELINE_YEARS:
+            assert np.isnan(anomalies['normal'][row]) and np.isnan(anomalies['std'][row])
+            assert np.isnan(anomalies['departure'][row]).all() and np.isnan(anomalies['zscore'][row]).all()
+            continue
+        normal, std = series.mean(), series.std(ddof=1)
+        assert anomalies['normal'][row] == pytest.approx(normal)
+        assert anomalies['std'][row] == pytest.approx(std)
+        np.testing.assert_allclose(anomalies['departure'][row], ((series - normal) / normal * 100).to_numpy())
+        np.testing.assert_allclose(anomalies['zscore'][row], ((series - normal) / std).to_numpy())
+
+def test_matches_pandas(annual):
+    assert_matches_pandas(build_anomalies(annual), annual)
+
+def test_year_without_rainfall_is_skipped(annual):
+    annual[:, 5] = np.nan
+    anomalies = build_anomalies(annual)
+    assert np.isnan(anomalies['departure'][:, 5]).all()
+    assert_matches_pandas(anomalies, annual)
+
+@pytest.mark.parametrize('reported', range(MIN_BASELINE_YEARS))
+def test_too_few_years(reported):
+    totals = np.full((1, 6), np.nan)
+    totals[0, :reported] = [500.0, 700.0][:reported]
+    anomalies = build_anomalies(totals)
+    assert np.isnan(anomalies['normal'][0]) and np.isnan(anomalies['std'][0])
+    assert np.isnan(anomalies['zscore'][0]).all()
+
+def test_no_states():
+    anomalies = build_anomalies(np.empty((0, len(YEARS))))
+    assert anomalies['normal'].shape == (0,) and anomalies['departure'].shape == (0, len(YEARS))
+
+def test_constant_rainfall_has_no_zscore():
+    anomalies = build_anomalies(np.array([[500.0, 500.0, np.nan, 500.0]]))
+    assert anomalies['std'][0] == 0
+    np.testing.assert_array_equal(anomalies['departure'][0], [0.0, 0.0, np.nan, 0.0])
+    assert np.isnan(anomalies['zscore'][0]).all()
+
+def test_no_rain_has_no_departure():
+    anomalies = build_anomalies(np.zeros((1, 4)))
+    assert anomalies['normal'][0] == 0
+    assert np.isnan(anomalies['departure'][0]).all()
+
+def test_classify_departures_boundaries():
+    departures = [75, 60, 59.6, 20, 19.4, -19, -19.6, -59, -60, -99, -99.6, -100, np.nan]
+    expected = ["large excess", "large excess", "large excess", "excess", "normal", "normal", "deficient",
+                "deficient", "large deficient", "large deficient", "no rain", "no rain", None]
+    assert classify_departures(departures).tolist() == expected
+
+def test_drought_severity_boundaries():
+    departures = [SEVERE_DROUGHT_DEPARTURE - 0.1, SEVERE_DROUGHT_DEPARTURE, DROUGHT_DEPARTURE - 0.1,
+                  DROUGHT_DEPARTURE, 10, np.nan]
+    expected = ["severe drought", "moderate drought", "moderate drought", None, None, None]
+    assert drought_severity(departures).tolist() == expected
+
+@pytest.fixture
+def monthly(monkeypatch, panel):
+    """Monthly rainfall of every state served to the seasonal table, under a fixed dataset version"""
+    rows = panel({'State': STATES, 'Year': YEARS, 'Month': MONTHS}, 'Rainfall', 0, 400, seed=1)
+    values = rows['Rainfall'].to_numpy(copy=True).reshape(len(STATES), len(YEARS), len(MONTHS))
+    values[0, 3, 6] = np.nan
+    values[:, -1] = np.nan
+    data = {'kind': 'state', 'regions': STATES, 'years': np.array(YEARS), 'values': values}
+    monkeypatch.setattr(seasonal_rainfall, 'fetch_monthly_rainfall', lambda: data)
+    for module in (seasonal_rainfall, rainfall_anomalies):
+        monkeypatch.setattr(module, 'get_climate_dataset_version', lambda: 'test')
+    seasonal_rainfall.clear_season_tables()
+    rainfall_anomalies.clear_anomaly_tables()
+    yield data
+    seasonal_rainfall.clear_season_tables()
+    rainfall_anomalies.clear_anomaly_tables()
+
+def test_year_anomalies_of_monsoon(monthly):
+    monsoon = pd.DataFrame(monthly['values'][:, :, 5:9].sum(axis=2), index=STATES, columns=YEARS)
+    normal = monsoon.mean(axis=1)
+    year = YEARS[3]
+    anomalies = rainfall_anomalies.get_year_anomalies(year, 6, 9)
+    # Punjab is missing July of that year, so it has no anomaly then
+    expected = ((monsoon[year] - normal) / normal * 100).drop('Punjab').sort_values()
+    assert anomalies['State'].tolist() == expected.index.tolist()
+    np.testing.assert_allclose(anomalies['Departure'], expected.to_numpy())
+    np.testing.assert_allclose(anomalies['ZScore'], ((monsoon[year] - normal) / monsoon.std(axis=1))[expected.index])
+
+def test_state_anomalies_window(monthly):
+    annual = monthly['values'][1].sum(axis=1)
+    anomalies = rainfall_anomalies.get_state_anomalies('Kerala', year_start=2004, year_end=2008)
+    assert anomalies['years'].tolist() == list(range(2004, 2009))
+    assert anomalies['normal'] == pytest.approx(np.nanmean(annual))
+    np.testing.assert_allclose(anomalies['values'], annual[4:9])
+
+def test_latest_year_skips_unreported_years(monthly):
+    # The last year has no rainfall anywhere
+    assert rainfall_anomalies.latest_anomaly_year() == YEARS[-2]
+    assert rainfall_anomalies.get_year_anomalies(YEARS[-1]).empty
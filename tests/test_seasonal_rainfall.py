@@ -0,0 +1,87 @@
+"""
+Season totals from month prefix sums against direct sums over the months of each season
+"""
+import numpy as np
+import pytest
+
+from core.seasonal_rainfall import build_state_months, season_totals, season_year_label
+from data_connectors.climate_data import subdivision_weights
+
+STATES = ['Punjab', 'Kerala', 'Bihar']
+# 2013 is not reported, so seasons wrapping out of 2012 have no following year
+YEARS = [2008, 2009, 2010, 2011, 2012, 2014, 2015]
+MONTHS = list(range(1, 13))
+
+@pytest.fixture
+def monthly(panel):
+    """Monthly rainfall of every state with a few missing months and a year missing entirely"""
+    rows = panel({'State': STATES, 'Year': YEARS, 'Month': MONTHS}, 'Rainfall', 0, 400)
+    values = rows['Rainfall'].to_numpy(copy=True).reshape(len(STATES), len(YEARS), len(MONTHS))
+    values[0, 1, 6] = np.nan   # Punjab, July 2009
+    values[1, 3, 0] = np.nan   # Kerala, January 2011
+    values[2, 4, 11] = np.nan  # Bihar, December 2012
+    values[:, 2] = np.nan      # 2010 everywhere
+    return {'kind': 'state', 'regions': STATES, 'years': np.array(YEARS), 'values': values}
+
+def summed_months(monthly, first_month, last_month):
+    """Direct sum over each season's months, NaN if any of them is missing or not reported"""
+    values, years = monthly['values'], list(monthly['years'])
+    totals = np.full(values.shape[:2], np.nan)
+    for row in range(values.shape[0]):
+        for column, year in enumerate(years):
+            if first_month <= last_month:
+                months = values[row, column, first_month - 1:last_month]
+            elif year + 1 in years:
+                following = years.index(year + 1)
+                months = np.concatenate([values[row, column, first_month - 1:], values[row, following, :last_month]])
+            else:
+                continue
+            if not np.isnan(months).any():
+                totals[row, column] = months.sum()
+    return totals
+
+@pytest.mark.parametrize('months', [(1, 12), (6, 9), (3, 5), (7, 7), (10, 3), (11, 2), (12, 1), (10, 12)])
+def test_season_totals(monthly, months):
+    table = build_state_months(monthly)
+    np.testing.assert_allclose(season_totals(table, *months), summed_months(monthly, *months))
+
+def test_year_without_rainfall(monthly):
+    totals = season_totals(build_state_months(monthly), 6, 9)
+    assert np.isnan(totals[:, YEARS.index(2010)]).all()
+    assert not np.isnan(totals[:, YEARS.index(2011)]).any()
+
+def test_wrapping_season_pairs_consecutive_years(monthly):
+    totals = season_totals(build_state_months(monthly), 10, 3)
+    kerala, year = 1, YEARS.index(2008)
+    values = monthly['values'][kerala]
+    assert totals[kerala, year] == pytest.approx(values[year, 9:].sum() + values[year + 1, :3].sum())
+    # 2009-10 and 2010-11 touch the unreported 2010; 2012 has no following year and 2015 is the last one
+    for season_year in (2009, 2010, 2012, 2015):
+        assert np.isnan(totals[:, YEARS.index(season_year)]).all()
+    # Kerala's January 2011 is missing too, but that month is outside 2011-12
+    assert not np.isnan(totals[kerala, YEARS.index(2011)])
+
+def test_season_year_label():
+    assert season_year_label(2018, 10, 3) == '2018-19'
+    assert season_year_label(1999, 11, 2) == '1999-00'
+    assert season_year_label(2018, 6, 9) == '2018'
+
+def test_no_monthly_data(monthly):
+    assert build_state_months(None) is None
+    assert build_state_months(dict(monthly, regions=[], values=monthly['values'][:0])) is None
+
+def test_subdivisions_weighted_by_area():
+    weights = subdivision_weights()
+    values = np.full((2, 1, 12), 100.0)
+    values[1] = 400.0
+    values[1, 0, 4] = np.nan
+    monthly = {'kind': 'subdivision', 'regions': ['East Uttar Pradesh', 'West Uttar Pradesh'],
+               'years': np.array([2010]), 'values': values}
+    table = build_state_months(monthly)
+    row = table['states'].index('Uttar Pradesh')
+    east, west = weights.set_index('SubdivisionKey').loc[['east uttar pradesh', 'west uttar pradesh'], 'Area']
+    expected = np.full(12, (100 * east + 400 * west) / (east + west))
+    expected[4] = 100.0
+    np.testing.assert_allclose(table['values'][row, 0], expected)
+    # States none of whose subdivisions report have no rainfall
+    assert np.isnan(table['values'][table['states'].index('Punjab')]).all()
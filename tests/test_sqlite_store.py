@@ -0,0 +1,34 @@
+"""
+The local store answers any spelling of a state or crop from its canonical rows and loaded slices
+"""
+import pandas as pd
+import pytest
+
+from utils.helpers import add_entity_codes
+
+# As the connectors build them: names in their canonical spelling
+ROWS = add_entity_codes(pd.DataFrame({
+    'State': ['Orissa', 'Odisha', 'Punjab'], 'District': ['Puri', 'Cuttack', 'Sangrur'],
+    'Crop': ['Paddy', 'Rice', 'Wheat'], 'Year': [2015, 2015, 2016], 'Production': [1.0, 2.0, 4.0], 'Area': [1.0, 1.0, 2.0],
+}))
+
+@pytest.mark.parametrize('state, crop', [('Orissa', 'Paddy'), ('odisha', 'RICE'), ('Odisha', 'Rice')])
+def test_slices_found_under_aliases(store, state, crop):
+    store.record_loaded_slice('agriculture', 'Orissa', 'Paddy', 2010, 2020)
+    assert store.is_slice_loaded('agriculture', state, crop, 2012, 2018)
+    assert not store.is_slice_loaded('agriculture', state, crop, 2005, 2018)
+    assert not store.is_slice_loaded('agriculture', 'Punjab', crop, 2012, 2018)
+    assert not store.is_slice_loaded('agriculture', state, 'Wheat', 2012, 2018)
+
+@pytest.mark.parametrize('state, crop', [('Orissa', 'Paddy'), ('odisha', 'rice')])
+def test_queries_match_aliases(store, state, crop):
+    store.ingest_agriculture_frame(ROWS)
+    rows = store.query_agriculture_data(state=state, crop=crop)
+    assert sorted(rows['District']) == ['Cuttack', 'Puri']
+    assert set(rows['State']) == {'Odisha'} and set(rows['Crop']) == {'Rice'}
+    assert store.query_production_totals('State', crop=crop).to_dict() == {'Odisha': 3.0}
+
+def test_climate_query_matches_aliases(store):
+    store.ingest_climate_frame(pd.DataFrame({'Subdivision': ['Orissa'], 'Year': [2015], 'Rainfall': [1450.0]}))
+    rows = store.query_climate_data(state='Orissa')
+    assert rows[['State', 'Year', 'Rainfall']].values.tolist() == [['Odisha', 2015, 1450.0]]
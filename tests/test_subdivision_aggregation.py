@@ -0,0 +1,93 @@
+"""
+Subdivision rainfall aggregated to states, in pandas and in the local store, against
+an area-weighted mean computed row by row
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_connectors.climate_data import aggregate_subdivisions
+from utils.constants import RAINFALL_SUBDIVISION_AREAS
+from utils.helpers import entity_key
+
+SUBDIVISIONS = ['Assam and Meghalaya', 'Naga Mani Mizo Tripura', 'Gangetic West Bengal',
+                'Sub Himalayan West Bengal & Sikkim', 'East Uttar Pradesh', 'West Uttar Pradesh', 'Punjab']
+YEARS = list(range(2010, 2016))
+
+@pytest.fixture
+def subdivision_rows(panel):
+    """Subdivision rainfall with missing values, a missing subdivision-year and an unmapped subdivision"""
+    df = panel({'Subdivision': SUBDIVISIONS + ['Atlantis'], 'Year': YEARS}, 'Rainfall', 300, 3000)
+    df.loc[(df['Subdivision'] == 'Gangetic West Bengal') & (df['Year'] == 2011), 'Rainfall'] = np.nan
+    df.loc[(df['Subdivision'] == 'Punjab') & (df['Year'] == 2013), 'Rainfall'] = np.nan
+    return df[~((df['Subdivision'] == 'West Uttar Pradesh') & (df['Year'] == 2014))].reset_index(drop=True)
+
+def weighted_rainfall(df):
+    """{(state, year): rainfall} as the area-weighted mean of the subdivisions reported that year"""
+    weighted, area = {}, {}
+    for subdivision, year, rainfall in df[['Subdivision', 'Year', 'Rainfall']].itertuples(index=False, name=None):
+        if pd.isna(rainfall):
+            continue
+        for name, state, share in RAINFALL_SUBDIVISION_AREAS:
+            if entity_key(name) == entity_key(subdivision):
+                weighted[(state, year)] = weighted.get((state, year), 0.0) + rainfall * share
+                area[(state, year)] = area.get((state, year), 0.0) + share
+    return {key: weighted[key] / area[key] for key in weighted}
+
+def state_rainfall(table):
+    return {(state, int(year)): rainfall for state, year, rainfall in table[['State', 'Year', 'Rainfall']].itertuples(index=False, name=None)}
+
+def assert_matches(table, expected):
+    found = state_rainfall(table)
+    assert found.keys() == expected.keys()
+    for key, rainfall in expected.items():
+        assert found[key] == pytest.approx(rainfall), key
+
+def test_aggregate_subdivisions(subdivision_rows):
+    table = aggregate_subdivisions(subdivision_rows)
+    assert_matches(table, weighted_rainfall(subdivision_rows))
+    assert not table.duplicated(['State', 'Year']).any()
+
+def test_weights_renormalized_over_reported_subdivisions(subdivision_rows):
+    df = subdivision_rows
+    table = aggregate_subdivisions(df).set_index(['State', 'Year'])['Rainfall']
+    rainfall = df.set_index(['Subdivision', 'Year'])['Rainfall']
+    # West Bengal only has its Himalayan subdivision in 2011; Uttar Pradesh only its eastern one in 2014
+    assert table[('West Bengal', 2011)] == pytest.approx(rainfall[('Sub Himalayan West Bengal & Sikkim', 2011)])
+    assert table[('Uttar Pradesh', 2014)] == pytest.approx(rainfall[('East Uttar Pradesh', 2014)])
+    # A subdivision covering several states gives each of them its rainfall
+    assert table[('Assam', 2012)] == table[('Meghalaya', 2012)] == pytest.approx(rainfall[('Assam and Meghalaya', 2012)])
+    assert ('Punjab', 2013) not in table.index
+
+def test_year_without_rainfall_has_no_rows(subdivision_rows):
+    df = subdivision_rows.copy()
+    df.loc[df['Year'] == 2012, 'Rainfall'] = np.nan
+    table = aggregate_subdivisions(df)
+    assert 2012 not in set(table['Year'])
+    assert_matches(table, weighted_rainfall(df))
+
+def test_no_rows(subdivision_rows):
+    assert aggregate_subdivisions(subdivision_rows.iloc[:0]).empty
+    assert aggregate_subdivisions(subdivision_rows[subdivision_rows['Subdivision'] == 'Atlantis']).empty
+
+def test_store_matches_aggregation(store, subdivision_rows):
+    store.ingest_climate_frame(subdivision_rows)
+    stored = store.query_climate_data()
+    assert_matches(stored, weighted_rainfall(subdivision_rows))
+    assert_matches(stored, state_rainfall(aggregate_subdivisions(subdivision_rows)))
+
+def test_store_refreshes_only_ingested_years(store, subdivision_rows):
+    df = subdivision_rows
+    store.ingest_climate_frame(df)
+    # A later delta fills West Uttar Pradesh's missing year and revises Punjab's
+    delta = pd.DataFrame([('West Uttar Pradesh', 2014, 1234.0), ('Punjab', 2015, 456.0)],
+                         columns=['Subdivision', 'Year', 'Rainfall'])
+    store.ingest_climate_frame(delta)
+    merged = pd.concat([df[~((df['Subdivision'] == 'Punjab') & (df['Year'] == 2015))], delta], ignore_index=True)
+    assert_matches(store.query_climate_data(), weighted_rainfall(merged))
+
+def test_store_drops_state_year_without_rainfall(store, subdivision_rows):
+    store.ingest_climate_frame(subdivision_rows)
+    store.ingest_climate_frame(pd.DataFrame([('Punjab', 2012, np.nan)], columns=['Subdivision', 'Year', 'Rainfall']))
+    stored = store.query_climate_data(state='Punjab')
+    assert sorted(stored['Year']) == [2010, 2011, 2014, 2015]
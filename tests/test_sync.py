@@ -0,0 +1,116 @@
+"""
+Incremental sync against the local fake data.gov.in server: full, unchanged, delta and
+revision runs leave the store holding exactly the resource's records
+"""
+import threading
+
+import pytest
+
+from config import CROP_PRODUCTION_RESOURCE_ID, RAINFALL_DATA_RESOURCE_ID, SYNC_REVISION_YEARS
+from data_connectors import sync
+from data_connectors.climate_data import aggregate_subdivisions, climate_frame_from_records
+from fake_data_gov_server import FaultInjector, create_server
+
+STATES = ['Punjab', 'Bihar', 'Kerala']
+SUBDIVISIONS = ['Punjab', 'Bihar', 'Kerala', 'East Uttar Pradesh', 'West Uttar Pradesh']
+PAGE_SIZE = 50
+
+@pytest.fixture
+def api(monkeypatch):
+    """The fake server on a free port, serving a few states' crops since 2012 and a few subdivisions since 2005"""
+    server = create_server(port=0, districts_per_state=2)
+    keep = {
+        CROP_PRODUCTION_RESOURCE_ID: lambda record: record['state_name'] in STATES and record['crop_year'] >= 2012,
+        RAINFALL_DATA_RESOURCE_ID: lambda record: record['subdivision'] in SUBDIVISIONS and record['year'] >= 2005,
+    }
+    for resource_id, (title, records) in server.resources.items():
+        server.resources[resource_id] = (title, [record for record in records if keep[resource_id](record)])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(sync, 'API_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}/resource")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def crop_records(server):
+    return server.resources[CROP_PRODUCTION_RESOURCE_ID][1]
+
+def record_productions(records):
+    """{(state, district, crop, year): production} of upstream records"""
+    return {(r['state_name'], r['district_name'], r['crop'], r['crop_year']): r['production_'] for r in records}
+
+def stored_productions(store):
+    rows = store.query_agriculture_data()
+    return {(state, district, crop, year): production for state, district, crop, year, production
+            in rows[['State', 'District', 'Crop', 'Year', 'Production']].itertuples(index=False, name=None)}
+
+def test_first_sync_is_full(store, api):
+    summary = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    records = crop_records(api)
+    assert summary['mode'] == 'full'
+    assert summary['fetched'] == summary['total_records'] == len(records)
+    assert summary['requests'] == 1 + -(-len(records) // PAGE_SIZE)
+    assert stored_productions(store) == record_productions(records)
+    assert store.get_sync_state(CROP_PRODUCTION_RESOURCE_ID)['record_offset'] == len(records)
+    assert store.is_slice_loaded('agriculture', 'Punjab', 'Rice', 2015, 2016)
+
+def test_short_pages(store, api):
+    api.faults = FaultInjector(partial_rate=0.5, seed=1)
+    summary = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    assert summary['fetched'] == len(crop_records(api))
+    assert stored_productions(store) == record_productions(crop_records(api))
+
+def test_unchanged(store, api):
+    sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    summary = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    assert (summary['mode'], summary['fetched'], summary['requests']) == ('unchanged', 0, 1)
+
+def test_delta_fetches_only_appended_records(store, api):
+    sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    records = crop_records(api)
+    appended = [dict(record, crop_year=2021, production_=record['production_'] + 1) for record in records if record['crop_year'] == 2020]
+    records.extend(appended)
+    summary = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    assert summary['mode'] == 'delta'
+    assert summary['fetched'] == summary['merged'] == len(appended)
+    assert stored_productions(store) == record_productions(records)
+    assert store.get_sync_state(CROP_PRODUCTION_RESOURCE_ID)['record_offset'] == len(records)
+
+def test_revision_refetches_latest_years(store, api):
+    sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    records = crop_records(api)
+    latest = max(record['crop_year'] for record in records)
+    revised = [record for record in records if record['crop_year'] > latest - SYNC_REVISION_YEARS]
+    for record in revised:
+        record['production_'] = round(record['production_'] * 1.1, 1)
+    api.updated_date = 'revised'
+    summary = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    assert summary['mode'] == 'revision'
+    assert summary['fetched'] == len(revised)
+    assert stored_productions(store) == record_productions(records)
+    state = store.get_sync_state(CROP_PRODUCTION_RESOURCE_ID)
+    assert (state['record_offset'], state['updated_date']) == (len(records), 'revised')
+
+def test_shrunk_resource_is_refetched_in_full(store, api):
+    sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    records = crop_records(api)
+    del records[len(records) // 2:]
+    summary = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)
+    assert (summary['mode'], summary['fetched']) == ('full', len(records))
+
+def test_climate_sync_derives_state_rainfall(store, api):
+    summary = sync.sync_dataset('climate', page_size=PAGE_SIZE)
+    records = api.resources[RAINFALL_DATA_RESOURCE_ID][1]
+    assert (summary['mode'], summary['fetched']) == ('full', len(records))
+    expected = aggregate_subdivisions(climate_frame_from_records(records)).set_index(['State', 'Year'])['Rainfall']
+    stored = store.query_climate_data().set_index(['State', 'Year'])['Rainfall']
+    assert sorted(stored.index) == sorted(expected.index)
+    assert (stored[expected.index] - expected).abs().max() < 1e-6
+
+def test_version_follows_content(store, api):
+    first = sync.sync_dataset('agriculture', page_size=PAGE_SIZE)['version']
+    assert store.get_stored_version('agriculture')['content_hash'].startswith(first)
+    # Re-fetching identical records keeps the version, so cached results stay valid
+    assert sync.sync_dataset('agriculture', full=True, page_size=PAGE_SIZE)['version'] == first
+    crop_records(api)[-1]['production_'] += 1
+    api.updated_date = 'revised'
+    assert sync.sync_dataset('agriculture', page_size=PAGE_SIZE)['version'] != first
@@ -0,0 +1,104 @@
+"""
+Dataset versions: content hashes, live versions and the answer cache entries a version bump drops
+"""
+import time
+
+import pandas as pd
+import pytest
+
+from core.data_integrator import _answer_key, generate_answer
+from core.query_parser import parse_query
+from data_connectors import versioning
+from data_connectors.versioning import content_hash, make_version, observe_upstream
+from utils.cache import cache_get, clear_cache
+
+QUERIES = {
+    'crop': "Show me rice production in Punjab",
+    'rainfall': "What is the rainfall in Maharashtra?",
+    'correlation': "Analyze correlation between wheat production and rainfall in Uttar Pradesh",
+}
+
+@pytest.fixture
+def bump(monkeypatch):
+    """Set the version a dataset is served at, as a sync or snapshot in another process would"""
+    monkeypatch.setattr(versioning, '_versions', {})
+    monkeypatch.setattr(versioning, '_checked', {})
+    monkeypatch.setattr(versioning, 'VERSION_CHECK_INTERVAL', 1e9)
+    def set_version(dataset, digest):
+        versioning._versions[dataset] = make_version('store', digest)
+        versioning._checked[dataset] = time.monotonic()
+    set_version('agriculture', 'a' * 16)
+    set_version('climate', 'c' * 16)
+    clear_cache('answers')
+    yield set_version
+    clear_cache('answers')
+
+@pytest.fixture
+def live(monkeypatch):
+    monkeypatch.setattr(versioning, '_live', {})
+    monkeypatch.setattr(versioning, '_live_slices', {})
+    return versioning._live
+
+def answered(intent, params):
+    generate_answer(intent, params)
+    return intent, params
+
+def is_cached(query):
+    return cache_get('answers', _answer_key(*query))[0]
+
+def test_content_hash_ignores_row_order():
+    df = pd.DataFrame({'State': ['Punjab', 'Bihar', 'Kerala'], 'Year': [2010, 2011, 2012], 'Rainfall': [1.0, 2.0, 3.0]})
+    assert content_hash(df) == content_hash(df.iloc[::-1][['Rainfall', 'State', 'Year']])
+    assert content_hash(df) != content_hash(df.assign(Rainfall=[1.0, 2.0, 3.5]))
+    assert content_hash(None) == content_hash(df.iloc[:0])
+
+def test_version_bump_drops_only_affected_answers(bump):
+    queries = {name: answered(*parse_query(query)) for name, query in QUERIES.items()}
+    assert all(is_cached(query) for query in queries.values())
+    bump('climate', 'd' * 16)
+    assert is_cached(queries['crop'])
+    assert not is_cached(queries['rainfall']) and not is_cached(queries['correlation'])
+    queries['rainfall'] = answered(*queries['rainfall'])
+    bump('agriculture', 'b' * 16)
+    assert is_cached(queries['rainfall'])
+    assert not is_cached(queries['crop'])
+
+@pytest.mark.parametrize('params, dataset, other', [
+    ({'states': ['Punjab']}, 'climate', 'agriculture'),
+    ({'states': ['Punjab'], 'crops': ['Rice']}, 'agriculture', 'climate'),
+])
+def test_general_query_follows_the_dataset_it_reads(bump, params, dataset, other):
+    query = answered('general_query', params)
+    assert is_cached(query)
+    bump(other, 'e' * 16)
+    assert is_cached(query)
+    bump(dataset, 'f' * 16)
+    assert not is_cached(query)
+
+def test_live_version_hashes_fetched_records(live):
+    rows = pd.DataFrame({'State': ['Punjab', 'Bihar'], 'Crop': ['Rice', 'Rice'], 'Production': [1.0, 2.0]})
+    payload = {'updated_date': '2024-01-01', 'total': 2}
+    observe_upstream('agriculture', payload, rows, ('Punjab', None, None, None))
+    first = live['agriculture']
+    assert first['content_hash'] and first['id'] == first['content_hash'][:12]
+    # The same records in another order, and a slice fetched for the first time, keep the version
+    observe_upstream('agriculture', payload, rows.iloc[::-1], ('Punjab', None, None, None))
+    observe_upstream('agriculture', payload, rows.iloc[:1], ('Bihar', None, None, None))
+    assert live['agriculture'] is first
+    # Changed records of a slice fetched before, without a new upstream revision, make a new version
+    observe_upstream('agriculture', payload, rows.assign(Production=[1.0, 3.0]), ('Punjab', None, None, None))
+    revised = live['agriculture']
+    assert revised['id'] != first['id']
+    # So do a new revision and a different record total
+    observe_upstream('agriculture', dict(payload, updated_date='2024-02-01'), rows, ('Punjab', None, None, None))
+    assert live['agriculture']['id'] not in (first['id'], revised['id'])
+    dated = live['agriculture']['id']
+    observe_upstream('agriculture', dict(payload, updated_date='2024-02-01', total=3), rows, ('Punjab', None, None, None))
+    assert live['agriculture']['id'] != dated
+
+def test_live_version_without_revision(live):
+    rows = pd.DataFrame({'Subdivision': ['Punjab'], 'Year': [2010], 'Rainfall': [500.0]})
+    observe_upstream('climate', {'total': 1}, rows)
+    first = live['climate']['id']
+    observe_upstream('climate', {'total': 1}, rows.assign(Rainfall=[600.0]))
+    assert live['climate']['id'] != first
@@ -0,0 +1,34 @@
+"""
+Background warm-up: once per dataset version, and again after a failed run
+"""
+import pytest
+
+from core import warmup
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Outcomes of the warm-ups started, each failing while fail is set"""
+    outcomes = {'fail': True, 'runs': 0}
+    def warm_up():
+        outcomes['runs'] += 1
+        if outcomes['fail']:
+            raise RuntimeError("upstream unavailable")
+        return 0.0
+    monkeypatch.setattr(warmup, 'warm_up', warm_up)
+    monkeypatch.setattr(warmup, 'WARM_UP_ON_START', True)
+    monkeypatch.setattr(warmup, '_warmed_versions', set())
+    return outcomes
+
+def test_failed_warm_up_is_retried(runs):
+    warmup.start_warm_up().join()
+    runs['fail'] = False
+    warmup.start_warm_up().join()
+    assert runs['runs'] == 2
+    # Once it succeeded, the same versions are not warmed up again
+    assert warmup.start_warm_up() is None
+    assert runs['runs'] == 2
+
+def test_disabled(runs, monkeypatch):
+    monkeypatch.setattr(warmup, 'WARM_UP_ON_START', False)
+    assert warmup.start_warm_up() is None
+    assert runs['runs'] == 0
@@ -0,0 +1,64 @@
+"""
+Area-weighted yields, in pandas and in the local store, against production over area
+summed row by row
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_connectors.agriculture_data import add_yield_column
+from utils.helpers import add_entity_codes, yield_by
+
+STATES = ['Punjab', 'Bihar']
+DISTRICTS = ['North', 'South', 'East']
+CROPS = ['Rice', 'Wheat']
+YEARS = [2015, 2016, 2017]
+
+@pytest.fixture
+def crop_rows(panel):
+    """District rows with areas, some of them zero or missing, and a few missing productions"""
+    df = panel({'State': STATES, 'District': DISTRICTS, 'Crop': CROPS, 'Year': YEARS}, 'Production', 1e3, 1e5, missing=0.1)
+    area = panel({'State': STATES, 'District': DISTRICTS, 'Crop': CROPS, 'Year': YEARS}, 'Area', 100, 5000, missing=0.15, seed=1)['Area']
+    df['Area'] = area.where(np.arange(len(area)) % 7 != 3, 0.0)
+    return df
+
+def summed_yields(df, group_by):
+    """{group: production / area} over the rows that report a production and a positive area"""
+    production, area = {}, {}
+    for row in df.itertuples(index=False):
+        if pd.isna(row.Production) or pd.isna(row.Area) or row.Area <= 0:
+            continue
+        key = tuple(getattr(row, column) for column in group_by)
+        production[key] = production.get(key, 0.0) + row.Production
+        area[key] = area.get(key, 0.0) + row.Area
+    return {key: production[key] / area[key] for key in production}
+
+def assert_yields(table, group_by, expected):
+    found = {tuple(row[column] for column in group_by): row['Yield'] for _, row in table.iterrows()}
+    assert found.keys() == expected.keys()
+    for key, value in expected.items():
+        assert found[key] == pytest.approx(value), key
+    assert table['Yield'].is_monotonic_decreasing
+
+@pytest.mark.parametrize('group_by', [['State'], ['Crop'], ['Year'], ['District', 'State'], ['State', 'Crop', 'Year']])
+def test_yield_by(crop_rows, group_by):
+    assert_yields(yield_by(add_entity_codes(crop_rows), group_by), group_by, summed_yields(crop_rows, group_by))
+
+def test_rows_without_area_do_not_count(crop_rows):
+    # Zero and missing areas are excluded, not treated as infinitely productive
+    rows = crop_rows[crop_rows['Area'].isna() | (crop_rows['Area'] == 0)]
+    assert len(rows) and yield_by(rows, 'State').empty
+    assert yield_by(crop_rows.drop(columns='Area'), 'State').empty
+    assert yield_by(crop_rows.iloc[:0], 'State').empty
+
+def test_add_yield_column(crop_rows):
+    rows = add_yield_column(crop_rows)
+    counted = crop_rows['Area'] > 0
+    np.testing.assert_allclose(rows.loc[counted, 'Yield'], crop_rows.loc[counted, 'Production'] / crop_rows.loc[counted, 'Area'])
+    assert rows.loc[~counted, 'Yield'].isna().all()
+
+@pytest.mark.parametrize('group_by', ['District', 'State', 'Crop', 'Year'])
+def test_store_yields(store, crop_rows, group_by):
+    store.ingest_agriculture_frame(crop_rows)
+    columns = ['District', 'State'] if group_by == 'District' else [group_by]
+    assert_yields(store.query_yield_totals(group_by), columns, summed_yields(crop_rows, columns))
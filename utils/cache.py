@@ -0,0 +1,95 @@
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# In-process LRU caches, one per namespace, shared by every session and thread
+_caches = {}
+_stats = {}
+_lock = threading.RLock()
+
+def freeze_value(value):
+    """Make lists and dictionaries hashable so they can be part of a cache key"""
+    if isinstance(value, list):
+        return tuple(freeze_value(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze_value(v)) for k, v in value.items()))
+    return value
+
+def _make_key(signature, args, kwargs):
+    """
+    Build a hashable cache key from call arguments
+    Arguments are bound to the signature with defaults applied, so
+    f('Punjab') and f(state='Punjab', crop=None) share one entry
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return tuple((name, freeze_value(value)) for name, value in bound.arguments.items())
+
+def cache_get(namespace, key):
+    """
+    Look up a cached value
+    Returns (True, value) on a hit and (False, None) on a miss
+    """
+    with _lock:
+        cache = _caches.setdefault(namespace, OrderedDict())
+        stats = _stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+        if key in cache:
+            cache.move_to_end(key)
+            stats['hits'] += 1
+            return True, cache[key]
+        stats['misses'] += 1
+        return False, None
+
+def cache_set(namespace, key, value, maxsize=256):
+    """Store a value, evicting the least recently used entries beyond maxsize"""
+    with _lock:
+        cache = _caches.setdefault(namespace, OrderedDict())
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > maxsize:
+            cache.popitem(last=False)
+
+def cached(namespace, maxsize=256, version=None, should_cache=None):
+    """
+    Decorator that memoizes a function in a named LRU cache
+
+    version is an optional callable returning the current dataset version; it is
+    part of every key, so entries from an older dataset are never served
+    should_cache is an optional predicate on the result (e.g. skip empty frames)
+    Results are shared between callers and must not be modified in place
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (version() if version else None, _make_key(signature, args, kwargs))
+            hit, value = cache_get(namespace, key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            if should_cache is None or should_cache(value):
+                cache_set(namespace, key, value, maxsize)
+            return value
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+def clear_cache(namespace=None):
+    """Drop cached entries for one namespace, or for all of them"""
+    with _lock:
+        if namespace is None:
+            _caches.clear()
+        else:
+            _caches.pop(namespace, None)
+
+def get_cache_stats():
+    """
+    Get hit/miss counts and sizes per namespace
+    """
+    with _lock:
+        return {
+            namespace: dict(stats, size=len(_caches.get(namespace, ())))
+            for namespace, stats in _stats.items()
+        }
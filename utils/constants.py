@@ -30,4 +30,160 @@ COMMON_CROPS = [
     "Jowar", "Bajra", "Ragi", "Tur", "Urad",
     "Moong", "Gram", "Groundnut", "Sunflower", "Soybean", 
     "Potatoes", "Jute", "Barley", "Mustard", "Peas"
-]
\ No newline at end of file
+]
+
+# Other spellings of states and union territories seen in upstream data and questions
+# Keys are lower case with '&' written as 'and' (see utils.helpers.entity_key)
+STATE_ALIASES = {
+    "orissa": "Odisha",
+    "nct of delhi": "Delhi",
+    "delhi nct": "Delhi",
+    "national capital territory of delhi": "Delhi",
+    "pondicherry": "Puducherry",
+    "uttaranchal": "Uttarakhand",
+    "chattisgarh": "Chhattisgarh",
+    "andaman and nicobar": "Andaman and Nicobar Islands",
+    "andaman and nicobar island": "Andaman and Nicobar Islands",
+    "dadra and nagar haveli": "Dadra and Nagar Haveli and Daman and Diu",
+    "daman and diu": "Dadra and Nagar Haveli and Daman and Diu",
+    "jammu kashmir": "Jammu and Kashmir",
+}
+
+# Crop names as spelled in the data.gov.in crop production dataset
+CROP_ALIASES = {
+    "paddy": "Rice",
+    "arhar/tur": "Tur",
+    "arhar": "Tur",
+    "moong(green gram)": "Moong",
+    "urad(black gram)": "Urad",
+    "cotton(lint)": "Cotton",
+    "soyabean": "Soybean",
+    "potato": "Potatoes",
+    "rapeseed and mustard": "Mustard",
+    "peas and beans (pulses)": "Peas",
+    "jute and mesta": "Jute",
+    "gram(chana)": "Gram",
+}
+
+# IMD meteorological subdivisions of the rainfall dataset and the states they cover
+# (subdivision, state, area of the subdivision within the state in km2); state rainfall
+# is the area-weighted mean of its subdivisions. Subdivisions spanning several states
+# (e.g. Assam & Meghalaya) contribute to each with the area lying in it.
+RAINFALL_SUBDIVISION_AREAS = [
+    ("Andaman & Nicobar Islands", "Andaman and Nicobar Islands", 8249),
+    ("Arunachal Pradesh", "Arunachal Pradesh", 83743),
+    ("Assam & Meghalaya", "Assam", 78438),
+    ("Assam & Meghalaya", "Meghalaya", 22429),
+    ("Naga Mani Mizo Tripura", "Nagaland", 16579),
+    ("Naga Mani Mizo Tripura", "Manipur", 22327),
+    ("Naga Mani Mizo Tripura", "Mizoram", 21081),
+    ("Naga Mani Mizo Tripura", "Tripura", 10486),
+    ("Sub Himalayan West Bengal & Sikkim", "West Bengal", 21800),
+    ("Sub Himalayan West Bengal & Sikkim", "Sikkim", 7096),
+    ("Gangetic West Bengal", "West Bengal", 66952),
+    ("Orissa", "Odisha", 155707),
+    ("Jharkhand", "Jharkhand", 79716),
+    ("Bihar", "Bihar", 94163),
+    ("East Uttar Pradesh", "Uttar Pradesh", 139000),
+    ("West Uttar Pradesh", "Uttar Pradesh", 101928),
+    ("Uttarakhand", "Uttarakhand", 53483),
+    ("Haryana Delhi & Chandigarh", "Haryana", 44212),
+    ("Haryana Delhi & Chandigarh", "Delhi", 1484),
+    ("Haryana Delhi & Chandigarh", "Chandigarh", 114),
+    ("Punjab", "Punjab", 50362),
+    ("Himachal Pradesh", "Himachal Pradesh", 55673),
+    ("Jammu & Kashmir", "Jammu and Kashmir", 42241),
+    ("Jammu & Kashmir", "Ladakh", 59146),
+    ("West Rajasthan", "Rajasthan", 175000),
+    ("East Rajasthan", "Rajasthan", 167239),
+    ("West Madhya Pradesh", "Madhya Pradesh", 140000),
+    ("East Madhya Pradesh", "Madhya Pradesh", 168252),
+    ("Gujarat Region", "Gujarat", 87000),
+    ("Gujarat Region", "Dadra and Nagar Haveli and Daman and Diu", 603),
+    ("Saurashtra & Kutch", "Gujarat", 109244),
+    ("Konkan & Goa", "Maharashtra", 30746),
+    ("Konkan & Goa", "Goa", 3702),
+    ("Madhya Maharashtra", "Maharashtra", 115056),
+    ("Matathwada", "Maharashtra", 64590),  # spelling used by the IMD dataset
+    ("Marathwada", "Maharashtra", 64590),
+    ("Vidarbha", "Maharashtra", 97321),
+    ("Chhattisgarh", "Chhattisgarh", 135192),
+    ("Coastal Andhra Pradesh", "Andhra Pradesh", 92906),
+    ("Rayalseema", "Andhra Pradesh", 67299),
+    ("Telangana", "Telangana", 112077),
+    ("Tamil Nadu", "Tamil Nadu", 130060),
+    ("Tamil Nadu", "Puducherry", 490),
+    ("Coastal Karnataka", "Karnataka", 18730),
+    ("North Interior Karnataka", "Karnataka", 86000),
+    ("South Interior Karnataka", "Karnataka", 87061),
+    ("Kerala", "Kerala", 38863),
+    ("Lakshadweep", "Lakshadweep", 32),
+]
+
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+# Rainfall seasons as (first month, last month), inclusive; ranges may wrap past December
+# Longer names come first so 'pre-monsoon' is not read as 'monsoon'
+RAINFALL_SEASONS = {
+    "pre-monsoon": (3, 5),
+    "post-monsoon": (10, 12),
+    "north-east monsoon": (10, 12),
+    "northeast monsoon": (10, 12),
+    "south-west monsoon": (6, 9),
+    "southwest monsoon": (6, 9),
+    "monsoon": (6, 9),
+    "kharif": (6, 10),
+    "rabi": (10, 3),
+    "winter": (1, 2),
+    "summer": (3, 5),
+}
+
+# IMD rainfall categories by percent departure from the long-term average,
+# as (lowest departure, category), highest band first
+RAINFALL_DEPARTURE_CATEGORIES = [
+    (60, "large excess"),
+    (20, "excess"),
+    (-19, "normal"),
+    (-59, "deficient"),
+    (-99, "large deficient"),
+    (-100, "no rain"),
+]
+
+# IMD meteorological drought by rainfall deficiency: more than 25% moderate, more than 50% severe
+DROUGHT_DEPARTURE = -25
+SEVERE_DROUGHT_DEPARTURE = -50
+
+# Example questions shown in the sidebar; their answers are precomputed at start-up
+QUICK_QUERY_EXAMPLES = [
+    "What is the rainfall in Maharashtra?",
+    "Show me rice production in Punjab",
+    "Compare rainfall between Karnataka and Tamil Nadu",
+    "Analyze correlation between wheat production and rainfall in Uttar Pradesh",
+    "List the top crops of type Rice in Maharashtra and Punjab"
+]
+
+# Datasets each intent's answer is built from; general queries are keyed by the intent
+# they are answered as, the rest of them read no data
+INTENT_DATASETS = {
+    'climate_info': ('climate',),
+    'compare_rainfall': ('climate',),
+    'seasonal_rainfall': ('climate',),
+    'drought_years': ('climate',),
+    'rainfall_anomalies': ('climate',),
+    'analyze_correlation': ('agriculture', 'climate'),
+    'crop_production': ('agriculture',),
+    'crop_trend': ('agriculture',),
+    'highest_wheat_production': ('agriculture',),
+    'top_districts': ('agriculture',),
+    'top_crops': ('agriculture',),
+    'top_crops_by_type': ('agriculture',),
+    'compare_crop_production': ('agriculture',),
+    'highest_yield_district': ('agriculture',),
+    'yield_trend': ('agriculture',),
+    'fastest_growing_crops': ('agriculture',),
+    'crop_growth_by_state': ('agriculture',),
+    'general_query': (),
+}
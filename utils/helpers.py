@@ -1,4 +1,17 @@
 import re
+import threading
+from utils.constants import INDIAN_STATES, COMMON_CROPS, STATE_ALIASES, CROP_ALIASES
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Entity columns of connector frames: (entity kind, integer code column added at ingest)
+ENTITY_COLUMNS = {
+    'State': ('state', 'StateCode'),
+    'Crop': ('crop', 'CropCode'),
+    'District': ('district', 'DistrictCode'),
+}
 
 def extract_years_from_query(query):
     """
@@ -9,18 +22,170 @@ def extract_years_from_query(query):
     years = re.findall(r'\b(19|20)\d{2}\b', query)
     return [int(year) for year in years]
 
+def entity_key(name):
+    """
+    Lower-case a name, write '&' as 'and' and collapse whitespace, so spellings compare equal
+    """
+    return " ".join(str(name).replace('&', ' and ').lower().split())
+
+def _seed_entities(canonical, aliases):
+    codes = {}
+    names = []
+    for name in canonical:
+        codes[entity_key(name)] = len(names)
+        names.append(name)
+    for alias, name in aliases.items():
+        codes[entity_key(alias)] = codes[entity_key(name)]
+    return {'codes': codes, 'names': names}
+
+# Canonical entity dictionary: every spelling (entity_key) maps to a stable integer code
+# States and crops are seeded from the constants, so their codes are the same in every process;
+# names seen for the first time (and all districts) are added with the next free code
+_entities = {
+    'state': _seed_entities(INDIAN_STATES, STATE_ALIASES),
+    'crop': _seed_entities(COMMON_CROPS, CROP_ALIASES),
+    'district': {'codes': {}, 'names': []},
+}
+_entity_lock = threading.Lock()
+
+def _scoped_key(name, scope):
+    # District names repeat across states, so districts are keyed by their state's code
+    return entity_key(name) if scope is None else f"{scope}|{entity_key(name)}"
+
+def lookup_entity_code(kind, name, scope=None):
+    """
+    Code of a known 'state', 'crop' or 'district' spelling, or None (unknown names are not added)
+    """
+    return _entities[kind]['codes'].get(_scoped_key(name, scope))
+
+def entity_code(kind, name, scope=None):
+    """
+    Code of a 'state', 'crop' or 'district' name, adding names not seen before
+    scope is the state code of a district
+    """
+    entity = _entities[kind]
+    key = _scoped_key(name, scope)
+    code = entity['codes'].get(key)
+    if code is None:
+        with _entity_lock:
+            code = entity['codes'].get(key)
+            if code is None:
+                code = len(entity['names'])
+                entity['names'].append(" ".join(str(name).split()))
+                entity['codes'][key] = code
+    return code
+
+def entity_names(kind, codes):
+    """
+    Canonical names of an array of codes; -1 (missing) gives None
+    """
+    return np.array(_entities[kind]['names'] + [None], dtype=object)[np.asarray(codes)]
+
+def encode_entities(kind, values, scope=None):
+    """
+    Codes of a column of names, looking up each distinct spelling once
+    scope optionally gives the state code of every row (for districts)
+    Returns an int32 array with -1 for missing names
+    """
+    value_codes, uniques = pd.factorize(values)
+    if scope is None:
+        mapping = [entity_code(kind, name) for name in uniques]
+        return np.array(mapping + [-1], dtype=np.int32)[value_codes]
+
+    # Factorize (state code, name) pairs as integers so each pair is looked up once
+    scope = np.asarray(scope, dtype=np.int64)
+    width = len(uniques) + 1
+    pairs = np.where((scope < 0) | (value_codes < 0), -1, scope * width + value_codes + 1)
+    pair_codes, pair_uniques = pd.factorize(pairs)
+    mapping = [-1 if pair < 0 else entity_code(kind, uniques[pair % width - 1], scope=int(pair // width))
+               for pair in pair_uniques]
+    return np.array(mapping + [-1], dtype=np.int32)[pair_codes]
+
+def add_entity_codes(df):
+    """
+    Canonicalize the State, Crop and District names of a connector frame and add their code columns
+    Applied where data enters the pipeline; filters and groupings then compare integer codes
+    """
+    if df is None or df.empty or all(code in df.columns for column, (_, code) in ENTITY_COLUMNS.items() if column in df.columns):
+        return df
+    columns = {}
+    state_codes = None
+    if 'State' in df.columns:
+        state_codes = encode_entities('state', df['State'])
+        columns.update(State=entity_names('state', state_codes), StateCode=state_codes)
+    if 'Crop' in df.columns:
+        crop_codes = encode_entities('crop', df['Crop'])
+        columns.update(Crop=entity_names('crop', crop_codes), CropCode=crop_codes)
+    if 'District' in df.columns and state_codes is not None:
+        district_codes = encode_entities('district', df['District'], scope=state_codes)
+        columns.update(District=entity_names('district', district_codes), DistrictCode=district_codes)
+    return df.assign(**columns)
+
+def entity_mask(df, column, names):
+    """
+    Boolean mask of the rows whose State or Crop is any of the given names, in any known spelling
+    Compares integer codes when the frame has them, lower-cased names otherwise
+    """
+    kind, code_column = ENTITY_COLUMNS[column]
+    names = [names] if isinstance(names, str) else list(names)
+    if code_column in df.columns:
+        codes = [code for code in (lookup_entity_code(kind, name) for name in names) if code is not None]
+        values = df[code_column].to_numpy()
+        return values == codes[0] if len(codes) == 1 else np.isin(values, codes)
+    spellings = {name.lower() for name in names}
+    spellings.update(_normalize_entity_name(kind, name).lower() for name in names)
+    return df[column].astype(str).str.lower().isin(spellings).to_numpy()
+
+def sum_by(df, group_by, column='Production'):
+    """
+    Sum a column (or a list of columns) grouped by one or more columns, grouping entity columns on their codes
+    Returns a pandas Series (DataFrame for a list) indexed by the group column names, with names resolved for display
+    """
+    group_columns = [group_by] if isinstance(group_by, str) else list(group_by)
+    keys = []
+    for name in group_columns:
+        code_column = ENTITY_COLUMNS.get(name, (None, None))[1]
+        keys.append(code_column if code_column in df.columns else name)
+    # Rows with a missing name (code -1) are left out, as grouping on names leaves out NaN
+    coded = [key for key, name in zip(keys, group_columns) if key != name]
+    if coded:
+        df = df[(df[coded].to_numpy() >= 0).all(axis=1)]
+    totals = df.groupby(keys)[column].sum()
+
+    levels = []
+    for name, key, values in zip(group_columns, keys, [totals.index.get_level_values(i) for i in range(len(keys))]):
+        levels.append(entity_names(ENTITY_COLUMNS[name][0], values.to_numpy()) if key != name else values)
+    totals.index = pd.MultiIndex.from_arrays(levels, names=group_columns) if len(keys) > 1 else pd.Index(levels[0], name=group_columns[0])
+    return totals
+
+def yield_by(df, group_by):
+    """
+    Area-weighted yield (total production over total area) grouped by one or more columns
+    Only rows reporting both a production and an area count
+    Returns a pandas DataFrame with the group columns, Production, Area and Yield, highest yield first
+    """
+    group_columns = [group_by] if isinstance(group_by, str) else list(group_by)
+    if df is None or df.empty or 'Area' not in df.columns:
+        return pd.DataFrame(columns=group_columns + ['Production', 'Area', 'Yield'])
+    rows = df[(df['Area'] > 0) & df['Production'].notna()]
+    totals = sum_by(rows, group_columns, ['Production', 'Area'])
+    totals['Yield'] = totals['Production'] / totals['Area']
+    return totals.sort_values('Yield', ascending=False).reset_index()
+
+def _normalize_entity_name(kind, name):
+    code = lookup_entity_code(kind, name)
+    if code is None:
+        return " ".join(str(name).split()).title()
+    return _entities[kind]['names'][code]
+
 def normalize_state_name(state):
     """
-    Normalize state names to standard format
+    Normalize a state name to its canonical spelling (e.g. Orissa -> Odisha)
     """
-    # This would contain logic to standardize state names
-    # For now, just return the input
-    return state.strip().title()
+    return _normalize_entity_name('state', state)
 
 def normalize_crop_name(crop):
     """
-    Normalize crop names to standard format
+    Normalize a crop name to its canonical spelling (e.g. Paddy -> Rice)
     """
-    # This would contain logic to standardize crop names
-    # For now, just return the input
-    return crop.strip().title()
\ No newline at end of file
+    return _normalize_entity_name('crop', crop)
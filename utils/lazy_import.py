@@ -0,0 +1,38 @@
+import importlib
+import threading
+import types
+
+class _LazyModule(types.ModuleType):
+    """
+    Module placeholder that performs the real import on first attribute access
+    """
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                module = importlib.import_module(self.__name__)
+                # Copy the module namespace so later lookups skip __getattr__
+                self.__dict__.update(module.__dict__)
+                self.__dict__['_lazy_module'] = module
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        # Only called for attributes not yet in the namespace
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy_import(name):
+    """
+    Import a module lazily
+
+    Returns a placeholder bound to the module name; the module is imported
+    the first time any attribute is used, so heavy dependencies such as pandas
+    or matplotlib only cost start-up time when they are actually needed
+    """
+    return _LazyModule(name)
@@ -0,0 +1,195 @@
+import threading
+import time
+from contextlib import ContextDecorator
+
+# Process-wide metrics registry: counters and histograms keyed by name and labels
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_metrics_server = None
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    'samarth_queries_total': ('counter', "Answered queries by intent"),
+    'samarth_parse_seconds': ('histogram', "Time spent parsing a query"),
+    'samarth_handler_seconds': ('histogram', "Time spent generating an answer, by intent"),
+    'samarth_upstream_requests_total': ('counter', "data.gov.in requests by dataset and HTTP status"),
+    'samarth_upstream_request_seconds': ('histogram', "data.gov.in request latency by dataset"),
+    'samarth_mock_fallbacks_total': ('counter', "Requests answered with mock data after the live API failed"),
+    'samarth_chart_render_seconds': ('histogram', "Time spent rendering a chart, by target"),
+    'samarth_cache_hits_total': ('counter', "In-process cache hits by namespace"),
+    'samarth_cache_misses_total': ('counter', "In-process cache misses by namespace"),
+    'samarth_cache_entries': ('gauge', "Entries held by each in-process cache"),
+}
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+def inc_counter(name, labels=None, value=1):
+    """Add to a counter"""
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, value, labels=None, buckets=DEFAULT_BUCKETS):
+    """Record a value (usually seconds) in a histogram"""
+    key = (name, _label_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(histogram['buckets']):
+            if value <= bound:
+                histogram['counts'][i] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+class timed(ContextDecorator):
+    """
+    Observe the wall time of a block or function in a histogram
+
+    with timed('samarth_parse_seconds'): ...
+    @timed('samarth_parse_seconds')
+    """
+    def __init__(self, name, labels=None):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started, self.labels)
+        return False
+
+    def _recreate_cm(self):
+        # Each decorated call gets its own timer, so concurrent calls do not share a start time
+        return timed(self.name, self.labels)
+
+def time_events(name, labels, events):
+    """
+    Observe the time spent producing the events of a generator, excluding the consumer's time
+    """
+    elapsed = 0.0
+    events = iter(events)
+    while True:
+        started = time.perf_counter()
+        try:
+            event = next(events)
+        except StopIteration:
+            break
+        finally:
+            elapsed += time.perf_counter() - started
+        yield event
+    observe(name, elapsed, labels)
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + list(extra or [])
+    if not items:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+def _collect_cache_metrics():
+    """Cache statistics are kept by utils.cache and read at export time"""
+    from utils.cache import get_cache_stats
+    counters, gauges = {}, {}
+    for namespace, stats in get_cache_stats().items():
+        labels = (('namespace', namespace),)
+        counters[('samarth_cache_hits_total', labels)] = stats['hits']
+        counters[('samarth_cache_misses_total', labels)] = stats['misses']
+        gauges[('samarth_cache_entries', labels)] = stats['size']
+    return counters, gauges
+
+def render_prometheus():
+    """
+    Render all metrics in the Prometheus text exposition format
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: dict(value, counts=list(value['counts'])) for key, value in _histograms.items()}
+    cache_counters, gauges = _collect_cache_metrics()
+    counters.update(cache_counters)
+
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms} | {name for name, _ in gauges})
+    for name in names:
+        metric_type, help_text = METRIC_HELP.get(name, ('untyped', name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for source in (counters, gauges):
+            for (metric, labels), value in sorted(source.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(histogram['buckets'], histogram['counts']):
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+def get_metrics_summary():
+    """
+    Compact view of the metrics for display
+    Returns {name: {label text: value}} for counters and {name: {label text: {'count', 'mean_ms'}}} for histograms
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (value['count'], value['sum']) for key, value in _histograms.items()}
+    cache_counters, _ = _collect_cache_metrics()
+    counters.update(cache_counters)
+
+    def label_text(labels):
+        return ", ".join(str(value) for _, value in labels)
+
+    summary = {'counters': {}, 'histograms': {}}
+    for (name, labels), value in sorted(counters.items()):
+        summary['counters'].setdefault(name, {})[label_text(labels)] = value
+    for (name, labels), (count, total) in sorted(histograms.items()):
+        summary['histograms'].setdefault(name, {})[label_text(labels)] = {
+            'count': count, 'mean_ms': round(total / count * 1000, 1) if count else 0.0
+        }
+    return summary
+
+def start_metrics_server(host, port):
+    """
+    Serve /metrics from a background thread; only the first call starts a server
+    Returns the server, or None if the port could not be bound
+    """
+    global _metrics_server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _lock:
+        if _metrics_server is not None:
+            return _metrics_server
+        try:
+            _metrics_server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"Could not start metrics endpoint on {host}:{port}: {e}")
+            return None
+        _metrics_server.daemon_threads = True
+    threading.Thread(target=_metrics_server.serve_forever, name='samarth-metrics', daemon=True).start()
+    return _metrics_server